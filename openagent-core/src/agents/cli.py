@@ -6,6 +6,7 @@ Usage:
     python cli.py coder        # explicitly select coder
     python cli.py researcher   # select researcher
     python cli.py openagent    # select openagent
+    python cli.py --profile-startup   # print an import-time breakdown at startup
 
 Slash commands inside the CLI:
     /help           Show available commands
@@ -28,6 +29,14 @@ _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _SRC_DIR not in sys.path:
     sys.path.insert(0, _SRC_DIR)
 
+# ─── Startup Profiling (--profile-startup) ───────────────────────────────────
+# Installed before the other imports so that the whole startup is measured.
+_PROFILER = None
+if "--profile-startup" in sys.argv:
+    from agents.utils.import_profiler import ImportProfiler
+    _PROFILER = ImportProfiler()
+    _PROFILER.install()
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -38,8 +47,8 @@ import warnings
 def _silence_noisy_loggers():
     """Aggressively suppress mlflow and OpenTelemetry log noise.
 
-    Called both at startup AND after agent loading, because
-    ``mlflow.langchain.autolog()`` in ``coder.py`` reconfigures handlers.
+    Called both at startup AND after agent loading / tracing setup, because
+    ``mlflow.langchain.autolog()`` reconfigures handlers.
     """
     for name in (
         "mlflow",
@@ -72,9 +81,9 @@ from rich.table import Table
 from rich.theme import Theme
 from rich.rule import Rule
 
-# ─── LangGraph / LangChain Imports ───────────────────────────────────────────
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import HumanMessage
+# LangGraph / LangChain, the agents and mlflow are imported in a background
+# thread (see _startup) so that the prompt shows up before they are loaded.
+from agents.utils.tracing import defer_tracing, enable_deferred_tracing
 
 # ─── Theme ───────────────────────────────────────────────────────────────────
 THEME = Theme({
@@ -92,6 +101,9 @@ THEME = Theme({
 
 console = Console(theme=THEME)
 
+# Max lines printed per live shell output event
+SHELL_PREVIEW_LINES = 5
+
 # ─── Agent Registry ──────────────────────────────────────────────────────────
 AGENT_REGISTRY = {
     "coder": {
@@ -202,12 +214,55 @@ def load_agent(name: str):
     """Import and return the compiled LangGraph for *name*."""
     info = AGENT_REGISTRY[name]
     mod = importlib.import_module(info["module"])
-    # Re-silence loggers — agent modules (e.g. coder.py) call
+    # Re-silence loggers — once tracing is enabled, agent modules enable
     # mlflow.langchain.autolog() at import time, which reconfigures handlers.
     _silence_noisy_loggers()
     return getattr(mod, info["attr"])
 
 
+def _load_graph(name: str):
+    """load_agent with a fresh in-memory checkpointer."""
+    from langgraph.checkpoint.memory import MemorySaver  # noqa: PLC0415
+
+    graph = load_agent(name)
+    graph.checkpointer = MemorySaver()
+    return graph
+
+
+def _startup(name: str) -> tuple:
+    """Load the agent, then enable tracing. Runs in a worker thread while the user types.
+
+    Returns ``(graph, callbacks)``.
+    """
+    graph = _load_graph(name)
+    if _PROFILER:
+        _PROFILER.mark("agent loaded")
+
+    # Tracing requested by the agent modules was deferred (see run_cli)
+    enable_deferred_tracing()
+    _silence_noisy_loggers()
+
+    # Optional tracing
+    callbacks = []
+    try:
+        from langfuse.langchain import CallbackHandler  # noqa: PLC0415
+        callbacks.append(CallbackHandler())
+    except Exception:
+        pass
+    if _PROFILER:
+        _PROFILER.mark("tracing ready")
+
+    return graph, callbacks
+
+
+async def _await_startup(future, message: str):
+    """Result of a background loading step, with a spinner if it is not done yet."""
+    if not future.done():
+        with console.status(message, spinner="dots"):
+            return await future
+    return future.result()
+
+
 # ─── UI Components ───────────────────────────────────────────────────────────
 
 def print_header(agent_name: str):
@@ -253,6 +308,29 @@ def print_help():
     console.print()
 
 
+def print_startup_profile(profiler):
+    table = Table(
+        show_header=True,
+        header_style="bold bright_cyan",
+        border_style="dim",
+        padding=(0, 2),
+        show_edge=False,
+    )
+    table.add_column("Startup", style="bold cyan", min_width=20)
+    table.add_column("Seconds", justify="right")
+
+    for phase, elapsed in profiler.phases:
+        table.add_row(phase, f"{elapsed:.3f}")
+    table.add_row("", "")
+    table.add_row("[bold]imports (self time)[/bold]", f"{profiler.total_import_time():.3f}")
+    for package, seconds in profiler.top_packages():
+        table.add_row(f"  {package}", f"{seconds:.3f}")
+
+    console.print()
+    console.print(Panel(table, title="[bold]Startup profile[/bold]", border_style="dim", padding=(1, 1)))
+    console.print()
+
+
 def print_agents_list(current: str):
     console.print()
     for name, info in AGENT_REGISTRY.items():
@@ -275,12 +353,22 @@ async def stream_response(graph, user_input: str, config: dict):
 
     Everything is appended to stdout so the terminal stays scrollable.
     """
+    from langchain_core.messages import HumanMessage  # noqa: PLC0415
+
+    from agents.utils.nodes.summarization_node import get_speculation_stats  # noqa: PLC0415
+    from agents.utils.nodes.tool_cache import get_tool_cache_stats  # noqa: PLC0415
+    from agents.utils.prompt_caching import cache_usage  # noqa: PLC0415
+
     input_payload = {"messages": [HumanMessage(content=user_input)]}
 
     assistant_text = ""
     tool_count = 0
+    cache_read = 0
+    cache_written = 0
     has_printed_text = False
     start_time = time.time()
+    tool_cache_before = get_tool_cache_stats()
+    speculation_before = get_speculation_stats()
 
     try:
         async for event in graph.astream_events(
@@ -298,6 +386,12 @@ async def stream_response(graph, user_input: str, config: dict):
                         has_printed_text = True
                     assistant_text += chunk_text
 
+            # ── Model step finished: prompt cache hits/misses ────────────
+            elif kind == "on_chat_model_end":
+                usage = cache_usage(event["data"].get("output"))
+                cache_read += usage["cache_read"]
+                cache_written += usage["cache_creation"]
+
             # ── Tool invocation ──────────────────────────────────────────
             elif kind == "on_tool_start":
                 tool_count += 1
@@ -328,6 +422,13 @@ async def stream_response(graph, user_input: str, config: dict):
                     )
                 )
 
+            # ── Live shell output (shell_tool progress events) ──────────
+            elif kind == "on_custom_event" and event["name"] == "shell_output":
+                data = event["data"]
+                style = "warning" if data.get("stream") == "stderr" else "dim"
+                for line in data.get("text", "").splitlines()[-SHELL_PREVIEW_LINES:]:
+                    console.print(Text(f"  │ {_truncate(line, 200)}", style=style))
+
             # ── Tool result ──────────────────────────────────────────────
             elif kind == "on_tool_end":
                 tool_name = event.get("name", "")
@@ -370,6 +471,24 @@ async def stream_response(graph, user_input: str, config: dict):
     parts = []
     if tool_count:
         parts.append(f"🔧 {tool_count} tool{'s' if tool_count != 1 else ''}")
+    if cache_read or cache_written:
+        parts.append(f"💾 cache {cache_read / 1000:.1f}k read · {cache_written / 1000:.1f}k written")
+    tool_cache = get_tool_cache_stats()
+    tool_cache_hits = tool_cache["hits"] - tool_cache_before["hits"]
+    tool_cache_lookups = tool_cache_hits + tool_cache["misses"] - tool_cache_before["misses"]
+    if tool_cache_lookups:
+        parts.append(f"♻ tool cache {tool_cache_hits}/{tool_cache_lookups} hits ({tool_cache['hit_rate']:.0%} overall)")
+    speculation = get_speculation_stats()
+    summaries_reused = speculation["reused"] - speculation_before["reused"]
+    summaries_thrown = (
+        speculation["discarded"] + speculation["failed"]
+        - speculation_before["discarded"] - speculation_before["failed"]
+    )
+    if summaries_reused or summaries_thrown:
+        parts.append(
+            f"📝 precomputed summaries {summaries_reused} reused · {summaries_thrown} discarded "
+            f"({speculation['reuse_rate']:.0%} overall)"
+        )
     parts.append(f"⏱  {elapsed:.1f}s")
     console.print(Text(" · ".join(parts), style="stats"), justify="right")
 
@@ -379,28 +498,25 @@ async def stream_response(graph, user_input: str, config: dict):
 async def run_cli(agent_name: str):
     """Interactive REPL for the selected agent."""
 
-    # Load agent with a brief spinner (scrollable — spinner only in-place)
-    with console.status(
-        f"[bold blue]Loading {AGENT_REGISTRY[agent_name]['label']} agent…",
-        spinner="dots",
-    ):
-        graph = load_agent(agent_name)
-        checkpointer = MemorySaver()
-        graph.checkpointer = checkpointer
+    # The agent loads in the background while the user types the first
+    # message; mlflow setup is deferred until the agent has been imported.
+    defer_tracing()
+    loop = asyncio.get_running_loop()
+    startup = loop.run_in_executor(None, _startup, agent_name)
+    graph = None
+    callbacks = []
 
     print_header(agent_name)
 
+    if _PROFILER:
+        _PROFILER.mark("prompt ready")
+        graph, callbacks = await _await_startup(startup, "[bold blue]Profiling startup…")
+        _PROFILER.uninstall()
+        print_startup_profile(_PROFILER)
+
     thread_id = f"cli-{int(time.time())}"
     session_messages = 0
 
-    # Optional tracing
-    callbacks = []
-    try:
-        from langfuse.langchain import CallbackHandler  # noqa: PLC0415
-        callbacks.append(CallbackHandler())
-    except Exception:
-        pass
-
     # ── REPL ─────────────────────────────────────────────────────────────
     while True:
         # Prompt
@@ -449,16 +565,18 @@ async def run_cli(agent_name: str):
                     console.print(f"[dim]Already using {agent_name}[/dim]")
                     continue
 
+                if graph is None:
+                    _, callbacks = await _await_startup(
+                        startup, f"[bold blue]Loading {AGENT_REGISTRY[agent_name]['label']} agent…"
+                    )
+
                 agent_name = target
-                with console.status(
+                graph = await _await_startup(
+                    loop.run_in_executor(None, _load_graph, agent_name),
                     f"[bold blue]Switching to {AGENT_REGISTRY[agent_name]['label']}…",
-                    spinner="dots",
-                ):
-                    graph = load_agent(agent_name)
-                    checkpointer = MemorySaver()
-                    graph.checkpointer = checkpointer
-                    thread_id = f"cli-{int(time.time())}"
-                    session_messages = 0
+                )
+                thread_id = f"cli-{int(time.time())}"
+                session_messages = 0
                 print_header(agent_name)
 
             elif cmd == "/history":
@@ -474,6 +592,11 @@ async def run_cli(agent_name: str):
             continue
 
         # ── Normal message ───────────────────────────────────────────
+        if graph is None:
+            graph, callbacks = await _await_startup(
+                startup, f"[bold blue]Loading {AGENT_REGISTRY[agent_name]['label']} agent…"
+            )
+
         session_messages += 1
 
         config = {
@@ -508,6 +631,11 @@ def main():
         choices=list(AGENT_REGISTRY.keys()),
         help="Agent to start with (default: coder)",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time breakdown of the startup",
+    )
 
     args = parser.parse_args()
 
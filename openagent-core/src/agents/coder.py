@@ -15,7 +15,7 @@ from langchain.agents.middleware import FilesystemFileSearchMiddleware, TodoList
 from agents.middleware import SummarizationMiddleware
 
 # Import centralized model configuration
-from agents.models import model
+from agents.models import get_default_model
 
 import os
 _CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -32,7 +32,7 @@ shell_middleware = ShellToolMiddleware(workspace_root=root_path)
 from agents.tools import *
 from langgraph.graph import StateGraph, START, END, MessagesState
 
-tools = [write_file, read_file, write_todos, shell_tool]
+tools = [write_file, write_files, edit_file, read_file, read_files, write_todos, shell_tool, poll_job, wait_job, kill_job]
 tools.extend(fs_middlware.tools)
 
 from langchain.messages import SystemMessage
@@ -45,24 +45,26 @@ class CoderState(MessagesState):
     todos: Annotated[NotRequired[list[Todo]], OmitFromInput] = []
 
 from agents.utils.message_truncation import truncate_messages
+from agents.utils.prompt_caching import add_cache_breakpoints, get_bound_model, report_cache_usage
 
 def agent(state: MessagesState) -> MessagesState:
-    llm = model.bind_tools(tools=tools)
+    model = get_default_model()
+    llm = get_bound_model(model, tools)
 
     # Hard truncation safety net - prevents exceeding API token limits
     # messages = truncate_messages(state["messages"])
 
-    response = llm.invoke([SystemMessage(content=sys_prompt)] + state["messages"])
+    response = llm.invoke(add_cache_breakpoints(sys_prompt, state["messages"], model))
+    report_cache_usage(response, "coder")
     return MessagesState(**{
         "messages": [response]
     })
 
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
+from agents.utils.nodes.tool_scheduler import scheduled_tool_node
 
-tool_node = ToolNode(
-    tools=tools,
-    handle_tool_errors=True
-)
+# Calls on the same file run in order, each tool class has a concurrency cap
+tool_node = scheduled_tool_node(tools)
 
 from agents.utils.nodes.summarization_node import *
 
@@ -70,10 +72,10 @@ builder = StateGraph(MessagesState)
 
 builder.add_node("tools", tool_node)
 builder.add_node("agent", agent)
-builder.add_node("summarize", summarize_messages_node)
+builder.add_node("summarize", summarize_node)
 
 # START → check if summarization needed → summarize or go to agent
-builder.add_conditional_edges(START, should_summarize)
+builder.add_conditional_edges(START, summarize_edge)
 builder.add_edge("summarize", "agent")
 
 # agent → check if tools needed → tools or END
@@ -82,13 +84,11 @@ builder.add_conditional_edges("agent", tools_condition)
 # tools → check if summarization needed before returning to agent
 # This is critical: without this, the context grows without limit
 # during long tool-use sessions
-builder.add_conditional_edges("tools", should_summarize)
+builder.add_conditional_edges("tools", summarize_edge)
 
-import mlflow
+from agents.utils.tracing import setup_tracing
 
-mlflow.set_tracking_uri("http://127.0.0.1:1234")
-mlflow.set_experiment("OpenAgent")
-mlflow.langchain.autolog()
+setup_tracing("OpenAgent")
 
 coder = builder.compile()
 
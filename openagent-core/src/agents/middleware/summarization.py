@@ -3,7 +3,6 @@
 import uuid
 import warnings
 from collections.abc import Callable, Iterable, Mapping
-from functools import partial
 from typing import Any, Literal, cast
 
 from langchain_core.messages import (
@@ -26,6 +25,7 @@ from langchain.chat_models import BaseChatModel, init_chat_model
 TokenCounter = Callable[[Iterable[MessageLikeRepresentation]], int]
 
 from agents.utils.logging import logger
+from agents.utils.token_counter import get_token_counter
 
 DEFAULT_SUMMARY_PROMPT = """<role>
 Context Extraction Assistant
@@ -122,12 +122,8 @@ Example:
 
 
 def _get_approximate_token_counter(model: BaseChatModel) -> TokenCounter:
-    """Tune parameters of approximate token counter based on model type."""
-    if model._llm_type == "anthropic-chat":  # noqa: SLF001
-        # 3.3 was estimated in an offline experiment, comparing with Claude's token-counting
-        # API: https://platform.claude.com/docs/en/build-with-claude/token-counting
-        return partial(count_tokens_approximately, chars_per_token=3.3)
-    return count_tokens_approximately
+    """Shared local token counter for the model family (see `agents.utils.token_counter`)."""
+    return get_token_counter(model)
 
 
 class SummarizationMiddleware(AgentMiddleware):
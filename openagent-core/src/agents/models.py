@@ -1,6 +1,10 @@
 """
 Centralized model configuration for OpenAgent.
 This module provides a single source of truth for LLM configuration across all agents.
+
+Models are built lazily: provider packages are imported and clients created on
+first use, not when this module is imported. ``model`` is still available as a
+module attribute (``from agents.models import model``) and is built on access.
 """
 from dotenv import load_dotenv
 import os
@@ -10,8 +14,8 @@ _CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 _PROJECT_ROOT = os.path.join(_CURRENT_DIR, "../..")
 load_dotenv(os.path.join(_PROJECT_ROOT, ".env"))
 
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
-from langchain_openai import ChatOpenAI
+# Default model, also used to pick the tokenizer family (see agents.utils.token_counter)
+DEFAULT_MODEL_NAME = "claude-opus-4-6"
 
 # Cache for model instances to avoid recreating them
 _model_cache = {}
@@ -34,6 +38,8 @@ def get_model(temperature: float = 0.2):
     if cache_key in _model_cache:
         return _model_cache[cache_key]
 
+    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+
     llm = HuggingFaceEndpoint(
         repo_id="deepseek-ai/DeepSeek-V3.2",
         task="text-generation",
@@ -69,6 +75,8 @@ def get_vision_model(temperature: float = 0.2):
         ... ])
         >>> response = model.invoke([message])
     """
+    from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+
     # Using Qwen-VL as vision model via HuggingFace
     # Configurar modelo via HuggingFace Router
     llm = HuggingFaceEndpoint(
@@ -89,17 +97,36 @@ def get_vision_model(temperature: float = 0.2):
     return model
 
 
-# Default model instance for backward compatibility
-from langchain_azure_ai.chat_models import AzureChatOpenAI
-from langchain_anthropic import ChatAnthropic
+def get_default_model():
+    """
+    Get the default model shared by all agents (Claude via Azure), built on first call.
+
+    Returns:
+        ChatAnthropic: Configured model instance
+    """
+    if "default" in _model_cache:
+        return _model_cache["default"]
+
+    from langchain_anthropic import ChatAnthropic
+
+    model = ChatAnthropic(
+        model=DEFAULT_MODEL_NAME,
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        base_url=os.getenv("AZURE_OPENAI_ENDPOINT")+"anthropic",
+        temperature=0.3
+    )
+
+    _model_cache["default"] = model
+    return model
+
+
+def __getattr__(name: str):
+    # Default model instance for backward compatibility, built on first access
+    if name == "model":
+        return get_default_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-model = ChatAnthropic(
-    model="claude-opus-4-6",
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    base_url=os.getenv("AZURE_OPENAI_ENDPOINT")+"anthropic",
-    temperature=0.3
-)
 
 if __name__ == "__main__":
-    res = model.invoke("Olá!")
+    res = get_default_model().invoke("Olá!")
     print(res.content)
\ No newline at end of file
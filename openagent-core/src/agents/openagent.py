@@ -2,10 +2,6 @@ import sys
 
 sys.path.append(r"C:\Users\caiosmedeiros\Documents\Projetos Pessoais\openagent\openagent-core\src")
 
-import mlflow
-mlflow.set_experiment("OpenAgent Testing")
-mlflow.langchain.autolog()
-
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,7 +11,7 @@ from pydantic import BaseModel, Field
 import os
 
 # Import centralized model configuration
-from agents.models import get_model, get_vision_model, model
+from agents.models import get_default_model, get_model, get_vision_model
 
 from agents.tools import *
 from agents.utils.logging import logger
@@ -45,56 +41,58 @@ from langchain.agents.middleware.types import OmitFromInput
 from typing_extensions import NotRequired
 from langchain.messages import SystemMessage
 from langchain.agents.middleware import FilesystemFileSearchMiddleware
-from operator import add
+from agents.utils.files_manifest import files_manifest_message, merge_files
 from langgraph.prebuilt import tools_condition
-from langgraph.prebuilt import ToolNode
+from agents.utils.nodes.tool_scheduler import scheduled_tool_node
 
 class OpenAgentState(MessagesState):
-    files: Annotated[List[str], add]
+    files: Annotated[List[str], merge_files]
     todos: Annotated[NotRequired[list[Todo]], OmitFromInput]
     browser_initialized: bool = False
 
-from agents.utils.nodes.summarization_node import should_summarize, summarize_messages_node
+from agents.utils.nodes.summarization_node import summarize_edge, summarize_node
 
 builder = StateGraph(OpenAgentState)
 
-tools = [write_file, read_file, shell_tool, write_todos, message]
+tools = [write_file, write_files, edit_file, read_file, read_files, shell_tool, poll_job, wait_job, kill_job, write_todos, message]
 tools.extend(FilesystemFileSearchMiddleware(root_path="/Users/claudiomedeiros/Documents/openagent/openagent-core/src/agents/tests").tools)
 
 
 from agents.utils.message_truncation import truncate_messages
+from agents.utils.prompt_caching import add_cache_breakpoints, get_bound_model, report_cache_usage
 
 def agent(state: OpenAgentState) -> OpenAgentState:
     """Agent node that uses custom browser tools"""
-    llm = model.bind_tools(tools=tools)
+    model = get_default_model()
+    llm = get_bound_model(model, tools)
 
     # Hard truncation safety net - prevents exceeding API token limits
     # messages = truncate_messages(state["messages"])
 
-    response = llm.invoke([SystemMessage(content=sys_prompt.replace("<FILES>", "\n".join(state["files"])))] + state['messages'])
+    # The file manifest goes after the cached prefix so the system prompt never changes
+    messages = add_cache_breakpoints(sys_prompt, state["messages"], model)
+    messages += files_manifest_message(state.get("files"))
+
+    response = llm.invoke(messages)
+    report_cache_usage(response, "openagent")
     return {"messages": [response]}
 
-builder.add_node("summarize", summarize_messages_node)
+builder.add_node("summarize", summarize_node)
 builder.add_node("agent", agent)
-builder.add_node("tools", ToolNode(tools=tools, handle_tool_errors=True))
+builder.add_node("tools", scheduled_tool_node(tools))
 
-builder.add_conditional_edges(START, should_summarize)
+builder.add_conditional_edges(START, summarize_edge)
 builder.add_conditional_edges("agent", tools_condition)
 
 # tools → check if summarization needed before returning to agent
-builder.add_conditional_edges("tools", should_summarize)
+builder.add_conditional_edges("tools", summarize_edge)
 builder.add_edge("summarize", "agent")
 
-from langfuse.langchain import CallbackHandler
-from langchain_azure_ai.callbacks.tracers import AzureAIOpenTelemetryTracer
-
 # callback = CallbackHandler()
 # callback = AzureAIOpenTelemetryTracer(connection_string=os.getenv("AZURE_TRACING_CONNECTION_STRING"))
-import mlflow
+from agents.utils.tracing import setup_tracing
 
-mlflow.set_tracking_uri("http://127.0.0.1:1234")
-mlflow.set_experiment("OpenAgent")
-mlflow.langchain.autolog()
+setup_tracing("OpenAgent")
 
 oa = builder.compile()
 
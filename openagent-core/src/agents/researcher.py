@@ -7,7 +7,7 @@ from langchain.agents.middleware import TodoListMiddleware
 from agents.middleware import SummarizationMiddleware
 
 # Import centralized model configuration
-from agents.models import model
+from agents.models import get_default_model
 
 import os
 _CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,24 +18,18 @@ with open(os.path.join(_CURRENT_DIR, "prompts/researcher_sys_prompt_v0.0.1.md"),
 # Local development workspace root
 
 # MLflow tracing igual ao OpenAgent
-import mlflow
-mlflow.set_tracking_uri("http://127.0.0.1:1234")
-mlflow.set_experiment("Researcher")
-mlflow.langchain.autolog()
+from agents.utils.tracing import setup_tracing
+setup_tracing("Researcher")
 
 root_path = os.path.join(os.path.dirname(__file__), "tests")
 
 from agents.tools import *
 from langgraph.graph import StateGraph, START, MessagesState
 
-# Browser tools from Playwright
-from playwright.async_api import async_playwright
-
 
 # Import necessary types and tools
 from langchain.messages import SystemMessage, AIMessage
 from typing import Dict, Annotated, Optional, Any
-from playwright.async_api import Page, Browser
 from langchain.tools import tool, InjectedState
 from langgraph.types import Command
 import re
@@ -66,13 +60,14 @@ tools = [
 # Initialize browser - this will be None until async initialization
 
 from langgraph.types import Send
+from agents.utils.prompt_caching import add_cache_breakpoints, get_bound_model, report_cache_usage
 
 async def initialize_browser(state: ResearcherState):
-    """Initialize browser asynchronously with stealth mode"""
+    """Start the browser launch in the background; the first tool needing a page waits for it"""
     if not state.get("browser_initialized", False):
         # Initialize the browser manager (singleton)
         manager = await BrowserManager.get_instance()
-        await manager.get_browser()  # Ensure browser is started
+        manager.prewarm()  # Chromium starts while the agent makes its first model call
 
         return {
             "browser_initialized": True,
@@ -82,13 +77,17 @@ async def initialize_browser(state: ResearcherState):
 
 def agent(state: ResearcherState) -> ResearcherState:
     """Agent node that uses custom browser tools"""
-    llm = model.bind_tools(tools=tools)
-    response = llm.invoke([SystemMessage(content=sys_prompt)] + state["messages"])
+    model = get_default_model()
+    llm = get_bound_model(model, tools)
+    response = llm.invoke(add_cache_breakpoints(sys_prompt, state["messages"], model))
+    report_cache_usage(response, "researcher")
     return {"messages": [response]}
 
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
+from agents.utils.nodes.tool_scheduler import scheduled_tool_node
 
-tool_node = ToolNode(tools=tools, handle_tool_errors=True)
+# Calls on the same page run in order, browser calls are capped
+tool_node = scheduled_tool_node(tools)
 
 from agents.utils.nodes import *
 
@@ -96,14 +95,14 @@ builder = StateGraph(ResearcherState)
 
 builder.add_node("tools", tool_node)
 builder.add_node("agent", agent)
-builder.add_node("summarize", summarize_messages_node)
+builder.add_node("summarize", summarize_node)
 builder.add_node("initialize_browser", initialize_browser)
 
 # Initialize browser once at start
 builder.add_edge(START, "initialize_browser")
 
 # After initialization, check if summarization is needed before agent
-builder.add_conditional_edges("initialize_browser", should_summarize)
+builder.add_conditional_edges("initialize_browser", summarize_edge)
 builder.add_edge("summarize", "agent")
 
 # Agent can call tools or finish (END)
@@ -0,0 +1,61 @@
+"""
+Benchmark: per-step bind_tools vs the cached bound model (get_bound_model).
+
+Binds a ChatAnthropic model to a tool set shaped like the agents' (a dozen
+tools with documented args) at every simulated agent step. No network call is
+made. Requires langchain-core and langchain-anthropic; skipped otherwise.
+"""
+import os
+import sys
+import time
+
+src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, src_dir)
+
+try:
+    from langchain_anthropic import ChatAnthropic
+    from langchain_core.tools import tool
+except ImportError as e:
+    print(f"SKIPPED: {e!s}")
+    sys.exit(0)
+
+from agents.utils.prompt_caching import bind_tools_with_cache, clear_bound_models, get_bound_model
+
+
+def make_tool(i: int):
+    @tool(f"tool_{i}", parse_docstring=True)
+    def _tool(file_path: str, start: int = 0, end: int = 100, pattern: str = "") -> str:
+        """Read, search or edit a file of the workspace.
+
+        Args:
+            file_path: Path of the file, relative to the workspace root.
+            start: First line to read.
+            end: Last line to read.
+            pattern: Optional regex used to filter the lines.
+        """
+        return file_path
+    return _tool
+
+
+STEPS = 200
+tools = [make_tool(i) for i in range(12)]
+model = ChatAnthropic(model="claude-sonnet-4-5", api_key="sk-bench")
+
+start = time.perf_counter()
+for _ in range(STEPS):
+    bind_tools_with_cache(model, tools)
+uncached = (time.perf_counter() - start) / STEPS
+
+clear_bound_models()
+start = time.perf_counter()
+for _ in range(STEPS):
+    llm = get_bound_model(model, tools)
+cached = (time.perf_counter() - start) / STEPS
+
+print(f"bind_tools every step : {uncached * 1e6:9.1f} us/step")
+print(f"get_bound_model       : {cached * 1e6:9.1f} us/step")
+print(f"speedup               : {uncached / max(cached, 1e-9):9.1f}x")
+
+ok = get_bound_model(model, tools) is llm and cached < uncached
+print("PASS" if ok else "FAIL")
+sys.exit(0 if ok else 1)
@@ -0,0 +1,119 @@
+"""
+Benchmark: full recount vs per-thread TokenLedger for the summarization trigger.
+
+Simulates a long agent run on a synthetic 10k-message history. After every
+step the trigger check runs, either by recounting the whole history (old
+should_summarize behaviour) or by syncing the ledger (only new messages are
+counted). No external dependencies.
+"""
+import os
+import sys
+import time
+
+src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, src_dir)
+
+from agents.utils.token_ledger import TokenLedger
+
+
+class Message:
+    def __init__(self, content, id):
+        self.content = content
+        self.id = id
+
+
+calls = 0
+
+def count_message(msg) -> int:
+    """Stand-in tokenizer: cost is proportional to the message size."""
+    global calls
+    calls += 1
+    return max(len(msg.content) // 4, 1)
+
+
+def make_history(n: int) -> list:
+    return [Message(f"message {i} " + "lorem ipsum dolor sit amet " * (i % 40 + 1), id=f"m{i}")
+            for i in range(n)]
+
+
+TOTAL_MESSAGES = 10_000
+MESSAGES_PER_STEP = 5  # AIMessage + parallel tool results
+history = make_history(TOTAL_MESSAGES)
+
+# --- Full recount at every step ---
+calls = 0
+start = time.perf_counter()
+full_totals = []
+for end in range(MESSAGES_PER_STEP, TOTAL_MESSAGES + 1, MESSAGES_PER_STEP):
+    full_totals.append(sum(count_message(m) for m in history[:end]))
+full_elapsed = time.perf_counter() - start
+full_calls = calls
+
+# --- Ledger ---
+calls = 0
+ledger = TokenLedger(count_message)
+start = time.perf_counter()
+ledger_totals = []
+for end in range(MESSAGES_PER_STEP, TOTAL_MESSAGES + 1, MESSAGES_PER_STEP):
+    ledger_totals.append(ledger.sync(history[:end]))
+ledger_elapsed = time.perf_counter() - start
+ledger_calls = calls
+
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+print("=" * 60)
+print(f"{TOTAL_MESSAGES} messages, {len(full_totals)} trigger checks")
+print(f"  full recount: {full_elapsed:8.3f}s  {full_calls:>10} counter calls")
+print(f"  ledger:       {ledger_elapsed:8.3f}s  {ledger_calls:>10} counter calls")
+print(f"  speedup:      {full_elapsed / max(ledger_elapsed, 1e-9):8.1f}x")
+print("=" * 60)
+
+check("Same totals at every step", full_totals == ledger_totals)
+check("Each message counted once", ledger_calls == TOTAL_MESSAGES, f"{ledger_calls} calls")
+check("Ledger faster than full recount", ledger_elapsed < full_elapsed)
+
+# --- Removals (summarization) ---
+print("\nRemovals via RemoveMessage")
+calls = 0
+removed = history[:6000]
+kept = history[6000:]
+ledger.remove(m.id for m in removed)
+summary = Message("[CONVERSATION SUMMARY] ...", id="summary")
+after = ledger.sync(kept + [summary])
+expected = sum(count_message(m) for m in kept + [summary])
+check("Total after removal matches recount", after == expected, f"{after} == {expected}")
+
+# --- Out-of-band change (no remove() call) falls back to id diff ---
+calls = 0
+kept = kept[100:]
+after = ledger.sync(kept + [summary])
+check("Reconcile without remove()", after == sum(count_message(m) for m in kept + [summary]))
+
+# --- Message replaced in place under the same id (add_messages) ---
+kept[10] = Message(kept[10].content + " edited " * 50, id=kept[10].id)
+after = ledger.sync(kept[:50])
+check("Replaced message recounted on reconcile", after == sum(count_message(m) for m in kept[:50]))
+kept[49] = Message("short", id=kept[49].id)
+after = ledger.sync(kept[:50])
+check("Replaced last message recounted", after == sum(count_message(m) for m in kept[:50]))
+
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
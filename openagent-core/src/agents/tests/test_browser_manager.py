@@ -0,0 +1,261 @@
+"""
+Standalone test for the browser context pool — no external dependencies.
+Runs the BrowserManager against fake Playwright objects: per-thread
+isolation, LRU page and context eviction, the warm spare context, the
+background prewarm and use from successive event loops.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import time
+import types
+
+# browser_manager logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# playwright_tools/__init__ imports langchain: import the module through a bare package
+browser_pkg = types.ModuleType("oa_browser")
+browser_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools", "playwright_tools")]
+sys.modules["oa_browser"] = browser_pkg
+browser_manager = importlib.import_module("oa_browser.browser_manager")
+
+# ============================================================
+# FAKE PLAYWRIGHT
+# ============================================================
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+        self._handlers = []
+
+    def on(self, event, handler):
+        if event == "close":
+            self._handlers.append(handler)
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            for handler in self._handlers:
+                handler(self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            await page.close()
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        await asyncio.sleep(0.01)
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+LAUNCH_SECONDS = 0.2
+
+
+class FakeChromium:
+    fail_next_launch = False
+
+    async def launch(self, **kwargs):
+        await asyncio.sleep(LAUNCH_SECONDS)
+        if self.fail_next_launch:
+            self.fail_next_launch = False
+            raise RuntimeError("Executable doesn't exist")
+        return FakeBrowser()
+
+
+class FakeSelectors:
+    def __init__(self):
+        self.engines = {}
+
+    async def register(self, name, script):
+        self.engines[name] = script
+
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+    def __init__(self):
+        self.selectors = FakeSelectors()
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+# get_browser imports playwright on the first launch
+playwright_pkg = types.ModuleType("playwright")
+playwright_api = types.ModuleType("playwright.async_api")
+playwright_api.async_playwright = FakePlaywright
+sys.modules["playwright"] = playwright_pkg
+sys.modules["playwright.async_api"] = playwright_api
+
+
+def new_manager(**kwargs):
+    manager = browser_manager.BrowserManager(**kwargs)
+    manager._browser = FakeBrowser()
+    return manager
+
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+async def main():
+    # --- TEST 1: thread isolation ---
+    print("\nTEST 1: One context per thread")
+    manager = new_manager()
+    page_a, page_b = await asyncio.gather(manager.create_page("main", "t1"), manager.create_page("main", "t2"))
+    check("Same title, two pages", page_a is not page_b)
+    check("Each thread sees its own page",
+          manager.get_page("main", "t1") is page_a and manager.get_page("main", "t2") is page_b)
+    check("Separate contexts", page_a.context is not page_b.context)
+    check("Unknown thread has no pages", manager.get_page("main", "t3") is None and manager.list_pages("t3") == [])
+    await manager.create_page("main")
+    check("Calls without thread_id use the default context", manager.list_pages(None) == ["main"])
+
+    same_thread = await asyncio.gather(*(manager.create_page(f"p{i}", "t4") for i in range(3)))
+    check("Concurrent calls of one thread share its context", len({page.context for page in same_thread}) == 1)
+
+    loader = manager.get_page_loader("main", "t1")
+    check("Page loader kept per page", manager.get_page_loader("main", "t1") is loader and loader.page is page_a)
+    replaced = await manager.create_page("main", "t1")
+    check("Re-creating a title closes the old page", page_a.closed and manager.get_page("main", "t1") is replaced)
+    check("New page gets a new loader", manager.get_page_loader("main", "t1").page is replaced)
+
+    # --- TEST 2: page eviction ---
+    print("\nTEST 2: LRU page eviction")
+    manager = new_manager(max_pages=3)
+    pages = {title: await manager.create_page(title, "t1") for title in ("a", "b", "c")}
+    manager.get_page("a", "t1")  # "b" is now the least recently used
+    await manager.create_page("d", "t1")
+    check("Least recently used page closed", pages["b"].closed and not pages["a"].closed)
+    check("Page cap kept", sorted(manager.list_pages("t1")) == ["a", "c", "d"], str(manager.list_pages("t1")))
+    await pages["c"].close()
+    check("Pages closed by the site are forgotten", manager.get_page("c", "t1") is None)
+
+    # --- TEST 3: context eviction and warm spare ---
+    print("\nTEST 3: Context pool")
+    manager = new_manager(max_contexts=2)
+    first = await manager.create_page("main", "t1")
+    await asyncio.sleep(0.05)  # spare context prepared in the background
+    check("Spare context prepared", manager.stats()["spare_ready"])
+    second = await manager.create_page("main", "t2")
+    check("New thread takes the warm context", manager.stats()["warm_contexts"] == 1)
+    manager.get_page("main", "t1")  # t2 is now the least recently used
+    await manager.create_page("main", "t3")
+    check("Least recently used context closed", second.context.closed and not first.context.closed)
+    stats = manager.stats()
+    check("Context cap kept", stats["open_contexts"] == 2 and stats["evicted_contexts"] == 1, str(stats))
+
+    await asyncio.sleep(0.05)
+    browser = manager._browser
+    await manager._close_browser()
+    check("Closing the browser closes every context", all(context.closed for context in browser.contexts))
+    check("Pool emptied", manager.stats()["open_contexts"] == 0 and not manager.stats()["spare_ready"])
+
+    # --- TEST 4: prewarm ---
+    print("\nTEST 4: Background prewarm")
+    manager = browser_manager.BrowserManager()
+    started = time.monotonic()
+    manager.prewarm()
+    check("prewarm() returns immediately", time.monotonic() - started < 0.05)
+    await asyncio.sleep(LAUNCH_SECONDS + 0.1)  # the first model call
+    started = time.monotonic()
+    await manager.create_page("main", "t1")
+    waited = time.monotonic() - started
+    stats = manager.stats()
+    check("First page does not wait for the launch", waited < 0.05, f"{waited:.3f}s")
+    check("Prewarmed context used", stats["warm_contexts"] == 1 and stats["launches"] == 1, str(stats))
+    check("oa-id selector engine registered", "oa-id" in manager._playwright.selectors.engines)
+    check("Hidden startup recorded", stats["hidden_startup_seconds"] >= LAUNCH_SECONDS * 0.9,
+          f"{stats['hidden_startup_seconds']:.2f}s of {stats['prewarm_seconds']:.2f}s")
+    await manager._close_browser()
+
+    manager = browser_manager.BrowserManager()
+    manager.prewarm()
+    await asyncio.sleep(LAUNCH_SECONDS / 2)
+    pages = await asyncio.gather(manager.create_page("main", "t1"), manager.create_page("main", "t2"))
+    stats = manager.stats()
+    check("Early tools wait for the same launch", stats["launches"] == 1, str(stats))
+    check("Partially hidden startup",
+          0 < stats["hidden_startup_seconds"] < stats["prewarm_seconds"], f"{stats['hidden_startup_seconds']:.2f}s")
+    check("Both threads got a context", pages[0].context is not pages[1].context)
+    await manager._close_browser()
+
+    FakePlaywright.chromium.fail_next_launch = True
+    manager = browser_manager.BrowserManager()
+    manager.prewarm()
+    await asyncio.sleep(LAUNCH_SECONDS + 0.1)
+    await manager.create_page("main", "t1")
+    stats = manager.stats()
+    check("Failed prewarm not recorded as hidden startup",
+          "prewarm_seconds" not in stats and "hidden_startup_seconds" not in stats, str(stats))
+    check("Browser launched in the foreground after a failed prewarm", stats["launches"] == 1, str(stats))
+    await manager._close_browser()
+
+
+asyncio.run(main())
+
+
+async def use_manager(manager):
+    page = await manager.create_page("main", "t1")
+    return page, manager._browser, manager._contexts_lock, manager._cleanup_task
+
+# --- TEST 5: event loops ---
+print("\nTEST 5: Successive event loops")
+manager = browser_manager.BrowserManager()
+first = asyncio.run(use_manager(manager))
+second = asyncio.run(use_manager(manager))
+check("Browser of the closed loop dropped and relaunched", second[1] is not first[1]
+      and manager.stats()["launches"] == 2, str(manager.stats()))
+check("Locks and idle monitor recreated for the new loop", second[2] is not first[2] and second[3] is not first[3])
+check("Pages of the new loop served", manager.get_page("main", "t1") is second[0] and manager.list_pages("t1") == ["main"])
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
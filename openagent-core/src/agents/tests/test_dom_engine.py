@@ -0,0 +1,193 @@
+"""
+Browser test for the in-page snapshot engine of dom_snapshot.
+
+Runs DomSnapshots against a real Chromium page (Playwright, set_content
+fixtures): the text walk leaves scripts and styles in the DOM, respects the
+character budget, the main and viewport modes leave out navigation and
+offscreen content, ids survive mutations and the oa-id selector engine
+resolves them. Skipped when Playwright or its Chromium is not installed.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+# dom_snapshot logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# playwright_tools/__init__ imports langchain: import the module through a bare package
+browser_pkg = types.ModuleType("oa_browser")
+browser_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools", "playwright_tools")]
+sys.modules["oa_browser"] = browser_pkg
+dom_snapshot = importlib.import_module("oa_browser.dom_snapshot")
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    print("SKIPPED: playwright is not installed")
+    sys.exit(0)
+
+# ============================================================
+# FIXTURES
+# ============================================================
+
+PAGE = """
+<html><head>
+<style>.hidden { display: none } /* STYLE_TEXT */</style>
+<script>window.headScript = "SCRIPT_TEXT";</script>
+</head><body>
+<header><a href="/">Home</a></header>
+<nav><a href="/a">NavLinkA</a> <a href="/b">NavLinkB</a></nav>
+<div id="content">
+  <h1>Story title</h1>
+  <p>First paragraph of the story.</p>
+  <script>var inlineScript = "SCRIPT_TEXT";</script>
+  <button id="go">Go</button>
+  <span class="hidden"><button id="hidden">Hidden</button></span>
+  <div role="link">RoleLink</div>
+  <input type="text" placeholder="Search">
+</div>
+<div id="far" style="position: absolute; top: 5000px">Far away text <a href="/far">FarLink</a></div>
+<footer>Copyright footer</footer>
+</body></html>
+"""
+
+MAIN_PAGE = """
+<body>
+<nav><a href="/">NavLink</a></nav>
+<main><p>Main landmark text</p></main>
+<aside>Sidebar text</aside>
+</body>
+"""
+
+ARTICLES_PAGE = """
+<body>
+<nav><a href="/">NavLink</a></nav>
+<article><p>Teaser</p></article>
+<article><p>The long article body, longer than the teaser.</p></article>
+</body>
+"""
+
+LONG_PAGE = "<body>" + "".join(f"<p>Paragraph {i} <a href='/{i}'>link {i}</a></p>" for i in range(2000)) + "</body>"
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+async def main(page):
+    # --- TEST 1: non-destructive text walk ---
+    print("\nTEST 1: Text walk")
+    await page.set_content(PAGE)
+    snapshots = dom_snapshot.DomSnapshots(page)
+    before = await page.evaluate("document.querySelectorAll('script, style').length")
+    result = await snapshots.page_text("full", 10_000)
+    text = result["text"]
+    after = await page.evaluate("document.querySelectorAll('script, style').length")
+    check("Scripts and styles still in the DOM", before == after == 3, f"{before} -> {after}")
+    check("Script and style text left out", "SCRIPT_TEXT" not in text and "STYLE_TEXT" not in text, text)
+    check("Text and markers in document order",
+          text.index("[H1] Story title") < text.index("First paragraph") < text.index("[BUTTON #"), text)
+    check("Visible elements marked with their id", "[BUTTON #" in text and "[INPUT:text #" in text, text)
+    check("Not truncated", not result["truncated"])
+
+    # --- TEST 2: shared snapshot ---
+    print("\nTEST 2: Snapshot seeded by the text walk")
+    elements = (await snapshots.page_snapshot())["elements"]
+    check("get_page_elements after extract_page_text needs no walk",
+          snapshots.stats == {"walks": 1, "reused": 1}, str(snapshots.stats))
+    snapshots.invalidate()
+    walked = (await snapshots.page_snapshot())["elements"]
+    check("Seeded snapshot equals a snapshot walk", elements == walked, f"{len(elements)} vs {len(walked)}")
+    check("Hidden elements not listed", "Hidden" not in [el["text"] for el in elements])
+    check("[role=link] listed", "RoleLink" in [el["text"] for el in elements])
+    go = next(el for el in elements if el["text"] == "Go")
+    check("Ids in the text match the snapshot", f"[BUTTON #{go['id']}] Go" in text, text)
+
+    # --- TEST 3: ids and the oa-id selector engine ---
+    print("\nTEST 3: Stable ids")
+    selector = dom_snapshot.element_selector(go["id"])
+    check("oa-id selector resolves the element", await page.locator(selector).inner_text() == "Go")
+    await page.evaluate("document.body.prepend(Object.assign(document.createElement('button'), {textContent: 'New'}))")
+    elements = await snapshots.elements("button")
+    ids = {el["text"]: el["id"] for el in elements}
+    check("Mutation changes the version", snapshots.stats["walks"] == 3, str(snapshots.stats))
+    check("Ids survive the mutation", ids.get("Go") == go["id"] and ids.get("New", -1) > go["id"], str(ids))
+    await page.evaluate("document.getElementById('go').remove()")
+    check("Removed element resolves to nothing", await snapshots.element_info(go["id"]) is None
+          and await page.locator(selector).count() == 0)
+
+    # --- TEST 4: main and viewport modes ---
+    print("\nTEST 4: Modes")
+    await page.set_content(PAGE)
+    snapshots = dom_snapshot.DomSnapshots(page)
+    text = (await snapshots.page_text("main"))["text"]
+    check("main: no header, navigation or footer",
+          "First paragraph" in text and not any(s in text for s in ("Home", "NavLinkA", "Copyright")), text)
+    await page.set_content(MAIN_PAGE)
+    text = (await dom_snapshot.DomSnapshots(page).page_text("main"))["text"]
+    check("main: main landmark only", text == "Main landmark text", text)
+    await page.set_content(ARTICLES_PAGE)
+    text = (await dom_snapshot.DomSnapshots(page).page_text("main"))["text"]
+    check("main: longest article", text.startswith("[ARTICLE] The long article body"), text)
+
+    await page.set_content(PAGE)
+    snapshots = dom_snapshot.DomSnapshots(page)
+    text = (await snapshots.page_text("viewport"))["text"]
+    check("viewport: offscreen content left out", "First paragraph" in text and "Far away" not in text, text)
+    await page.evaluate("window.scrollTo(0, 4900)")
+    text = (await snapshots.page_text("viewport"))["text"]
+    check("viewport: re-read after scrolling", "Far away text" in text and "First paragraph" not in text, text)
+    check("Partial modes do not seed the snapshot", not snapshots._snapshots)
+
+    # --- TEST 5: budget ---
+    print("\nTEST 5: Budget")
+    await page.set_content(LONG_PAGE)
+    snapshots = dom_snapshot.DomSnapshots(page)
+    result = await snapshots.page_text("full", 1000)
+    check("Text within the budget", len(result["text"]) <= 1000 and result["truncated"], str(len(result["text"])))
+    check("Walk stopped early", "Paragraph 1999" not in result["text"] and result["text"].startswith("Paragraph 0"))
+    await snapshots.page_snapshot()
+    check("Truncated text leaves the snapshot to its own walk", snapshots.stats["walks"] == 2, str(snapshots.stats))
+
+
+async def run():
+    async with async_playwright() as playwright:
+        await playwright.selectors.register("oa-id", dom_snapshot.OA_ID_SELECTOR_ENGINE)
+        try:
+            browser = await playwright.chromium.launch()
+        except Exception as e:
+            print(f"SKIPPED: Chromium could not be launched ({str(e).splitlines()[0]})")
+            sys.exit(0)
+        page = await browser.new_page(viewport={"width": 1366, "height": 768})
+        try:
+            await main(page)
+        finally:
+            await browser.close()
+
+
+asyncio.run(run())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
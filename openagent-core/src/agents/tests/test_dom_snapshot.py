@@ -0,0 +1,184 @@
+"""
+Standalone test for the shared DOM snapshots — no external dependencies.
+Runs DomSnapshots against a fake page that plays the in-page engine: reuse
+while the DOM version is unchanged, filtering of the shared snapshot,
+separate walks for other element types and the page text modes.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+# dom_snapshot logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# playwright_tools/__init__ imports langchain: import the module through a bare package
+browser_pkg = types.ModuleType("oa_browser")
+browser_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools", "playwright_tools")]
+sys.modules["oa_browser"] = browser_pkg
+dom_snapshot = importlib.import_module("oa_browser.dom_snapshot")
+
+# ============================================================
+# FAKE PAGE
+# ============================================================
+
+ELEMENTS = [
+    {"id": 0, "tag": "a", "text": "Home"},
+    {"id": 1, "tag": "button", "text": "Search"},
+    {"id": 2, "tag": "div", "text": "Menu"},
+    {"id": 3, "tag": "input", "text": ""},
+]
+
+
+class FakePage:
+    """Answers the engine scripts the way window.__oa does."""
+
+    url = "https://example.com/"
+
+    def __init__(self):
+        self.mutations = 0
+        self.scroll_y = 0
+        self.walks = []
+
+    @property
+    def version(self):
+        return f"doc:{self.mutations}"
+
+    def text_key(self, mode):
+        return f"{self.version}@{self.scroll_y}" if mode == "viewport" else self.version
+
+    async def evaluate(self, script, arg=None):
+        if script is dom_snapshot._VERSION_JS:
+            return self.text_key(arg)
+        if script is dom_snapshot._INFO_JS:
+            return next((el for el in ELEMENTS if el["id"] == arg), None)
+        if script is dom_snapshot._TEXT_JS:
+            if arg["known"] == self.text_key(arg["mode"]):
+                return {"unchanged": True}
+            self.walks.append(f"text:{arg['mode']}")
+            truncated = arg["budget"] < 100
+            snapshot = None
+            if arg["mode"] == "full" and not truncated:
+                snapshot = {"version": self.version, "url": self.url, "elements": list(ELEMENTS)}
+            return {"key": self.text_key(arg["mode"]), "url": self.url, "text": "[LINK #0] Home",
+                    "truncated": truncated, "snapshot": snapshot}
+        if arg["known"] == self.version:
+            return {"unchanged": True}
+        self.walks.append(arg["types"])
+        return {
+            "version": self.version,
+            "url": self.url,
+            "elements": list(ELEMENTS) if arg["types"] == dom_snapshot.SNAPSHOT_TYPES else ELEMENTS[2:3],
+        }
+
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+# --- TEST 1: helpers ---
+print("\nTEST 1: Helpers")
+check("Selector of an id", dom_snapshot.element_selector(12) == "oa-id=12")
+check("Default query answered by the shared snapshot",
+      dom_snapshot._shared_tags("a, button,input") == {"a", "button", "input"})
+check("CSS queries walk on their own", dom_snapshot._shared_tags("[role=tab]") is None
+      and dom_snapshot._shared_tags("div") is None)
+
+
+async def main():
+    # --- TEST 2: reuse ---
+    print("\nTEST 2: Shared snapshot reuse")
+    page = FakePage()
+    snapshots = dom_snapshot.DomSnapshots(page)
+    await snapshots.page_snapshot()
+    elements = await snapshots.elements("a,button,input")
+    check("Default query answered by the shared walk", len(page.walks) == 1, str(page.walks))
+    check("Shared snapshot filtered by tag", [el["id"] for el in elements] == [0, 1, 3], str(elements))
+
+    info = await snapshots.element_info(1)
+    check("Element lookup by id", info["text"] == "Search")
+    check("Unknown id", await snapshots.element_info(42) is None)
+
+    page.mutations += 1
+    await snapshots.elements("a")
+    check("DOM change triggers a new walk", len(page.walks) == 2)
+    check("Version reported", await snapshots.version() == "doc:1")
+
+    # --- TEST 3: other element types ---
+    print("\nTEST 3: Other element types")
+    elements = await snapshots.elements("[role=button]")
+    await snapshots.elements("[role=button]")
+    check("Custom types walked once", page.walks[2:] == ["[role=button]"], str(page.walks))
+    check("Custom types elements", [el["id"] for el in elements] == [2])
+    page.mutations += 1
+    await snapshots.elements("[role=button]")
+    check("Stale snapshots dropped", list(snapshots._snapshots) == ["[role=button]"], str(list(snapshots._snapshots)))
+
+    snapshots.invalidate()
+    await snapshots.page_snapshot()
+    check("invalidate() forces a walk", page.walks[-1] == dom_snapshot.SNAPSHOT_TYPES and snapshots.stats["walks"] == 5,
+          str(snapshots.stats))
+
+    # --- TEST 4: page text ---
+    print("\nTEST 4: Page text")
+    page = FakePage()
+    snapshots = dom_snapshot.DomSnapshots(page)
+    result = await snapshots.page_text("full", 1000)
+    await snapshots.page_text("full", 1000)
+    check("Text reused while the DOM is unchanged", page.walks == ["text:full"] and result["text"] == "[LINK #0] Home",
+          str(page.walks))
+    await snapshots.page_text("full", 2000)
+    check("Other budget, other text", page.walks.count("text:full") == 2)
+    await snapshots.page_text("viewport")
+    page.scroll_y = 800
+    await snapshots.page_text("viewport")
+    check("Viewport text re-read after scrolling", page.walks.count("text:viewport") == 2, str(page.walks))
+    check("Viewport version includes the scroll position",
+          await snapshots.version("viewport") == "doc:0@800" and await snapshots.version() == "doc:0")
+
+    # --- TEST 5: snapshot seeded by the page text ---
+    print("\nTEST 5: Snapshot seeded by the page text")
+    page = FakePage()
+    snapshots = dom_snapshot.DomSnapshots(page)
+    await snapshots.page_text("full", 1000)
+    snapshot = await snapshots.page_snapshot()
+    check("Complete full text seeds the snapshot", page.walks == ["text:full"] and snapshot["elements"] == ELEMENTS
+          and snapshots.stats == {"walks": 1, "reused": 1}, str(page.walks))
+    check("Seeded snapshot serves other types", await snapshots.elements("a") == ELEMENTS[:1] and len(page.walks) == 1)
+    page.mutations += 1
+    await snapshots.page_text("full", 10)
+    await snapshots.page_snapshot()
+    check("Truncated text leaves the snapshot to its own walk", page.walks[-1] == dom_snapshot.SNAPSHOT_TYPES,
+          str(page.walks))
+    page.mutations += 1
+    await snapshots.page_text("main")
+    await snapshots.page_snapshot()
+    check("Partial mode leaves the snapshot to its own walk", page.walks[-1] == dom_snapshot.SNAPSHOT_TYPES)
+
+
+asyncio.run(main())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
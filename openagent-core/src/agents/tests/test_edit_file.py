@@ -0,0 +1,131 @@
+"""
+Standalone test for the edit_file patching logic — no external dependencies.
+Covers search/replace, unified-diff hunks, CRLF files and the atomic,
+hash-checked write.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+patching = importlib.import_module("oa_tools.patching")
+PatchError = patching.PatchError
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+def raises(func, *args) -> str | None:
+    try:
+        func(*args)
+    except PatchError as e:
+        return str(e)
+    return None
+
+
+source = "def f():\n    return 1\n\n\ndef g():\n    return 1\n"
+
+# --- TEST 1: search/replace ---
+print("\nTEST 1: Search/replace")
+result = patching.apply_search_replace(source, "def g():\n    return 1", "def g():\n    return 2")
+check("Unique match replaced", result.text == "def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+check("Changed lines reported", (result.first_line, result.last_line) == (5, 6), f"{result.first_line}-{result.last_line}")
+
+error = raises(patching.apply_search_replace, source, "return 1", "return 2")
+check("Ambiguous match rejected", error is not None and "2 times" in error and "lines 2, 6" in error, error)
+
+result = patching.apply_search_replace(source, "return 1", "return 2", True)
+check("replace_all", result.text.count("return 2") == 2 and result.changes == 2)
+check("replace_all last line", result.last_line == 6, str(result.last_line))
+
+check("Missing text rejected", raises(patching.apply_search_replace, source, "return 3", "x") is not None)
+check("Empty old_string rejected", raises(patching.apply_search_replace, source, "", "x") is not None)
+
+crlf = source.replace("\n", "\r\n")
+result = patching.apply_search_replace(crlf, "def f():\n    return 1", "def f():\n    return 0")
+check("CRLF file edited with LF old_string", result.text == crlf.replace("return 1", "return 0", 1))
+
+# --- TEST 2: unified diff ---
+print("\nTEST 2: Unified diff")
+diff = """--- a/mod.py
++++ b/mod.py
+@@ -1,2 +1,3 @@
+ def f():
+-    return 1
++    # one
++    return 1
+@@ -5,2 +6,2 @@
+ def g():
+-    return 1
++    return 2
+"""
+result = patching.apply_unified_diff(source, diff)
+expected = "def f():\n    # one\n    return 1\n\n\ndef g():\n    return 2\n"
+check("Two hunks applied", result.text == expected and result.changes == 2)
+
+shifted = "# header\n# header\n" + source
+result = patching.apply_unified_diff(shifted, diff)
+check("Hunks located when line numbers are off", result.text == "# header\n# header\n" + expected)
+
+insert = "@@ -6,0 +7,2 @@\n+\n+def h(): pass\n"
+result = patching.apply_unified_diff(source, insert)
+check("Pure insertion at end", result.text == source + "\ndef h(): pass\n")
+
+stale = "@@ -1,2 +1,2 @@\n def f():\n-    return 42\n+    return 43\n"
+check("Non-matching hunk rejected", raises(patching.apply_unified_diff, source, stale) is not None)
+check("Diff without hunks rejected", raises(patching.apply_unified_diff, source, "just text") is not None)
+
+result = patching.apply_unified_diff(crlf, diff)
+check("CRLF preserved by hunks", result.text == expected.replace("\n", "\r\n"))
+
+trailing = "@@ -1,2 +1,2 @@\n def f():  \n-    return 1\n+    return 5\n"
+result = patching.apply_unified_diff(source, trailing)
+check("Trailing whitespace differences tolerated", "return 5" in result.text)
+
+# --- TEST 3: atomic, hash-checked write ---
+print("\nTEST 3: Atomic write")
+tmp_dir = tempfile.mkdtemp()
+path = os.path.join(tmp_dir, "mod.py")
+with open(path, "w", encoding="utf-8") as f:
+    f.write(source)
+os.chmod(path, 0o640)
+digest = patching.sha256_of(path)
+
+patching.atomic_write(path, b"new content\n", expected_sha256=digest)
+with open(path, "rb") as f:
+    check("Content replaced", f.read() == b"new content\n")
+check("Mode preserved", os.stat(path).st_mode & 0o777 == 0o640)
+
+error = raises(patching.atomic_write, path, b"other\n", digest)
+with open(path, "rb") as f:
+    check("Stale hash rejected, file untouched", error is not None and f.read() == b"new content\n")
+check("No temp file left behind", os.listdir(tmp_dir) == ["mod.py"], str(os.listdir(tmp_dir)))
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
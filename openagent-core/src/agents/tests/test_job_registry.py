@@ -0,0 +1,99 @@
+"""
+Standalone test for background shell jobs — no external dependencies.
+Covers incremental output, waiting, killing the process group and the
+registry limits.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+
+# job_registry logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+job_registry = importlib.import_module("oa_tools.job_registry")
+JobError = job_registry.JobError
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+tmp_dir = tempfile.mkdtemp()
+registry = job_registry.JobRegistry(max_running=2, max_finished=2)
+
+# --- TEST 1: output and status ---
+print("\nTEST 1: Incremental output")
+started = time.monotonic()
+job = registry.start("echo one; sleep 0.5; echo two >&2; exit 4", tmp_dir, "t1")
+check("Returns immediately", time.monotonic() - started < 0.3, f"{time.monotonic() - started:.2f}s")
+time.sleep(0.25)
+check("Running status", "running" in job.status(), job.status())
+check("First poll", job.read_new_output() == "one\n")
+check("Nothing new yet", job.read_new_output() == "")
+job.finished.wait(5)
+check("Second poll only has the new output (stderr merged)", job.read_new_output() == "two\n")
+check("Exit code", job.returncode == 4 and "exit code 4" in job.status(), job.status())
+check("Whole output kept", job.read_all_output() == "one\ntwo\n")
+check("Rendered", job.render("x").startswith(f"Job {job.id} (finished with exit code 4"))
+
+# --- TEST 2: kill ---
+print("\nTEST 2: Kill")
+marker = os.path.join(tmp_dir, "child_alive")
+job = registry.start(f"(sleep 2; touch {marker}) & sleep 30", tmp_dir, "t1")
+time.sleep(0.2)
+job.kill()
+check("Killed", job.finished.is_set() and "killed" in job.status(), job.status())
+time.sleep(2.5)
+check("Children killed with the group", not os.path.exists(marker))
+
+# --- TEST 3: registry ---
+print("\nTEST 3: Registry")
+check("Lookup by id", registry.get(job.id, "t1") is job)
+try:
+    registry.get(job.id, "t2")
+    check("Other threads cannot see the job", False)
+except JobError:
+    check("Other threads cannot see the job", True)
+
+running = [registry.start("sleep 30", tmp_dir, "t1") for _ in range(2)]
+try:
+    registry.start("true", tmp_dir, "t1")
+    check("Running jobs bounded", False)
+except JobError:
+    check("Running jobs bounded", True)
+registry.kill_all()
+check("kill_all", all(j.finished.is_set() for j in running))
+
+registry.start("true", tmp_dir, "t1").finished.wait(5)
+# Finished jobs are forgotten when a new one starts: the last one is on top of the limit
+check("Finished jobs bounded", len(registry.list("t1")) == registry.max_finished + 1, str(len(registry.list("t1"))))
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
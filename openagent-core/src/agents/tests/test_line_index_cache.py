@@ -0,0 +1,127 @@
+"""
+Standalone test for the line offset LineIndexCache — no external dependencies.
+Checks invalidation (mtime, size, inode), LRU eviction by index bytes, that
+entries keep no file open, and the repeated-read speedup over re-reading the file.
+"""
+import hashlib
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+cache_module = importlib.import_module("oa_tools.line_index_cache")
+LineIndexCache = cache_module.LineIndexCache
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+tmp_dir = tempfile.mkdtemp()
+
+def write(name: str, text: str) -> str:
+    path = os.path.join(tmp_dir, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return path
+
+
+# --- TEST 1: hits and invalidation ---
+print("\nTEST 1: Hits and invalidation")
+cache = LineIndexCache()
+path = write("a.py", "one\ntwo\nthree\n")
+check("First read", cache.read_lines(path, 2, 3) == (["two", "three"], 3))
+cache.read_lines(path, 1, 1)
+check("Second read is a hit", cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1)
+
+with open(path, "a", encoding="utf-8") as f:
+    f.write("four\n")
+check("Size/mtime change rebuilds", cache.read_lines(path, 4, 4) == (["four"], 4))
+
+# Same size, new inode (editors save through a temp file + rename)
+replacement = write("a.py.tmp", "ONE\nTWO\nTHREE\nFOUR\n")
+os.replace(replacement, path)
+check("Inode change rebuilds", cache.read_lines(path, 1, 1) == (["ONE"], 4))
+
+cache.invalidate(path)
+check("invalidate drops the entry", cache.stats()["entries"] == 0 and cache.stats()["index_bytes"] == 0)
+
+# --- TEST 2: LRU eviction by index bytes ---
+print("\nTEST 2: LRU eviction by index bytes")
+cache = LineIndexCache(max_index_bytes=250)
+paths = [write(f"f{i}.txt", "x\n" * 10) for i in range(4)]  # 10 offsets of 8 bytes each
+for p in paths[:2]:
+    cache.read_lines(p, 1, 1)
+cache.read_lines(paths[0], 1, 1)  # f0 becomes most recent
+cache.read_lines(paths[2], 1, 1)  # 240 bytes, then f3: 320 bytes > 250 evicts f1
+cache.read_lines(paths[3], 1, 1)
+stats = cache.stats()
+check("Budget respected", stats["index_bytes"] <= 250 and stats["evictions"] == 1, str(stats))
+check("Least recently used evicted", paths[1] not in cache._entries and paths[0] in cache._entries)
+
+# --- TEST 3: no file kept open, size cap ---
+print("\nTEST 3: Entries keep no file open")
+cache = LineIndexCache(max_file_bytes=1000)
+path = write("b.txt", "alpha\nbeta\ngamma")
+entry = cache.get(path)
+check("Range bytes", entry.read(1, 3) == b"beta\ngamma")
+check("sha256 from the indexing pass", entry.sha256 == hashlib.sha256(b"alpha\nbeta\ngamma").hexdigest())
+cache.invalidate(path)
+check("Evicted entry still readable", entry.read(0, 1) == b"alpha\n")
+cache.read_lines(path, 1, 1)
+with open(path, "w", encoding="utf-8") as f:
+    f.write("")  # truncate a cached file in place
+check("Truncated file re-indexed", cache.read_lines(path, 1, 10) == ([], 0))
+os.remove(path)
+check("Cached file can be removed", not os.path.exists(path))
+check("Empty file", cache.read_lines(write("empty.txt", ""), 1, 10) == ([], 0))
+check("File above the cap is not mapped", cache.read_lines(write("big.txt", "y\n" * 600), 1, 1) is None)
+
+# --- TEST 4: repeated range reads ---
+print("\nTEST 4: Repeated range reads vs full read + splitlines")
+path = write("module.py", "".join(f"    value_{i} = compute({i}, 'some text')  # comment\n" for i in range(100_000)))
+cache = LineIndexCache()
+ranges = [(i * 997 % 99_000 + 1, i * 997 % 99_000 + 80) for i in range(50)]
+
+start = time.perf_counter()
+for s, e in ranges:
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()[s - 1:e]
+full = time.perf_counter() - start
+
+start = time.perf_counter()
+for s, e in ranges:
+    mapped_lines, _ = cache.read_lines(path, s, e)
+mapped = time.perf_counter() - start
+
+check("Same lines", mapped_lines == lines)
+check("Cached reads faster", mapped < full / 5, f"full={full * 1000:.1f}ms, cached={mapped * 1000:.1f}ms")
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
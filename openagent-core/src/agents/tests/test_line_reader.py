@@ -0,0 +1,155 @@
+"""
+Standalone test for the line reader used by read_file — no external dependencies.
+Compares read_lines against str.splitlines on files of various shapes, through
+both the line offset index and the streaming reader (with a tiny chunk size
+so that lines and ranges cross many chunk boundaries). The streaming reader
+only reports the total line count once a read has reached EOF.
+"""
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+line_reader = importlib.import_module("oa_tools.line_reader")
+line_index_cache = line_reader.line_index_cache
+
+line_reader.CHUNK_SIZE = 64
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+def reference(text: str, start: int, end: int) -> tuple[list[str], int]:
+    lines = [line.rstrip("\n") for line in text.splitlines(keepends=True)]
+    return lines[max(0, start - 1):min(len(lines), end)], len(lines)
+
+
+def matches(result: tuple[list[str], int | None], expected: tuple[list[str], int]) -> bool:
+    """Same lines, and the right total unless the streaming reader has not reached EOF yet."""
+    return result[0] == expected[0] and result[1] in (expected[1], None)
+
+
+tmp_dir = tempfile.mkdtemp()
+
+def write(name: str, text: str) -> str:
+    path = os.path.join(tmp_dir, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return path
+
+
+rng = random.Random(0)
+words = ["alpha", "beta", "gamma", "délta", "ε", "x" * 150, ""]
+body = "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(0, 6))) for _ in range(500))
+
+cases = {
+    "empty": "",
+    "single line, no newline": "hello",
+    "single line": "hello\n",
+    "blank lines": "\n\n\n",
+    "trailing newline": body + "\n",
+    "no trailing newline": body,
+    "long line": "a" * 1000 + "\nb\n" + "c" * 300,
+}
+
+# --- TEST 1: ranges match splitlines ---
+print("\nTEST 1: Ranges match str.splitlines")
+for mode, max_file_bytes in (("indexed", line_index_cache.max_file_bytes), ("streamed", -1)):
+    line_index_cache.max_file_bytes = max_file_bytes
+    for name, text in cases.items():
+        path = write(name.replace(" ", "_") + ".txt", text)
+        n = len(text.splitlines())
+        ranges = [(1, 1), (1, 50), (1, n + 5), (n, n), (n // 2, n // 2 + 7), (n + 1, n + 10)]
+        ranges += [tuple(sorted((rng.randint(1, n + 2), rng.randint(1, n + 2)))) for _ in range(20)]
+        ok = all(matches(line_reader.read_lines(path, s, e), reference(text, s, e)) for s, e in ranges)
+        check(f"{mode}: {name}", ok, f"{n} lines")
+        # Ranges read in order through EOF: the total is known afterwards
+        check(f"{mode}: {name} total", line_reader.read_lines(path, 1, n + 5)[1] == n)
+
+# The rest of the tests exercise the streaming reader
+
+# --- TEST 2: CRLF ---
+print("\nTEST 2: CRLF line endings")
+crlf_path = write("crlf.txt", "one\r\ntwo\r\nthree")
+check("CRLF stripped", line_reader.read_lines(crlf_path, 1, 3) == (["one", "two", "three"], 3))
+
+# --- TEST 3: index invalidated when the file changes ---
+print("\nTEST 3: Index follows file changes")
+path = write("changing.txt", "a\nb\n")
+check("Before change", line_reader.read_lines(path, 1, 10) == (["a", "b"], 2))
+with open(path, "a", encoding="utf-8") as f:
+    f.write("c\nd\n")
+check("After append", line_reader.read_lines(path, 1, 10) == (["a", "b", "c", "d"], 4))
+
+# --- TEST 4: non UTF-8 content raises ---
+print("\nTEST 4: Binary content")
+bin_path = os.path.join(tmp_dir, "bin.dat")
+with open(bin_path, "wb") as f:
+    f.write(b"\xff\xfe\x00binary\n")
+try:
+    line_reader.read_lines(bin_path, 1, 1)
+    check("UnicodeDecodeError raised", False)
+except UnicodeDecodeError:
+    check("UnicodeDecodeError raised", True)
+
+# --- TEST 5: range reads only touch the chunks they need ---
+print("\nTEST 5: Range reads stop early and seek instead of scanning")
+line_reader.CHUNK_SIZE = 1 << 16
+big_path = os.path.join(tmp_dir, "big.log")
+with open(big_path, "w", encoding="utf-8") as f:
+    for i in range(400_000):
+        f.write(f"log line {i} " + "payload " * 8 + "\n")
+
+lines, total = line_reader.read_lines(big_path, 1, 50)
+index = line_reader.get_line_index(big_path)
+check("Cold head range", lines[0].startswith("log line 0 ") and len(lines) == 50)
+check("Cold head range stops in the first chunk", total is None and len(index.newlines_before) == 2,
+      f"{len(index.newlines_before) - 1} chunk(s) scanned")
+
+start = time.perf_counter()
+lines, _ = line_reader.read_lines(big_path, 350_001, 350_050)
+first = time.perf_counter() - start
+check("Tail range content", lines[0].startswith("log line 350000 ") and len(lines) == 50)
+check("File not scanned past the range", line_reader.get_line_index(big_path).total_lines is None)
+
+start = time.perf_counter()
+for _ in range(20):
+    lines, _ = line_reader.read_lines(big_path, 350_001, 350_050)
+tail = (time.perf_counter() - start) / 20
+check("Indexed range read much faster than the first (indexing) read", tail < first / 5,
+      f"first={first * 1000:.1f}ms, indexed={tail * 1000:.2f}ms")
+
+lines, total = line_reader.read_lines(big_path, 399_990, 400_100)
+check("Total known once EOF is reached", total == 400_000 and len(lines) == 11, f"{total}")
+check("Total kept for later reads", line_reader.read_lines(big_path, 1, 1)[1] == 400_000)
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
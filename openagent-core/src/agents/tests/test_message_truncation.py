@@ -5,6 +5,7 @@ Tests the EXACT functions from message_truncation.py.
 """
 import sys
 import os
+import time
 
 # ============================================================
 # Mock classes that match langchain's interface
@@ -48,12 +49,13 @@ sys.modules["langchain_core"] = mock_core
 sys.modules["langchain_core.messages"] = mock_messages
 
 # Now import the actual code
-src_dir = r"C:\Users\caiosmedeiros\Documents\Projetos Pessoais\openagent\openagent-core\src\agents\utils"
+src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.insert(0, src_dir)
 
-from message_truncation import (
+from agents.utils.message_truncation import (
     truncate_messages,
     group_messages,
+    find_cutoff_index,
     _estimate_message_tokens,
     _truncate_message_content,
     MAX_CONTEXT_TOKENS,
@@ -210,6 +212,60 @@ result = truncate_messages(msgs)
 check("Unchanged", len(result) == 2)
 
 
+# --- TEST 9: Cutoff matches a reference reverse scan ---
+print("\nTEST 9: Binary-search cutoff matches reverse scan")
+msgs = [HumanMessage("Start")]
+for i in range(200):
+    msgs.append(AIMessage("", tool_calls=[{"id": f"t{i}", "name": "shell", "args": {"cmd": "y" * (i * 37 % 900)}}]))
+    msgs.extend(ToolMessage("z" * (i * 53 % 1200), tool_call_id=f"t{i}") for _ in range(i % 3 + 1))
+    if i % 7 == 0:
+        msgs.append(AIMessage(f"Step {i} done"))
+
+def reference_cutoff(messages, max_tokens):
+    kept = 0
+    accumulated = 0
+    cutoff = len(messages)
+    for group in reversed(group_messages(messages)):
+        group_tokens = sum(_estimate_message_tokens(m) for m in group)
+        if accumulated + group_tokens > max_tokens and kept:
+            break
+        kept += 1
+        accumulated += group_tokens
+        cutoff -= len(group)
+    return cutoff
+
+mismatches = [b for b in (1, 500, 5_000, 20_000, 60_000) if find_cutoff_index(msgs, b) != reference_cutoff(msgs, b)]
+check("Same cutoff for all budgets", not mismatches, f"mismatched budgets: {mismatches}")
+
+
+# --- BENCHMARK: linear scaling ---
+print("\nBENCHMARK: truncate_messages scaling")
+
+def make_history(n):
+    history = [HumanMessage("Start")]
+    i = 0
+    while len(history) < n:
+        history.append(AIMessage("", tool_calls=[{"id": f"b{i}", "name": "read", "args": {"path": f"f{i}.py"}}]))
+        history.append(ToolMessage(f"result {i} " + "x" * (i % 500), tool_call_id=f"b{i}"))
+        i += 1
+    return history[:n]
+
+per_message = {}
+for n in (1_000, 10_000, 100_000):
+    history = make_history(n)
+    # Budget keeps about half of the history, so the cutoff search is exercised
+    budget = sum(_estimate_message_tokens(m) for m in history) // 2
+    start = time.perf_counter()
+    truncate_messages(history, max_tokens=budget)
+    elapsed = time.perf_counter() - start
+    per_message[n] = elapsed / n
+    print(f"  {n:>7} messages: {elapsed * 1000:8.1f} ms  ({per_message[n] * 1e6:.2f} us/message)")
+
+# Linear: cost per message stays flat (generous bound for noisy machines)
+ratio = per_message[100_000] / per_message[1_000]
+check("Per-message cost roughly constant 1k -> 100k", ratio < 5, f"ratio={ratio:.2f}")
+
+
 # --- SUMMARY ---
 print("\n" + "=" * 60)
 total = passed + failed
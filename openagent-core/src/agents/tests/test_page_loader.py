@@ -0,0 +1,157 @@
+"""
+Standalone test for the navigate_to load profiles — no external dependencies.
+Runs the PageLoader against a fake Playwright page: blocked resource types,
+trackers, routing per profile and the traffic counters of a navigation.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+# page_loader logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# playwright_tools/__init__ imports langchain: import the module through a bare package
+browser_pkg = types.ModuleType("oa_browser")
+browser_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools", "playwright_tools")]
+sys.modules["oa_browser"] = browser_pkg
+page_loader = importlib.import_module("oa_browser.page_loader")
+
+# ============================================================
+# FAKE PLAYWRIGHT
+# ============================================================
+
+# (resource type, url, encoded size) requested by the fake page
+RESOURCES = [
+    ("document", "https://example.com/", 5000),
+    ("stylesheet", "https://example.com/site.css", 2000),
+    ("script", "https://example.com/app.js", 8000),
+    ("image", "https://example.com/hero.jpg", 200000),
+    ("font", "https://fonts.example.com/inter.woff2", 40000),
+    ("script", "https://www.googletagmanager.com/gtm.js", 90000),
+]
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = types.SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def abort(self, reason):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeCDPSession:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def send(self, method):
+        pass
+
+
+class FakePage:
+    def __init__(self, cdp=True):
+        self.route_handler = None
+        self.response_handlers = []
+        self.cdp = FakeCDPSession() if cdp else None
+        self.context = types.SimpleNamespace(new_cdp_session=self._new_cdp_session)
+
+    async def _new_cdp_session(self, page):
+        if self.cdp is None:
+            raise RuntimeError("CDP session is only available in Chromium")
+        return self.cdp
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    async def unroute(self, pattern, handler):
+        self.route_handler = None
+
+    def on(self, event, handler):
+        if event == "response":
+            self.response_handlers.append(handler)
+
+    async def goto(self, url, wait_until, timeout):
+        for resource_type, resource_url, size in RESOURCES:
+            if self.route_handler is not None:
+                route = FakeRoute(resource_type, resource_url)
+                await self.route_handler(route)
+                if route.outcome == "aborted":
+                    continue
+            if self.cdp is not None:
+                self.cdp.handlers["Network.loadingFinished"]({"encodedDataLength": size})
+            for handler in self.response_handlers:
+                handler(types.SimpleNamespace(headers={"content-length": str(size)}))
+        return types.SimpleNamespace(status=200)
+
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+# --- TEST 1: blocking rules ---
+print("\nTEST 1: Blocking rules")
+check("Images blocked in text", page_loader.should_block("text", "image", "https://a.com/x.png"))
+check("Images kept in text+images", not page_loader.should_block("text+images", "image", "https://a.com/x.png"))
+check("Trackers blocked by subdomain", page_loader.should_block("text+images", "script", "https://ssl.google-analytics.com/ga.js"))
+check("Lookalike hosts kept", not page_loader.is_tracker("https://notdoubleclick.net/x.js"))
+check("Nothing blocked in full", not page_loader.should_block("full", "script", "https://doubleclick.net/x.js"))
+
+
+async def main():
+    # --- TEST 2: navigation stats ---
+    print("\nTEST 2: Navigation")
+    page = FakePage()
+    loader = page_loader.PageLoader(page)
+    stats = await loader.goto("https://example.com/", "text", "domcontentloaded")
+    check("Images, fonts and trackers blocked", stats.blocked == 3, str(stats))
+    check("Bytes of loaded resources only", stats.bytes == 15000 and stats.requests == 3, str(stats))
+    check("Status reported", "HTTP 200" in stats.render("text", "domcontentloaded"))
+
+    stats = await loader.goto("https://example.com/", "text+images", "load")
+    check("Counters reset per navigation", stats.blocked == 2 and stats.bytes == 215000, str(stats))
+
+    await loader.goto("https://example.com/", "full", "load")
+    check("full removes the route", page.route_handler is None)
+    await loader.goto("https://example.com/", "text", "load")
+    check("Route restored for text", page.route_handler is not None)
+
+    # --- TEST 3: without CDP ---
+    print("\nTEST 3: Content-Length fallback")
+    page = FakePage(cdp=False)
+    stats = await page_loader.PageLoader(page).goto("https://example.com/", "text", "commit")
+    check("Bytes from Content-Length", stats.bytes == 15000 and stats.requests == 3, str(stats))
+
+
+asyncio.run(main())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
@@ -0,0 +1,188 @@
+"""
+Standalone test for the read_files / write_files batch tools — no external dependencies.
+Covers range merging, duplicate paths, missing files and inverted ranges inside a batch, the
+per-call limit, ordered writes to the same path and the "files" state update.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+# The tools log through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# ============================================================
+# Minimal langchain / langgraph stand-ins (only if not installed)
+# ============================================================
+try:
+    import langchain.tools  # noqa: F401
+    import langchain.messages  # noqa: F401
+    import langgraph.types  # noqa: F401
+except ImportError:
+    class ToolMessage:
+        def __init__(self, content="", tool_call_id="", **kwargs):
+            self.content = content
+            self.tool_call_id = tool_call_id
+
+    class Command:
+        def __init__(self, update=None, **kwargs):
+            self.update = update
+
+    def tool(*args, **kwargs):
+        # Same entry point as StructuredTool: the coroutine attribute
+        return lambda func: types.SimpleNamespace(name=func.__name__, coroutine=func)
+
+    mock_tools = types.ModuleType("langchain.tools")
+    mock_tools.tool = tool
+    mock_tools.InjectedToolCallId = object()
+    mock_messages = types.ModuleType("langchain.messages")
+    mock_messages.ToolMessage = ToolMessage
+    mock_langchain = types.ModuleType("langchain")
+    mock_langchain.tools = mock_tools
+    mock_langchain.messages = mock_messages
+    mock_types = types.ModuleType("langgraph.types")
+    mock_types.Command = Command
+    mock_langgraph = types.ModuleType("langgraph")
+    mock_langgraph.types = mock_types
+    sys.modules.update({
+        "langchain": mock_langchain,
+        "langchain.tools": mock_tools,
+        "langchain.messages": mock_messages,
+        "langgraph": mock_langgraph,
+        "langgraph.types": mock_types,
+    })
+
+# tools/__init__ imports every tool: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+read_files_module = importlib.import_module("oa_tools.read_files")
+write_files_module = importlib.import_module("oa_tools.write_files")
+merge_ranges = read_files_module.merge_ranges
+read_files = read_files_module.read_files.coroutine
+write_files = write_files_module.write_files.coroutine
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+tmp_dir = tempfile.mkdtemp()
+
+def write(name: str, text: str) -> str:
+    path = os.path.join(tmp_dir, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return path
+
+
+def read(path: str) -> str:
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+# --- TEST 1: merge_ranges ---
+print("\nTEST 1: merge_ranges")
+check("Overlapping ranges merged", merge_ranges([(1, 10), (5, 20)]) == [(1, 20)])
+check("Adjacent ranges merged", merge_ranges([(1, 10), (11, 20)]) == [(1, 20)])
+check("Contained range absorbed", merge_ranges([(1, 30), (5, 10)]) == [(1, 30)])
+check("Gaps kept, output sorted", merge_ranges([(40, 50), (1, 10), (12, 20)]) == [(1, 10), (12, 20), (40, 50)])
+
+
+async def main():
+    a = write("a.txt", "".join(f"a{i}\n" for i in range(1, 31)))
+    b = write("b.txt", "b1\nb2\n")
+    missing = os.path.join(tmp_dir, "missing.txt")
+
+    # --- TEST 2: read_files ---
+    print("\nTEST 2: read_files")
+    result = await read_files(
+        [
+            {"file_path": a, "start": 1, "end": 3},
+            {"file_path": missing},
+            {"file_path": a, "start": 2, "end": 5},
+            {"file_path": a, "start": 20, "end": 21},
+            {"file_path": b},
+        ],
+        tool_call_id="call_1",
+    )
+    content = result.update["messages"][0].content
+    sections = content.split("\n\n")
+    check("One section per file, in request order", [s.split(" ")[1] for s in sections] == [a, missing, b],
+          str([s.splitlines()[0] for s in sections]))
+    check("Duplicate ranges merged", f"=== {a} (lines 1-5, 20-21 of 30," in content and content.count("a2\n") == 1)
+    check("Non-contiguous ranges separated", "5→a5\n...\n20→a20" in content)
+    check("Missing file reported in its section", "File does not exist" in sections[1])
+    check("Other files still read", "1→b1\n2→b2" in sections[2])
+    check("files update lists files read only", result.update["files"] == [a, b], str(result.update["files"]))
+    check("ToolMessage answers the call", result.update["messages"][0].tool_call_id == "call_1")
+
+    result = await read_files(
+        [{"file_path": a, "start": 10, "end": 5}, {"file_path": b, "start": 2, "end": 2}],
+        tool_call_id="call_8",
+    )
+    sections = result.update["messages"][0].content.split("\n\n")
+    check("Inverted range reported in its file's section",
+          "Start line (10) cannot be greater than end line (5)" in sections[0] and "a10" not in sections[0], sections[0])
+    check("Other files of the batch still read", "2→b2" in sections[1] and result.update["files"] == [b])
+
+    too_many = await read_files([{"file_path": b}] * 21, tool_call_id="call_2")
+    check("More than 20 specs rejected", isinstance(too_many, str) and "at most 20" in too_many, too_many)
+    check("20 specs accepted", not isinstance(await read_files([{"file_path": b}] * 20, tool_call_id="call_3"), str))
+    check("Empty batch rejected", isinstance(await read_files([], tool_call_id="call_4"), str))
+
+    # --- TEST 3: write_files ---
+    print("\nTEST 3: write_files")
+    c = os.path.join(tmp_dir, "nested", "c.txt")
+    d = os.path.join(tmp_dir, "d.txt")
+    result = await write_files(
+        [
+            {"file_path": c, "content": "first"},
+            {"file_path": d, "content": "dd"},
+            {"file_path": c, "content": "second", "append": True},
+            {"file_path": c, "content": "third", "append": True},
+        ],
+        tool_call_id="call_5",
+    )
+    check("Writes to the same path applied in order", read(c) == "first\nsecond\nthird", repr(read(c)))
+    check("Other file written", read(d) == "dd")
+    check("files update lists each file once", result.update["files"] == [c, d], str(result.update["files"]))
+    check("Summary counts files", result.update["messages"][0].content.startswith("2 of 2 files written"))
+
+    await write_files(
+        [{"file_path": d, "content": "old"}, {"file_path": d, "content": "new"}],
+        tool_call_id="call_6",
+    )
+    check("Later overwrite wins", read(d) == "new")
+
+    too_many = await write_files([{"file_path": d, "content": "x"}] * 21, tool_call_id="call_7")
+    check("More than 20 specs rejected", isinstance(too_many, str) and "at most 20" in too_many, too_many)
+    check("Nothing written when rejected", read(d) == "new")
+
+
+asyncio.run(main())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
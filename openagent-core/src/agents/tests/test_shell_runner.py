@@ -0,0 +1,98 @@
+"""
+Standalone test for the streaming shell runner — no external dependencies.
+Covers the head/tail output cap, exit codes, timeouts (whole process group
+killed) and the synchronous fallback.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+
+# shell_runner logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+shell_runner = importlib.import_module("oa_tools.shell_runner")
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+tmp_dir = tempfile.mkdtemp()
+
+# --- TEST 1: CappedOutput ---
+print("\nTEST 1: Output cap")
+out = shell_runner.CappedOutput(10)
+out.feed(b"abc")
+check("Small output kept whole", out.render() == "abc" and out.dropped == 0)
+
+out = shell_runner.CappedOutput(10)
+for i in range(100):
+    out.feed(f"{i:03d}\n".encode())
+rendered = out.render()
+check("Head kept", rendered.startswith("000\n0"), repr(rendered[:6]))
+check("Tail kept", rendered.endswith("\n099\n"), repr(rendered[-6:]))
+check("Dropped bytes reported", out.dropped == 390 and "[390 bytes omitted]" in rendered, str(out.dropped))
+check("Tail ring buffer bounded", len(out.tail) <= 3, str(len(out.tail)))
+
+# --- TEST 2: run_command ---
+print("\nTEST 2: Streaming execution")
+result = asyncio.run(shell_runner.run_command("echo out; echo err >&2; exit 3", tmp_dir, 10))
+check("Exit code", result.returncode == 3, str(result.returncode))
+check("stdout and stderr captured", result.stdout.render() == "out\n" and result.stderr.render() == "err\n")
+check("Rendered like before", result.render(10) == "Exit code: 3\n\nSTDOUT:\nout\n\n\nSTDERR:\nerr")
+
+result = asyncio.run(shell_runner.run_command("head -c 5000000 /dev/zero | tr '\\0' x", tmp_dir, 30, max_output_bytes=200))
+check("Large output capped", len(result.stdout.render()) < 300 and result.stdout.total == 5_000_000,
+      f"{result.stdout.total} bytes")
+
+result = asyncio.run(shell_runner.run_command("pwd", tmp_dir, 10))
+check("cwd honoured", result.stdout.render().strip() == os.path.realpath(tmp_dir))
+
+# --- TEST 3: timeouts ---
+print("\nTEST 3: Timeouts")
+marker = os.path.join(tmp_dir, "child_alive")
+started = time.monotonic()
+result = asyncio.run(shell_runner.run_command(f"echo before; (sleep 3; touch {marker}) & sleep 30", tmp_dir, 1))
+elapsed = time.monotonic() - started
+check("Timed out on time", result.timed_out and elapsed < 1 + shell_runner.KILL_GRACE_PERIOD + 1, f"{elapsed:.1f}s")
+check("Partial output kept", "before" in result.render(1) and "timed out after 1 seconds" in result.render(1))
+time.sleep(3.5)
+check("Background child killed with the group", not os.path.exists(marker))
+
+# --- TEST 4: synchronous fallback ---
+print("\nTEST 4: Fallback")
+result = shell_runner.run_command_sync("echo sync", tmp_dir, 10)
+check("Fallback output", result.returncode == 0 and result.stdout.render() == "sync\n")
+result = shell_runner.run_command_sync("echo x; sleep 5", tmp_dir, 0.5)
+check("Fallback timeout", result.timed_out)
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
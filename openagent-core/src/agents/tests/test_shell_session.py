@@ -0,0 +1,145 @@
+"""
+Standalone test for persistent shell sessions — no external dependencies
+(POSIX only: sessions run on a PTY).
+Covers state kept between commands, sentinel parsing, interrupts on timeout
+and the session pool.
+"""
+import asyncio
+import importlib
+import os
+import signal
+import sys
+import tempfile
+import time
+import types
+
+# shell_session logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+shell_session = importlib.import_module("oa_tools.shell_session")
+
+if not shell_session.PTY_AVAILABLE:
+    print("SKIPPED: no PTY support on this platform")
+    sys.exit(0)
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+tmp_dir = os.path.realpath(tempfile.mkdtemp())
+os.makedirs(os.path.join(tmp_dir, "sub"))
+
+
+async def main():
+    pool = shell_session.ShellSessionPool(max_sessions=2)
+
+    # --- TEST 1: state kept between commands ---
+    print("\nTEST 1: Persistent state")
+    session = pool.get("t1", "default", tmp_dir)
+    result = await session.run("echo hello", 5)
+    check("Output and exit code", result.returncode == 0 and result.stdout.render() == "hello\n",
+          repr(result.stdout.render()))
+
+    await session.run("cd sub && export OA_TEST=42", 5)
+    result = await session.run("echo $OA_TEST; pwd; ls missing-file", 5)
+    output = result.stdout.render()
+    check("cwd and env kept", output.startswith(f"42\n{tmp_dir}/sub\n"), repr(output))
+    check("stderr merged, exit code of the command", result.returncode != 0 and "missing-file" in output)
+    check("Session cwd tracked", session.cwd == os.path.join(tmp_dir, "sub"), session.cwd)
+
+    result = await session.run("printf 'no newline'", 5)
+    check("Output without trailing newline", result.stdout.render() == "no newline", repr(result.stdout.render()))
+
+    result = await session.run("cat <<'EOF'\nline1\nline2\nEOF", 5)
+    check("Multi-line command (heredoc)", result.stdout.render() == "line1\nline2\n")
+
+    result = await session.run("x=$(cat); echo \"[$x]\"", 5)
+    check("stdin is /dev/null", result.stdout.render() == "[]\n" and not result.timed_out)
+
+    result = await session.run("pwd", 5, cwd=tmp_dir)
+    check("cwd argument moves the session", result.stdout.render() == f"{tmp_dir}\n" and session.cwd == tmp_dir)
+
+    # The shell stops reading: the PTY input buffer fills up
+    os.kill(session.proc.pid, signal.SIGSTOP)
+    resumed = []
+
+    async def resume():
+        await asyncio.sleep(0.3)
+        resumed.append(time.monotonic())
+        os.kill(session.proc.pid, signal.SIGCONT)
+
+    resumer = asyncio.create_task(resume())
+    result = await session.run(f"v='{'x' * 200_000}'; echo ${{#v}}", 10)
+    await resumer
+    check("Long command written without blocking the event loop",
+          resumed and result.stdout.render() == "200000\n", repr(result.stdout.render()[:50]))
+
+    # --- TEST 2: timeouts ---
+    print("\nTEST 2: Timeouts")
+    started = time.monotonic()
+    result = await session.run("echo started; sleep 30", 1)
+    elapsed = time.monotonic() - started
+    check("Interrupted on time", result.timed_out and elapsed < 3, f"{elapsed:.1f}s")
+    check("Partial output kept", "started" in result.stdout.render())
+    result = await session.run("echo $OA_TEST", 5)
+    check("Session survives the interrupt", session.alive and result.stdout.render() == "42\n",
+          repr(result.stdout.render()))
+
+    result = await session.run("trap '' INT; sleep 30", 1)
+    check("Uninterruptible command kills the session", result.timed_out and not session.alive)
+
+    # --- TEST 3: pool ---
+    print("\nTEST 3: Pool")
+    fresh = pool.get("t1", "default", tmp_dir)
+    result = await fresh.run("echo ${OA_TEST:-unset}", 5)
+    check("Dead session replaced by a fresh one", fresh is not session and result.stdout.render() == "unset\n")
+
+    other = pool.get("t1", "build", tmp_dir)
+    started = time.monotonic()
+    await asyncio.gather(fresh.run("sleep 1", 5), other.run("sleep 1", 5))
+    check("Named sessions run in parallel", time.monotonic() - started < 1.8, f"{time.monotonic() - started:.1f}s")
+
+    try:
+        await other.run("exit", 5)
+        check("exit reported", False)
+    except shell_session.ShellSessionError:
+        check("exit reported", True)
+
+    pool.get("t2", "default", tmp_dir)
+    pool.get("t3", "default", tmp_dir)
+    check("Pool bounded", pool.stats()["sessions"] == 2, str(pool.stats()))
+    check("Evicted sessions closed", not fresh.alive)
+
+    pool.close_all()
+    check("close_all", pool.stats()["sessions"] == 0)
+
+
+asyncio.run(main())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
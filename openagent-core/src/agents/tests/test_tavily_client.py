@@ -0,0 +1,131 @@
+"""
+Standalone test for the shared Tavily client — no external dependencies.
+Runs the coalescing layer against a fake tavily SDK: one client per API key
+and event loop, identical concurrent searches sent once, cancellation and
+error responses. test_tavily_http.py runs the real SDK against a stub server.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import types
+
+# tavily_client logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+tavily_client = importlib.import_module("oa_tools.tavily_client")
+
+# ============================================================
+# FAKE SDK
+# ============================================================
+
+
+class FakeAsyncTavilyClient:
+    """Same search() signature as tavily.AsyncTavilyClient."""
+
+    instances = 0
+
+    def __init__(self, api_key, api_base_url=None):
+        FakeAsyncTavilyClient.instances += 1
+        self.api_key = api_key
+        self.api_base_url = api_base_url
+        self.calls = []
+
+    async def search(self, query, max_results=5, **params):
+        self.calls.append((query, max_results, params))
+        if query.startswith("slow"):
+            await asyncio.sleep(0.2)
+        if query == "fail":
+            raise RuntimeError("Unauthorized: missing or invalid API key.")
+        return {"results": [{"title": query, "url": "http://x", "content": "c"}] * max_results}
+
+
+tavily_sdk = types.ModuleType("tavily")
+tavily_sdk.AsyncTavilyClient = FakeAsyncTavilyClient
+sys.modules["tavily"] = tavily_sdk
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+async def main():
+    # --- TEST 1: shared client ---
+    print("\nTEST 1: Shared client")
+    client = tavily_client.get_tavily_client("key-1")
+    check("One SDK client per API key", client is tavily_client.get_tavily_client("key-1") and FakeAsyncTavilyClient.instances == 1)
+    check("Other key, other client", tavily_client.get_tavily_client("key-2").client.api_key == "key-2"
+          and FakeAsyncTavilyClient.instances == 2)
+    other = tavily_client.get_tavily_client("key-1", "http://127.0.0.1:1")
+    check("Other base URL, other client", other is not client and other.client.api_base_url == "http://127.0.0.1:1")
+    sdk = client.client
+
+    # --- TEST 2: coalescing ---
+    print("\nTEST 2: Coalescing")
+    results = await asyncio.gather(*(client.asearch("slow same", max_results=2) for _ in range(4)))
+    check("Identical concurrent searches sent once", len(sdk.calls) == 1 and client.stats["coalesced"] == 3,
+          f"{len(sdk.calls)} requests")
+    check("Every caller gets the result", all(r == results[0] for r in results) and len(results[0]["results"]) == 2)
+
+    await asyncio.gather(client.asearch("slow a"), client.asearch("slow b"), client.asearch("slow a", max_results=3))
+    check("Different arguments not coalesced", len(sdk.calls) == 4, f"{len(sdk.calls)} requests")
+
+    await client.asearch("q")
+    await client.asearch("q")
+    check("Sequential searches not coalesced", len(sdk.calls) == 6 and not client._in_flight)
+
+    # --- TEST 3: cancellation and errors ---
+    print("\nTEST 3: Cancellation and errors")
+    first = asyncio.create_task(client.asearch("slow shared"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(client.asearch("slow shared"))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    result = await second
+    check("Request completes for the others when its starter is cancelled", result["results"][0]["title"] == "slow shared")
+
+    try:
+        await client.asearch("fail")
+        check("SDK error raised", False)
+    except RuntimeError as e:
+        check("SDK error raised", "Unauthorized" in str(e), str(e))
+    await asyncio.sleep(0)
+    check("In-flight entry cleared after an error", not client._in_flight)
+
+
+asyncio.run(main())
+
+
+async def client_of_new_loop():
+    return tavily_client.get_tavily_client("key-1")
+
+print("\nTEST 4: Event loops")
+first, second = asyncio.run(client_of_new_loop()), asyncio.run(client_of_new_loop())
+check("One client per event loop", first is not second and first.client is not second.client)
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
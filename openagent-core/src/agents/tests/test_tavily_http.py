@@ -0,0 +1,151 @@
+"""
+Test of the shared Tavily client over HTTP.
+
+Runs the real tavily-python SDK, pointed through its base URL at a local stub
+HTTP server: searches reuse one keep-alive connection, identical concurrent
+searches send one HTTP request, error responses and a new event loop.
+Skipped when tavily-python is not installed.
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# tavily_client logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# tools/__init__ imports langchain: import the modules through a bare package
+tools_pkg = types.ModuleType("oa_tools")
+tools_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")]
+sys.modules["oa_tools"] = tools_pkg
+tavily_client = importlib.import_module("oa_tools.tavily_client")
+
+try:
+    import tavily  # noqa: F401
+except ImportError:
+    print("SKIPPED: tavily-python is not installed")
+    sys.exit(0)
+
+# ============================================================
+# STUB SERVER
+# ============================================================
+server_stats = {"requests": 0, "connections": set(), "auth": None, "path": None}
+stats_lock = threading.Lock()
+
+
+class StubTavily(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with stats_lock:
+            server_stats["requests"] += 1
+            # One client port per TCP connection
+            server_stats["connections"].add(self.client_address)
+            server_stats["auth"] = self.headers.get("Authorization")
+            server_stats["path"] = self.path
+        if body["query"] == "fail":
+            status, payload = 401, {"detail": {"error": "Unauthorized: missing or invalid API key."}}
+        else:
+            if body["query"].startswith("slow"):
+                time.sleep(0.3)
+            status, payload = 200, {"results": [{"title": body["query"], "url": "http://x", "content": "c"}] * body["max_results"]}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubTavily)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/api"
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+async def main():
+    client = tavily_client.get_tavily_client("key-1", BASE_URL)
+
+    # --- TEST 1: keep-alive ---
+    print("\nTEST 1: Keep-alive")
+    results = [await client.asearch(f"q{i}", max_results=2) for i in range(5)]
+    check("Results parsed", all(len(r["results"]) == 2 for r in results) and results[3]["results"][0]["title"] == "q3")
+    check("Sequential searches share one connection", server_stats["requests"] == 5 and len(server_stats["connections"]) == 1,
+          f"{server_stats['requests']} requests, {len(server_stats['connections'])} connections")
+    check("API key sent as bearer token", server_stats["auth"] == "Bearer key-1")
+    check("Base URL path kept", server_stats["path"] == "/api/search", server_stats["path"])
+
+    # --- TEST 2: coalescing ---
+    print("\nTEST 2: Coalescing")
+    before = server_stats["requests"]
+    results = await asyncio.gather(*(client.asearch("slow same") for _ in range(4)))
+    check("Identical concurrent searches send one HTTP request", server_stats["requests"] - before == 1,
+          f"{server_stats['requests'] - before} requests")
+    check("Every caller gets the result", all(r == results[0] for r in results))
+    check("Still one connection", len(server_stats["connections"]) == 1, f"{len(server_stats['connections'])} connections")
+
+    before = server_stats["requests"]
+    await asyncio.gather(client.asearch("slow a"), client.asearch("slow b"))
+    check("Different searches not coalesced", server_stats["requests"] - before == 2)
+
+    # --- TEST 3: errors ---
+    print("\nTEST 3: Errors")
+    try:
+        await client.asearch("fail")
+        check("HTTP error raised", False)
+    except Exception as e:
+        check("HTTP error raised", "Unauthorized" in str(e), f"{type(e).__name__}: {e}")
+    await asyncio.sleep(0)
+    check("In-flight entry cleared after an error", not client._in_flight)
+    return client
+
+
+first = asyncio.run(main())
+
+
+async def search_on_new_loop():
+    client = tavily_client.get_tavily_client("key-1", BASE_URL)
+    return client, await client.asearch("new loop")
+
+# --- TEST 4: event loops ---
+print("\nTEST 4: Event loops")
+second, result = asyncio.run(search_on_new_loop())
+check("New event loop, new client", second is not first and second.client is not first.client)
+check("Search on the new loop succeeds", result["results"][0]["title"] == "new loop")
+
+server.shutdown()
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
@@ -0,0 +1,157 @@
+"""
+Standalone test for the tool result cache — no external dependencies.
+Covers validators, per-thread keys, TTL and size eviction, the persistent
+store and cache hits through the tool scheduler.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+
+# tool_cache logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# utils/nodes/__init__ imports langchain: import the modules through a bare package
+nodes_pkg = types.ModuleType("oa_nodes")
+nodes_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils", "nodes")]
+sys.modules["oa_nodes"] = nodes_pkg
+tool_cache = importlib.import_module("oa_nodes.tool_cache")
+tool_scheduler = importlib.import_module("oa_nodes.tool_scheduler")
+CachePolicy = tool_cache.CachePolicy
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+class FakeToolMessage:
+    """Enough of ToolMessage for the cache (content, ids, model_copy)."""
+
+    def __init__(self, content, tool_call_id, id=None, status="success"):
+        self.content = content
+        self.tool_call_id = tool_call_id
+        self.id = id
+        self.status = status
+
+    def model_copy(self, update):
+        return FakeToolMessage(**{**vars(self), **update})
+
+
+version = {"value": 1}
+
+
+async def validator(args, thread_key):
+    return version["value"]
+
+
+async def main():
+    cache = tool_cache.ToolResultCache(persist_path=None)
+    cache.mark_idempotent("read", CachePolicy(ttl=60, validator=validator))
+    cache.mark_idempotent("search", CachePolicy(ttl=60, shared=True))
+
+    # --- TEST 1: keys ---
+    print("\nTEST 1: Keys")
+    key = await cache.key("t1", "read", {"path": "a", "start": 1})
+    check("Same call, same key", key == await cache.key("t1", "read", {"start": 1, "path": "a"}))
+    check("Other thread, other key", key != await cache.key("t2", "read", {"path": "a", "start": 1}))
+    check("Shared policy ignores the thread",
+          await cache.key("t1", "search", {"q": "x"}) == await cache.key("t2", "search", {"q": "x"}))
+    check("Not idempotent: no key", await cache.key("t1", "write", {"path": "a"}) is None)
+
+    # --- TEST 2: hits, validators, TTL ---
+    print("\nTEST 2: Lookups")
+    check("Miss", cache.get(key, "read") is None)
+    cache.put(key, "read", FakeToolMessage("content v1", "call-1", id="msg-1"))
+    check("Hit", cache.get(key, "read").content == "content v1")
+    cache.put(await cache.key("t1", "read", {"path": "err"}), "read", FakeToolMessage("Error: nope", "c"))
+    cache.put(await cache.key("t1", "read", {"path": "err2"}), "read", FakeToolMessage("x", "c", status="error"))
+    check("Errors not stored", cache.stats()["entries"] == 1, str(cache.stats()["entries"]))
+
+    version["value"] = 2
+    new_key = await cache.key("t1", "read", {"path": "a", "start": 1})
+    check("Changed resource misses", new_key != key and cache.get(new_key, "read") is None)
+
+    short = tool_cache.ToolResultCache(persist_path=None)
+    short.mark_idempotent("read", CachePolicy(ttl=0.1))
+    short_key = await short.key("t1", "read", {})
+    short.put(short_key, "read", FakeToolMessage("x", "c"))
+    time.sleep(0.15)
+    check("Expired after TTL", short.get(short_key, "read") is None and short.stats()["entries"] == 0)
+
+    stats = cache.stats()
+    check("Hit rate", stats["hits"] == 1 and stats["misses"] == 2 and abs(stats["hit_rate"] - 1 / 3) < 1e-9, str(stats))
+
+    # --- TEST 3: size eviction ---
+    print("\nTEST 3: Eviction")
+    small = tool_cache.ToolResultCache(max_entries=2, max_bytes=20, persist_path=None)
+    small.mark_idempotent("read", CachePolicy(ttl=60))
+    keys = [await small.key("t1", "read", {"i": i}) for i in range(4)]
+    for i, k in enumerate(keys[:3]):
+        small.put(k, "read", FakeToolMessage(f"result {i}", "c"))
+    check("Limits evict the oldest", small.get(keys[0], "read") is None and small.stats()["bytes"] <= 20,
+          str(small.stats()))
+    small.get(keys[1], "read")
+    small.put(keys[3], "read", FakeToolMessage("r3", "c"))
+    check("Least recently used evicted first", small.get(keys[1], "read") is not None and small.get(keys[2], "read") is None)
+
+    # --- TEST 4: persistent store ---
+    print("\nTEST 4: Persistent store")
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    disk = tool_cache.ToolResultCache(persist_path=path)
+    disk.mark_idempotent("search", CachePolicy(ttl=60, shared=True, persistent=True))
+    disk_key = await disk.key("t1", "search", {"q": "x"})
+    disk.put(disk_key, "search", FakeToolMessage("results", "call-1"))
+    reopened = tool_cache.ToolResultCache(persist_path=path)
+    reopened.mark_idempotent("search", CachePolicy(ttl=60, shared=True, persistent=True))
+    check("Survives a restart (as its content)", reopened.get(disk_key, "search") == "results")
+
+    # --- TEST 5: through the scheduler ---
+    print("\nTEST 5: Scheduler")
+    scheduler = tool_scheduler.ToolScheduler(cache=cache)
+    runs = []
+
+    async def execute(req):
+        runs.append(req.tool_call["id"])
+        return FakeToolMessage(f"read {req.tool_call['args']['path']}", req.tool_call["id"], id=f"msg-{len(runs)}")
+
+    def request(call_id, thread_id="t1"):
+        return types.SimpleNamespace(
+            tool_call={"name": "read", "args": {"path": "z"}, "id": call_id},
+            runtime=types.SimpleNamespace(config={"configurable": {"thread_id": thread_id}}),
+        )
+
+    first = await scheduler.awrap_tool_call(request("call-a"), execute)
+    second = await scheduler.awrap_tool_call(request("call-b"), execute)
+    check("Second call served from the cache", runs == ["call-a"] and second.content == first.content)
+    check("Cached result answers the new call", second.tool_call_id == "call-b" and second.id is None)
+    await scheduler.awrap_tool_call(request("call-c", thread_id="t2"), execute)
+    check("Other thread runs the tool", runs == ["call-a", "call-c"])
+
+
+asyncio.run(main())
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
@@ -0,0 +1,179 @@
+"""
+Standalone test for the tool scheduling policy — no external dependencies.
+Covers resource keys, per-resource serialization, per-class caps (and the
+uncapped job tools) and latency stats, through fake ToolNode requests.
+"""
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+# tool_scheduler logs through agents.utils.logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# utils/nodes/__init__ imports langchain: import the module through a bare package
+nodes_pkg = types.ModuleType("oa_nodes")
+nodes_pkg.__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils", "nodes")]
+sys.modules["oa_nodes"] = nodes_pkg
+tool_scheduler = importlib.import_module("oa_nodes.tool_scheduler")
+
+# ============================================================
+# TESTS
+# ============================================================
+passed = 0
+failed = 0
+
+def check(name, condition, detail=""):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"  PASS: {name}" + (f" ({detail})" if detail else ""))
+    else:
+        failed += 1
+        print(f"  FAIL: {name}" + (f" ({detail})" if detail else ""))
+
+
+def request(name: str, **args):
+    return types.SimpleNamespace(tool_call={"name": name, "args": args, "id": f"call-{name}"})
+
+
+# --- TEST 1: resource keys ---
+print("\nTEST 1: Resource keys")
+keys = tool_scheduler.resource_keys({"page_title": "docs"})
+check("page_title", keys == [("page", "docs")], str(keys))
+check("Same page title in two threads",
+      tool_scheduler.resource_keys({"page_title": "docs"}, "t1") != tool_scheduler.resource_keys({"page_title": "docs"}, "t2"))
+workspace = os.path.join(os.path.abspath(os.sep), "workspace")
+tool_scheduler.WORKSPACE_ROOT = workspace
+keys = tool_scheduler.resource_keys({"files": [{"file_path": "b.py"}, {"file_path": "./a.py"}, {"file_path": "b.py"}]})
+check("Batch files, normalized, deduplicated, sorted",
+      keys == [("file", os.path.normcase(os.path.join(workspace, name))) for name in ("a.py", "b.py")], str(keys))
+check("Relative path resolved against the workspace root",
+      tool_scheduler.resource_keys({"file_path": "foo.py"})
+      == tool_scheduler.resource_keys({"file_path": os.path.join(workspace, "sub", "..", "foo.py")}))
+check("No resources", tool_scheduler.resource_keys({"query": "x"}) == [])
+
+# --- TEST 2: async policy ---
+print("\nTEST 2: Async scheduling")
+
+
+async def async_policy():
+    scheduler = tool_scheduler.ToolScheduler(class_limits={"browser": 2, "default": 8})
+    running = {"browser": 0, "max_browser": 0}
+    events = []
+
+    async def execute(req):
+        name = req.tool_call["name"]
+        args = req.tool_call["args"]
+        if scheduler.tool_class(name) == "browser":
+            running["browser"] += 1
+            running["max_browser"] = max(running["max_browser"], running["browser"])
+        events.append(("start", args.get("page_title") or args.get("file_path")))
+        await asyncio.sleep(0.2)
+        events.append(("end", args.get("page_title") or args.get("file_path")))
+        if scheduler.tool_class(name) == "browser":
+            running["browser"] -= 1
+        return types.SimpleNamespace(status="error" if args.get("fail") else "success")
+
+    started = time.monotonic()
+    await asyncio.gather(
+        scheduler.awrap_tool_call(request("navigate_to", page_title="a"), execute),
+        scheduler.awrap_tool_call(request("extract_page_text", page_title="a"), execute),
+        scheduler.awrap_tool_call(request("navigate_to", page_title="b"), execute),
+        scheduler.awrap_tool_call(request("navigate_to", page_title="c"), execute),
+        scheduler.awrap_tool_call(request("read_file", file_path="x.py"), execute),
+        scheduler.awrap_tool_call(request("read_file", file_path="y.py", fail=True), execute),
+    )
+    elapsed = time.monotonic() - started
+
+    a_events = [kind for kind, target in events if target == "a"]
+    check("Same page serialized", a_events == ["start", "end", "start", "end"], str(a_events))
+    check("Browser class capped", running["max_browser"] == 2, str(running["max_browser"]))
+    check("Independent calls overlap", elapsed < 0.7, f"{elapsed:.2f}s")
+
+    stats = scheduler.stats()
+    check("Latency recorded per tool", stats["navigate_to"]["calls"] == 3 and stats["read_file"]["calls"] == 2)
+    check("Errors counted", stats["read_file"]["errors"] == 1)
+    check("Queue wait recorded", stats["extract_page_text"]["avg_wait_seconds"] >= 0.15,
+          f"{stats['extract_page_text']['avg_wait_seconds']:.2f}s")
+    check("Slowest tool first", next(iter(stats)) == "navigate_to", str(list(stats)))
+
+
+asyncio.run(async_policy())
+# Primitives are per event loop: a second loop must work too
+asyncio.run(async_policy())
+
+
+async def job_tools():
+    scheduler = tool_scheduler.ToolScheduler()
+    release = asyncio.Event()
+    finished = []
+
+    async def execute(req):
+        if req.tool_call["name"] == "wait_job":
+            await release.wait()
+        finished.append(req.tool_call["name"])
+        return types.SimpleNamespace(status="success")
+
+    waits = [asyncio.create_task(scheduler.awrap_tool_call(request("wait_job", job_id=str(i)), execute))
+             for i in range(tool_scheduler.CLASS_LIMITS["shell"] + 2)]
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(asyncio.gather(
+        scheduler.awrap_tool_call(request("shell_tool", command="ls"), execute),
+        scheduler.awrap_tool_call(request("poll_job", job_id="0"), execute),
+        scheduler.awrap_tool_call(request("kill_job", job_id="0"), execute),
+    ), 1)
+    check("shell_tool, poll_job and kill_job not blocked by waits", finished == ["shell_tool", "poll_job", "kill_job"],
+          str(finished))
+    release.set()
+    await asyncio.gather(*waits)
+    check("Waits complete", finished.count("wait_job") == len(waits))
+
+# --- TEST 3: job tools ---
+print("\nTEST 3: Job tools")
+asyncio.run(job_tools())
+
+# --- TEST 4: sync policy ---
+print("\nTEST 4: Sync scheduling")
+scheduler = tool_scheduler.ToolScheduler()
+active = []
+overlaps = []
+guard = threading.Lock()
+
+
+def execute(req):
+    path = req.tool_call["args"]["file_path"]
+    with guard:
+        if path in active:
+            overlaps.append(path)
+        active.append(path)
+    time.sleep(0.1)
+    with guard:
+        active.remove(path)
+    return "ok"
+
+
+with ThreadPoolExecutor(8) as pool:
+    results = list(pool.map(
+        lambda req: scheduler.wrap_tool_call(req, execute),
+        [request("edit_file", file_path="same.py") for _ in range(4)] + [request("read_file", file_path="other.py")],
+    ))
+check("Results passed through", results == ["ok"] * 5)
+check("Same file never run twice at once", not overlaps, str(overlaps))
+check("Sync calls recorded", scheduler.stats()["edit_file"]["calls"] == 4)
+
+
+# --- SUMMARY ---
+print("\n" + "=" * 60)
+total = passed + failed
+if failed == 0:
+    print(f"ALL {passed} CHECKS PASSED")
+else:
+    print(f"{passed}/{total} checks passed, {failed} FAILED")
+print("=" * 60)
+
+sys.exit(1 if failed > 0 else 0)
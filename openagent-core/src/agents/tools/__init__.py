@@ -1,9 +1,14 @@
 from .write_file import write_file
 from .read_file import read_file
+from .edit_file import edit_file
+from .read_files import read_files
+from .write_files import write_files
 from .run_shell import shell_tool
+from .shell_jobs import poll_job, wait_job, kill_job
 from .write_todos import write_todos
 from .task import message
 from .search_web import search_web
 from .playwright_tools import *
+from . import cache_policies  # registers the idempotent tools in the tool result cache
 
-__all__ = ["read_file", "write_file", "shell_tool", "write_todos", "message", "search_web", "create_new_page", "extract_page_text", "BrowserManager", "navigate_to", "capture_screenshot", "click_element", "click_element_by_index", "get_page_elements", "refresh_page_elements", "fill_input"]
\ No newline at end of file
+__all__ = ["read_file", "write_file", "edit_file", "read_files", "write_files", "shell_tool", "poll_job", "wait_job", "kill_job", "write_todos", "message", "search_web", "create_new_page", "extract_page_text", "BrowserManager", "navigate_to", "capture_screenshot", "click_element", "click_element_by_index", "get_page_elements", "refresh_page_elements", "fill_input"]
\ No newline at end of file
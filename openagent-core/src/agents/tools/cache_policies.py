@@ -0,0 +1,63 @@
+"""
+Idempotent tools whose results the tool scheduler may reuse.
+
+Each policy has a validator describing the state of what the call reads:
+- files: (path, inode, mtime, size) of every file, so any write invalidates
+- pages: URL and DOM version (document id + mutation count, see
+  playwright_tools/dom_snapshot.py), so navigation or DOM changes invalidate
+
+Web searches have no validator; they are shared by all threads, expire after
+SEARCH_CACHE_TTL and are kept on disk when OPENAGENT_TOOL_CACHE_PATH is set.
+"""
+import asyncio
+import os
+
+from agents.utils.nodes.tool_cache import CachePolicy, mark_idempotent
+
+from .playwright_tools.browser_manager import BrowserManager, DEFAULT_THREAD
+
+# Workspace root - consistent with coder.py and shell_tool
+WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
+
+FILE_CACHE_TTL = 10 * 60
+PAGE_CACHE_TTL = 5 * 60
+SEARCH_CACHE_TTL = float(os.getenv("OPENAGENT_SEARCH_CACHE_TTL", 60 * 60))
+
+
+def _file_state(file_path: str) -> list | None:
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(WORKSPACE_ROOT, file_path)
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        # Missing file: the error message is not worth caching
+        return None
+    return [file_path, st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+async def files_validator(args: dict, thread_key: str) -> list | None:
+    """State of the file(s) read by read_file / read_files."""
+    paths = [args["file_path"]] if args.get("file_path") else [
+        spec.get("file_path") for spec in args.get("files") or [] if isinstance(spec, dict)
+    ]
+    if not paths or not all(paths):
+        return None
+    states = await asyncio.to_thread(lambda: [_file_state(path) for path in paths])
+    return None if any(state is None for state in states) else states
+
+
+async def page_validator(args: dict, thread_key: str) -> list | None:
+    """URL and DOM version of the page read by extract_page_text."""
+    manager = await BrowserManager.get_instance()
+    # Pages belong to the browser context of their thread
+    snapshots = manager.get_page_snapshots(args.get("page_title", ""), None if thread_key == DEFAULT_THREAD else thread_key)
+    if snapshots is None:
+        return None
+    # The viewport text also depends on the scroll position
+    return [snapshots.page.url, await snapshots.version(args.get("mode", "full"))]
+
+
+mark_idempotent("read_file", CachePolicy(ttl=FILE_CACHE_TTL, validator=files_validator))
+mark_idempotent("read_files", CachePolicy(ttl=FILE_CACHE_TTL, validator=files_validator))
+mark_idempotent("extract_page_text", CachePolicy(ttl=PAGE_CACHE_TTL, validator=page_validator))
+mark_idempotent("search_web", CachePolicy(ttl=SEARCH_CACHE_TTL, shared=True, persistent=True))
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import os
+from langchain.tools import tool, InjectedToolCallId
+from langchain.messages import ToolMessage
+from langgraph.types import Command
+from agents.utils.logging import logger
+
+from typing import Annotated
+
+from .line_reader import HASH_CHARS, invalidate_line_index, short_sha256
+from .patching import PatchError, apply_search_replace, apply_unified_diff, atomic_write
+
+# Workspace root - consistent with coder.py and shell_tool
+WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
+
+
+def _edit(file_path: str, old_string: str, new_string: str, replace_all: bool, diff: str, expected_sha256: str) -> str:
+    """Apply the edit and return the confirmation. Raises PatchError, OSError or UnicodeDecodeError."""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    current = hashlib.sha256(data).hexdigest()
+
+    expected = expected_sha256.strip().lower()[:HASH_CHARS]
+    if expected and not current.startswith(expected):
+        raise PatchError(
+            f"The file changed since it was read (sha256 {short_sha256(current)}, "
+            f"expected {expected}). Read it again before editing."
+        )
+
+    text = data.decode("utf-8")
+    if diff:
+        result = apply_unified_diff(text, diff)
+        what = f"{result.changes} hunk(s) applied"
+    else:
+        result = apply_search_replace(text, old_string, new_string, replace_all)
+        what = f"{result.changes} replacement(s)"
+
+    new_data = result.text.encode("utf-8")
+    if new_data == data:
+        return f"No changes: the edit leaves {file_path} unchanged (sha256 {short_sha256(current)})."
+
+    # Drop the cached line offsets before replacing the file
+    invalidate_line_index(file_path)
+    atomic_write(file_path, new_data, expected_sha256=current)
+
+    new_sha = hashlib.sha256(new_data).hexdigest()
+    return (
+        f"Edited {file_path}: {what}, lines {result.first_line}-{result.last_line}. "
+        f"sha256 {short_sha256(new_sha)}"
+    )
+
+
+@tool(parse_docstring=True)
+async def edit_file(
+    file_path: str,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    old_string: str = "",
+    new_string: str = "",
+    replace_all: bool = False,
+    diff: str = "",
+    expected_sha256: str = "",
+) -> str:
+    """
+    Edits a file in place without resending its whole content.
+
+    Either replaces old_string with new_string, or applies the hunks of a unified diff.
+
+    Args:
+        file_path: Path to the file to edit
+        old_string: Exact text to replace. Must occur only once in the file unless replace_all is true
+        new_string: Text that replaces old_string
+        replace_all: If True, replaces every occurrence of old_string
+        diff: Unified diff hunks (starting with @@ -a,b +c,d @@) to apply instead of old_string/new_string
+        expected_sha256: The sha256 reported by read_file. The edit is rejected if the file changed since
+    """
+    # Resolve relative paths against workspace root
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(WORKSPACE_ROOT, file_path)
+
+    try:
+        logger.debug(f"Attempting to edit file: {file_path}")
+        message = await asyncio.to_thread(
+            _edit, file_path, old_string, new_string, replace_all, diff, expected_sha256
+        )
+        logger.debug(f"Successfully edited file: {file_path}")
+        return Command(
+            update={
+                "messages": [ToolMessage(content=message, tool_call_id=tool_call_id)],
+                "files": [file_path]
+            }
+        )
+
+    except PatchError as e:
+        return f"Edit not applied to {file_path}: {str(e)}"
+    except FileNotFoundError:
+        return f"File {file_path} does not exist. Use write_file to create it."
+    except PermissionError as e:
+        logger.error(f"Permission denied when editing file {file_path}: {str(e)}")
+        return f"Permission denied to edit {file_path}"
+    except Exception as e:
+        logger.error(f"Error editing file {file_path}: {str(e)}", exc_info=True)
+        return f"Error editing file {file_path}:\n{str(e)}"
@@ -0,0 +1,167 @@
+"""
+Background shell jobs.
+
+``shell_tool(background=True)`` starts the command here and returns a job id
+right away, so the agent can keep working while a test suite or a build runs.
+poll_job / wait_job / kill_job look the job up in the process-wide registry.
+
+Each job is a process in its own process group whose merged stdout/stderr is
+read by a daemon thread (jobs outlive the event loop step that started them).
+Output is kept twice, both capped: head + tail of everything, and the output
+produced since the last poll.
+"""
+
+import atexit
+import itertools
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+from agents.utils.logging import logger
+
+from .shell_runner import KILL_GRACE_PERIOD, MAX_OUTPUT_BYTES, CappedOutput, kill_process_group
+
+# Jobs running at the same time
+MAX_RUNNING_JOBS = 8
+# Finished jobs kept for polling (oldest are forgotten first)
+MAX_FINISHED_JOBS = 32
+
+READ_SIZE = 64 * 1024
+
+
+class JobError(Exception):
+    """Job not found, or too many jobs running."""
+
+
+class Job:
+    """One background command and the output it produced so far."""
+
+    def __init__(self, job_id: str, command: str, cwd: str, thread_id: str | None):
+        self.id = job_id
+        self.command = command
+        self.cwd = cwd
+        self.thread_id = thread_id
+        self.proc: subprocess.Popen | None = None
+        self.started = time.monotonic()
+        self.ended: float | None = None
+        self.killed = False
+        self.output = CappedOutput(MAX_OUTPUT_BYTES)
+        self._unread = CappedOutput(MAX_OUTPUT_BYTES)
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+
+    @property
+    def returncode(self) -> int | None:
+        return self.proc.returncode if self.proc is not None else None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.ended or time.monotonic()) - self.started
+
+    def start(self) -> None:
+        self.proc = subprocess.Popen(
+            self.command,
+            shell=True,
+            cwd=self.cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            # Own process group, so that kill_job reaches every child
+            start_new_session=os.name != "nt",
+        )
+        threading.Thread(target=self._pump, name=f"job-{self.id}", daemon=True).start()
+
+    def _pump(self) -> None:
+        try:
+            while True:
+                data = self.proc.stdout.read1(READ_SIZE)
+                if not data:
+                    break
+                with self._lock:
+                    self.output.feed(data)
+                    self._unread.feed(data)
+        finally:
+            self.proc.wait()
+            self.ended = time.monotonic()
+            self.finished.set()
+            logger.debug(f"Job {self.id} finished with exit code {self.proc.returncode}")
+
+    def read_new_output(self) -> str:
+        """Output produced since the previous call (head and tail if it is long)."""
+        with self._lock:
+            unread, self._unread = self._unread, CappedOutput(MAX_OUTPUT_BYTES)
+        return unread.render()
+
+    def read_all_output(self) -> str:
+        with self._lock:
+            return self.output.render()
+
+    def kill(self) -> None:
+        if self.finished.is_set():
+            return
+        self.killed = True
+        kill_process_group(self.proc)
+        self.finished.wait(KILL_GRACE_PERIOD)
+
+    def status(self) -> str:
+        if not self.finished.is_set():
+            return f"running for {self.elapsed:.1f}s"
+        if self.killed:
+            return f"killed after {self.elapsed:.1f}s"
+        return f"finished with exit code {self.returncode} after {self.elapsed:.1f}s"
+
+    def render(self, output: str) -> str:
+        header = f"Job {self.id} ({self.status()}): {self.command}"
+        return f"{header}\n\nOUTPUT:\n{output}" if output else f"{header}\n\n(no new output)"
+
+
+class JobRegistry:
+    """Process-wide background jobs by id."""
+
+    def __init__(self, max_running: int = MAX_RUNNING_JOBS, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_running = max_running
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, command: str, cwd: str, thread_id: str | None = None) -> Job:
+        with self._lock:
+            running = sum(not job.finished.is_set() for job in self._jobs.values())
+            if running >= self.max_running:
+                raise JobError(f"{running} jobs are already running; wait for or kill one first")
+            job = Job(str(next(self._ids)), command, cwd, thread_id)
+            job.start()
+            self._jobs[job.id] = job
+            self._forget_finished()
+        logger.debug(f"Started job {job.id} in {cwd}: {command}")
+        return job
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str, thread_id: str | None = None) -> Job:
+        """The job *job_id*, if it was started by *thread_id*. Raises JobError otherwise."""
+        with self._lock:
+            job = self._jobs.get(str(job_id).strip())
+        if job is None or job.thread_id != thread_id:
+            raise JobError(f"no job with id '{job_id}'")
+        return job
+
+    def list(self, thread_id: str | None = None) -> list[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.thread_id == thread_id]
+
+    def kill_all(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.kill()
+
+
+jobs = JobRegistry()
+atexit.register(jobs.kill_all)
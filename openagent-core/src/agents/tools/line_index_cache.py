@@ -0,0 +1,167 @@
+"""
+Line offset index for repeated read_file calls.
+
+Coding sessions re-read the same source files many times at different ranges.
+LineIndexCache scans each file once, keeping the byte offset of every line
+start (array('Q')) and the sha256 of the content, and then serves any range
+with a single seek + read of exactly its bytes.
+
+- Entries are validated against the file's inode, mtime and size on every access.
+- Entries are evicted LRU when their offset arrays exceed the memory budget.
+- No file stays open or mapped between reads: shell commands, editors and git
+  can replace or truncate the file at any time (a mapped file cannot be
+  truncated on Windows, and truncating it under a POSIX mapping raises SIGBUS).
+  An evicted entry holds nothing to close, so a reader still using it is safe.
+- write_file invalidates the entry of the files it writes. Changes made by
+  other processes are caught by the inode/mtime/size check.
+
+Files larger than MAX_INDEXED_FILE_BYTES are not indexed; read_file streams
+them instead (see line_reader).
+"""
+
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate, islice
+
+# Files above this size are streamed instead of indexed
+MAX_INDEXED_FILE_BYTES = 256 * 1024 * 1024
+# Total bytes of offset arrays kept across entries (8 bytes per line)
+MAX_INDEX_BYTES = 128 * 1024 * 1024
+# Bytes scanned at a time while building the offsets
+INDEX_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def _scan(f) -> tuple[array, int, str]:
+    """
+    Byte offset of every line start, size and sha256 of the file, in one pass
+    of block reads with C-level iterators.
+    """
+    starts = array("Q", [0])
+    digest = hashlib.sha256()
+    pos = 0
+    while True:
+        block = f.read(INDEX_BLOCK_SIZE)
+        if not block:
+            break
+        digest.update(block)
+        # Start of the line after each newline of the block (the last part
+        # has no newline after it; the first accumulated value is pos itself)
+        parts = block.split(b"\n")
+        parts.pop()
+        starts.extend(islice(accumulate(map((1).__add__, map(len, parts)), initial=pos), 1, None))
+        pos += len(block)
+
+    # A trailing newline (or an empty file) does not start a new line
+    if starts[-1] == pos:
+        starts.pop()
+    return starts, pos, digest.hexdigest()
+
+
+class LineIndexEntry:
+    """Line offsets and sha256 of one version of a file."""
+
+    def __init__(self, path: str, st: os.stat_result):
+        self.path = path
+        self.signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with open(path, "rb") as f:
+            self.starts, self.size, self.sha256 = _scan(f)
+
+    @property
+    def total_lines(self) -> int:
+        return len(self.starts)
+
+    @property
+    def index_bytes(self) -> int:
+        return len(self.starts) * self.starts.itemsize
+
+    def read(self, start_idx: int, end_idx: int) -> bytes:
+        """Bytes of lines start_idx..end_idx (0-indexed, end exclusive): one seek, one read."""
+        if start_idx >= end_idx:
+            return b""
+        begin = self.starts[start_idx]
+        end = self.starts[end_idx] if end_idx < len(self.starts) else self.size
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            return f.read(end - begin)
+
+
+class LineIndexCache:
+    def __init__(self, max_index_bytes: int = MAX_INDEX_BYTES, max_file_bytes: int = MAX_INDEXED_FILE_BYTES):
+        self.max_index_bytes = max_index_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries: "OrderedDict[str, LineIndexEntry]" = OrderedDict()
+        self._index_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, path: str) -> LineIndexEntry | None:
+        """Entry of the current version of *path*, or None if the file is too large to index."""
+        st = os.stat(path)
+        if st.st_size > self.max_file_bytes:
+            self.invalidate(path)
+            return None
+
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(path)
+                self._stats["hits"] += 1
+                return entry
+
+        entry = LineIndexEntry(path, st)
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._pop(path)
+            self._entries[path] = entry
+            self._index_bytes += entry.index_bytes
+            while self._index_bytes > self.max_index_bytes and len(self._entries) > 1:
+                old_path = next(iter(self._entries))
+                self._pop(old_path)
+                self._stats["evictions"] += 1
+        return entry
+
+    def read_lines(self, path: str, start: int, end: int) -> tuple[list[str], int] | None:
+        """
+        Lines *start*..*end* (1-indexed, inclusive) of *path* and its total line
+        count, or None if the file is too large to index.
+        """
+        entry = self.get(path)
+        if entry is None:
+            return None
+
+        total = entry.total_lines
+        start_idx = max(0, start - 1)
+        end_idx = min(total, end)
+        if start_idx >= end_idx:
+            return [], total
+
+        raw = entry.read(start_idx, end_idx).split(b"\n", end_idx - start_idx)[:end_idx - start_idx]
+        return [line.rstrip(b"\r").decode("utf-8") for line in raw], total
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._pop(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in list(self._entries):
+                self._pop(path)
+
+    def _pop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._index_bytes -= entry.index_bytes
+
+    def stats(self) -> dict:
+        """Counters: hits, misses, evictions, entries and index_bytes."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "index_bytes": self._index_bytes}
+
+
+# Shared by read_file and write_file
+line_index_cache = LineIndexCache()
@@ -0,0 +1,178 @@
+"""
+Line-range reads for read_file.
+
+Files up to MAX_INDEXED_FILE_BYTES are served by the line offset
+LineIndexCache (see line_index_cache). Larger files are streamed: they are
+read in binary chunks and never loaded whole. A sparse index is kept
+per file version (path, mtime, size): the number of newlines before every
+CHUNK_SIZE boundary seen so far. A range read seeks to the furthest known
+boundary before the first requested line, counts newlines (binary, no
+decoding) up to it, and stops after the last requested line, extending the
+index on the way. The total line count is only known once a read reaches
+EOF, so reading lines 1-50 of a huge log touches its first chunk only.
+
+The offset index also gives the sha256 of the file version, which read_file
+reports and edit_file checks to detect conflicting changes. Streamed files
+are not hashed: that would read the whole file.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+from .line_index_cache import line_index_cache
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Max number of file indexes kept in memory (least recently used are dropped)
+MAX_INDEXED_FILES = 256
+
+# Hex chars of the sha256 shown to the model (64 bits are enough to detect a change)
+HASH_CHARS = 16
+
+
+def short_sha256(digest: str) -> str:
+    return digest[:HASH_CHARS]
+
+
+class SparseLineIndex:
+    """Newline counts at the chunk boundaries of one version of a file seen so far."""
+
+    def __init__(self, signature: tuple[int, int]):
+        self.signature = signature
+        # newlines_before[k] = number of b"\n" in the first k * CHUNK_SIZE bytes
+        self.newlines_before: list[int] = [0]
+        # None until a read reaches EOF
+        self.total_lines: int | None = None
+        # Only held to update or query the index, never during file reads
+        self.lock = threading.Lock()
+
+    def record(self, chunk_index: int, newlines: int) -> None:
+        """Record the newline count before chunk *chunk_index* (chunks are visited in order)."""
+        with self.lock:
+            if chunk_index == len(self.newlines_before):
+                self.newlines_before.append(newlines)
+
+    def seek_point(self, line: int) -> tuple[int, int]:
+        """(chunk_index, newlines before it) of the last known chunk where *line* (0-indexed) has not started yet."""
+        with self.lock:
+            k = max(bisect_left(self.newlines_before, line) - 1, 0)
+            return k, self.newlines_before[k]
+
+
+_indexes: "OrderedDict[str, SparseLineIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def get_line_index(path: str) -> SparseLineIndex:
+    """Index of the current version of *path* (a new one if the file changed)."""
+    signature = _file_signature(path)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or index.signature != signature:
+            index = SparseLineIndex(signature)
+            _indexes[path] = index
+            while len(_indexes) > MAX_INDEXED_FILES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(path)
+    return index
+
+
+def invalidate_line_index(path: str) -> None:
+    """Drop every index of *path* (call before writing to it)."""
+    line_index_cache.invalidate(path)
+    with _indexes_lock:
+        _indexes.pop(path, None)
+
+
+def _read_raw_lines(f, index: SparseLineIndex, start: int, count: int) -> list[bytes]:
+    """
+    Raw lines start..start+count (0-indexed), reading from the last known chunk
+    boundary before *start* and stopping after the last line. Chunk boundaries
+    passed on the way are recorded, and the total when EOF is reached.
+    """
+    k, line = index.seek_point(start)
+    f.seek(k * CHUNK_SIZE)
+
+    collected: list[bytes] = []
+    collected_newlines = 0
+    last_byte = b""
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            # A last line without a trailing newline still counts
+            total = line + (1 if last_byte not in (b"", b"\n") else 0)
+            index.total_lines = total
+            if not collected:
+                return []
+            return b"".join(collected).split(b"\n", count)[:min(count, total - start)]
+
+        newlines = chunk.count(b"\n")
+        last_byte = chunk[-1:]
+        chunk_first_line = line
+        line += newlines
+        k += 1
+        index.record(k, line)
+
+        if not collected:
+            if line < start:
+                # Requested range starts after this chunk
+                continue
+            # Skip to the start of line *start* inside this chunk
+            skip = start - chunk_first_line
+            if skip:
+                chunk = chunk.split(b"\n", skip)[-1]
+                newlines -= skip
+
+        collected.append(chunk)
+        collected_newlines += newlines
+        if collected_newlines >= count:
+            break
+
+    return b"".join(collected).split(b"\n", count)[:count]
+
+
+def read_lines(path: str, start: int, end: int) -> tuple[list[str], int | None]:
+    """
+    Lines *start*..*end* (1-indexed, inclusive) of *path* and its total line count.
+
+    The total is None for a streamed file no read has scanned to the end yet.
+    Lines are returned without their line terminator. Raises the usual OSError
+    subclasses and UnicodeDecodeError for non UTF-8 content.
+    """
+    result = line_index_cache.read_lines(path, start, end)
+    if result is not None:
+        return result
+
+    # Too large to map: stream it
+    index = get_line_index(path)
+    start_idx = max(0, start - 1)
+    end_idx = end if index.total_lines is None else min(index.total_lines, end)
+    if start_idx >= end_idx:
+        return [], index.total_lines
+
+    with open(path, "rb") as f:
+        raw = _read_raw_lines(f, index, start_idx, end_idx - start_idx)
+
+    return [line.rstrip(b"\r").decode("utf-8") for line in raw], index.total_lines
+
+
+def format_numbered_lines(lines: list[str], first_line: int) -> str:
+    """Lines prefixed with their number, VSCode style (``  12→content``)."""
+    width = len(str(first_line + len(lines) - 1))
+    return "\n".join(f"{i:>{width}}→{line}" for i, line in enumerate(lines, start=first_line))
+
+
+def file_sha256(path: str) -> str | None:
+    """sha256 hex digest of the current version of *path* (cached per version), None for streamed files."""
+    entry = line_index_cache.get(path)
+    if entry is None:
+        return None
+    return entry.sha256
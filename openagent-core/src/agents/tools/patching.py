@@ -0,0 +1,195 @@
+"""
+In-place text edits for edit_file.
+
+Two edit modes, both applied in memory to the decoded file:
+
+- search/replace: ``old_string`` must occur exactly once (or ``replace_all``)
+- unified diff: ``@@ -a,b +c,d @@`` hunks, located by their context and
+  removed lines (starting at the position given by the header, then nearby)
+
+The result is written back with ``atomic_write`` (temp file in the same
+directory + ``os.replace``), after checking that the file still has the
+content hash the edit was computed from.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+
+class PatchError(Exception):
+    """An edit that cannot be applied: no match, ambiguous match or conflicting change."""
+
+
+@dataclass
+class EditResult:
+    text: str
+    # Replacements (search/replace) or hunks (diff) applied
+    changes: int
+    # Changed region in the new text (1-indexed, inclusive)
+    first_line: int
+    last_line: int
+
+
+def _line_of(text: str, index: int) -> int:
+    return text.count("\n", 0, index) + 1
+
+
+def apply_search_replace(text: str, old: str, new: str, replace_all: bool = False) -> EditResult:
+    if not old:
+        raise PatchError("old_string is empty. Use write_file to create or overwrite a file.")
+
+    count = text.count(old)
+    if count == 0 and "\r\n" in text and "\r\n" not in old:
+        # The model writes \n, the file uses \r\n
+        old, new = old.replace("\n", "\r\n"), new.replace("\n", "\r\n")
+        count = text.count(old)
+
+    if count == 0:
+        raise PatchError("old_string not found in the file. Read the file again and copy the exact text.")
+    if count > 1 and not replace_all:
+        lines, index = [], -1
+        for _ in range(min(count, 5)):
+            index = text.find(old, index + 1)
+            lines.append(str(_line_of(text, index)))
+        raise PatchError(
+            f"old_string occurs {count} times (lines {', '.join(lines)}). "
+            "Add surrounding context to make it unique, or set replace_all."
+        )
+
+    first = text.find(old)
+    last = text.rfind(old)
+    new_text = text.replace(old, new) if replace_all else text.replace(old, new, 1)
+
+    first_line = _line_of(text, first)
+    # Position of the last replacement in the new text
+    last_new = last + (count - 1) * (len(new) - len(old)) if replace_all else first
+    last_line = _line_of(new_text, last_new) + new.count("\n")
+    return EditResult(new_text, count if replace_all else 1, first_line, last_line)
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_lines: list[str]
+    new_lines: list[str]
+
+
+def parse_unified_diff(diff: str) -> list[Hunk]:
+    hunks: list[Hunk] = []
+    current: Hunk | None = None
+    lines = diff.splitlines()
+    for i, line in enumerate(lines):
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = Hunk(int(header.group(1)), [], [])
+            hunks.append(current)
+            continue
+        # File headers (--- a/x, +++ b/x, diff --git ...) end the current hunk
+        if line.startswith("diff ") or (line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ ")):
+            current = None
+            continue
+        if current is None or line.startswith("\\"):
+            continue
+
+        tag, body = (line[0], line[1:]) if line else (" ", "")
+        if tag == " ":
+            current.old_lines.append(body)
+            current.new_lines.append(body)
+        elif tag == "-":
+            current.old_lines.append(body)
+        elif tag == "+":
+            current.new_lines.append(body)
+        else:
+            raise PatchError(f"Invalid diff line: {line[:80]!r}")
+
+    if not hunks:
+        raise PatchError("No @@ hunk found in the diff.")
+    return hunks
+
+
+def _find_hunk(lines: list[str], old: list[str], expected: int, lower: int) -> int:
+    """Index where *old* matches in *lines* (nearest to *expected*, not before *lower*), or -1."""
+    if not old:
+        return min(max(expected, lower), len(lines))
+
+    for normalize in (lambda s: s.rstrip("\r"), lambda s: s.rstrip()):
+        target = [normalize(s) for s in old]
+        first = target[0]
+        candidates = [
+            i for i in range(lower, len(lines) - len(old) + 1)
+            if normalize(lines[i]) == first and [normalize(s) for s in lines[i:i + len(old)]] == target
+        ]
+        if candidates:
+            return min(candidates, key=lambda i: abs(i - expected))
+    return -1
+
+
+def apply_unified_diff(text: str, diff: str) -> EditResult:
+    hunks = parse_unified_diff(diff)
+    cr = "\r" if "\r\n" in text else ""
+    lines = text.split("\n")
+
+    offset = 0
+    lower = 0
+    first_line = last_line = None
+    for n, hunk in enumerate(hunks, start=1):
+        # "-k,0" hunks insert after line k; the others start at line k
+        expected = hunk.old_start - (1 if hunk.old_lines else 0) + offset
+        index = _find_hunk(lines, hunk.old_lines, expected, lower)
+        if index < 0:
+            raise PatchError(
+                f"Hunk {n} (@@ -{hunk.old_start}) does not match the file. "
+                "Read the file again and regenerate the diff."
+            )
+
+        new_lines = [s + cr for s in hunk.new_lines]
+        lines[index:index + len(hunk.old_lines)] = new_lines
+        offset += len(new_lines) - len(hunk.old_lines)
+        lower = index + len(new_lines)
+
+        first_line = index + 1 if first_line is None else first_line
+        last_line = max(index + len(new_lines), index + 1)
+
+    return EditResult("\n".join(lines), len(hunks), first_line, last_line)
+
+
+def sha256_of(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write(path: str, data: bytes, expected_sha256: str | None = None) -> None:
+    """
+    Replace *path* with *data* atomically (readers see the old or the new file, never a mix).
+
+    If *expected_sha256* is given, the file must still have that content right
+    before the swap, otherwise PatchError is raised and the file is untouched.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        if expected_sha256 is not None and sha256_of(path) != expected_sha256:
+            raise PatchError("The file was modified while the edit was being applied. Read it again.")
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,17 +1,121 @@
-from playwright.async_api import async_playwright
+"""
+Shared Chromium instance with one BrowserContext per conversation thread.
+
+Every thread gets its own context (cookies, storage, pages), so two research
+threads can both open a page called "main" without overwriting each other.
+Pages are looked up by (thread_id, page_title).
+
+- Chromium runs headless unless HEADLESS=false.
+- At most MAX_CONTEXTS thread contexts are open; the least recently used one
+  is closed to make room.
+- Each context keeps at most MAX_PAGES_PER_CONTEXT pages; creating one more
+  closes the least recently used page of that thread.
+- The browser stays up between tasks (until the idle timeout) and one spare
+  context is kept ready, so a new thread skips both the Chromium launch and
+  the context creation.
+- ``prewarm()`` launches Chromium in the background (the researcher calls it
+  at graph start, so the launch overlaps the first model call); the first
+  tool that needs a page waits for it. The stats record how much of the
+  startup was hidden this way.
+- The Playwright connection, the locks and the background tasks belong to
+  one event loop. Used from a new loop (a later ``asyncio.run``), the
+  manager drops the previous loop's browser and relaunches on demand.
+"""
 import asyncio
-from datetime import datetime, timedelta
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from agents.utils.logging import logger
+
+from .dom_snapshot import OA_ID_SELECTOR_ENGINE, DomSnapshots
+from .page_loader import PageLoader
+
+BROWSER_HEADLESS = os.getenv("HEADLESS", "true").lower() not in ("0", "false", "no")
+# Thread contexts open at the same time
+MAX_CONTEXTS = int(os.getenv("OPENAGENT_BROWSER_MAX_CONTEXTS", 8))
+# Pages per thread context
+MAX_PAGES_PER_CONTEXT = int(os.getenv("OPENAGENT_BROWSER_MAX_PAGES", 8))
+
+VIEWPORT = {"width": 1366, "height": 768}
+
+# Context of calls made without a thread_id
+DEFAULT_THREAD = "__default__"
+
+
+def thread_id_of(config) -> str | None:
+    """thread_id of a tool's RunnableConfig."""
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+def _thread_key(thread_id) -> str:
+    return str(thread_id) if thread_id else DEFAULT_THREAD
+
+
+async def _close_quietly(target) -> None:
+    try:
+        await target.close()
+    except Exception as e:
+        logger.debug(f"Error closing {type(target).__name__}: {e!s}")
+
+
+class ThreadContext:
+    """BrowserContext of one thread and its pages by title, least recently used first."""
+
+    def __init__(self, context):
+        self.context = context
+        self.pages: OrderedDict = OrderedDict()
+        # Load profile and traffic counters of the pages navigated so far
+        self.loaders: dict[str, PageLoader] = {}
+        # DOM snapshots of the pages read so far
+        self.snapshots: dict[str, DomSnapshots] = {}
+
+    def pop(self, page_title: str):
+        self.loaders.pop(page_title, None)
+        self.snapshots.pop(page_title, None)
+        return self.pages.pop(page_title, None)
+
+    def pop_least_recent(self):
+        page_title = next(iter(self.pages))
+        return page_title, self.pop(page_title)
+
+    def forget(self, page_title: str, page) -> None:
+        """Drop *page_title* if it still refers to *page* (the page was closed)."""
+        if self.pages.get(page_title) is page:
+            self.pop(page_title)
+
 
 # Global browser manager to avoid serialization issues
 class BrowserManager:
     """Singleton browser manager that cannot be pickled - stored globally"""
     _instance = None
-    _browser = None
-    _playwright = None
-    _pages = {}
-    _last_activity = None
-    _idle_timeout = 3600  # seconds (1 minute default)
-    _cleanup_task = None
+
+    def __init__(
+        self,
+        headless: bool = BROWSER_HEADLESS,
+        max_contexts: int = MAX_CONTEXTS,
+        max_pages: int = MAX_PAGES_PER_CONTEXT,
+    ):
+        self.headless = headless
+        self.max_contexts = max(1, max_contexts)
+        self.max_pages = max(1, max_pages)
+        self._browser = None
+        self._playwright = None
+        self._contexts: "OrderedDict[str, ThreadContext]" = OrderedDict()
+        self._spare_context = None
+        self._refill_task = None
+        # Event loop everything above belongs to, set on first use (_bind_loop)
+        self._loop = None
+        # Launch and context creation can be awaited by concurrent tool calls
+        self._launch_lock: asyncio.Lock | None = None
+        self._contexts_lock: asyncio.Lock | None = None
+        self._last_activity = None
+        self._idle_timeout = 3600  # seconds (1 hour default)
+        self._cleanup_task = None
+        # Set by prewarm() until the first context is handed out
+        self._prewarm_pending = False
+        self._stats = {"launches": 0, "contexts": 0, "warm_contexts": 0, "evicted_contexts": 0, "pages": 0, "evicted_pages": 0}
 
     @classmethod
     async def get_instance(cls):
@@ -19,29 +123,199 @@ class BrowserManager:
             cls._instance = cls()
         return cls._instance
 
+    def _bind_loop(self) -> None:
+        """Tie the manager to the running event loop, resetting it if the loop changed."""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            # Browser, contexts and tasks of the previous loop cannot be used
+            # (or even closed) from this one: drop them, relaunch on demand
+            logger.warning("Browser manager used from a new event loop, dropping the previous loop's browser")
+            self._contexts.clear()
+            self._spare_context = None
+            self._browser = None
+            self._playwright = None
+            self._refill_task = None
+            self._cleanup_task = None
+            self._last_activity = None
+            self._prewarm_pending = False
+        self._loop = loop
+        self._launch_lock = asyncio.Lock()
+        self._contexts_lock = asyncio.Lock()
+
     async def get_browser(self):
-        if self._browser is None:
-            self._playwright = await async_playwright().start()
-            import os
-            downloads_path = os.path.join(os.path.expanduser("~"), "Downloads")
-            self._browser = await self._playwright.chromium.launch(headless=False, downloads_path=downloads_path)
-            self._start_idle_monitor()
+        self._bind_loop()
+        async with self._launch_lock:
+            if self._browser is not None and not self._browser.is_connected():
+                # Chromium crashed or was closed: its contexts are gone with it
+                logger.warning("Browser disconnected, relaunching")
+                self._contexts.clear()
+                self._spare_context = None
+                self._browser = None
+            if self._browser is None:
+                # Imported on first use: playwright is only needed once a page is opened
+                from playwright.async_api import async_playwright
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                    # "oa-id=N" selectors of the DOM snapshots (dom_snapshot.py)
+                    await self._playwright.selectors.register("oa-id", OA_ID_SELECTOR_ENGINE)
+                downloads_path = os.path.join(os.path.expanduser("~"), "Downloads")
+                started = time.monotonic()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, downloads_path=downloads_path)
+                self._stats["launches"] += 1
+                self._stats["launch_seconds"] = time.monotonic() - started
+                logger.debug(f"Chromium launched in {self._stats['launch_seconds']:.2f}s")
+                self._start_idle_monitor()
         self._update_activity()
         return self._browser
 
-    async def create_page(self, page_title: str):
+    # ── Contexts ────────────────────────────────────────────────────────
+
+    async def _new_context(self):
         browser = await self.get_browser()
-        page = await browser.new_page(viewport={'width': 1366, 'height': 768})
-        self._pages[page_title] = page
+        context = await browser.new_context(viewport=VIEWPORT, accept_downloads=True)
+        self._stats["contexts"] += 1
+        return context
+
+    def _take_spare(self):
+        context, self._spare_context = self._spare_context, None
+        if context is not None:
+            self._stats["warm_contexts"] += 1
+        return context
+
+    def _schedule_refill(self) -> None:
+        """Prepare the next spare context in the background."""
+        if self._spare_context is None and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill_spare())
+
+    async def _refill_spare(self) -> bool:
+        """Prepare a spare context. True if it was created and kept as the spare."""
+        try:
+            context = await self._new_context()
+        except Exception as e:
+            logger.debug(f"Could not prepare a spare browser context: {e!s}")
+            return False
+        if self._spare_context is None and self._browser is not None:
+            self._spare_context = context
+            return True
+        await _close_quietly(context)
+        return False
+
+    def prewarm(self) -> None:
+        """Launch the browser and prepare a context in the background (returns immediately)."""
+        self._bind_loop()
+        if self._browser is not None or (self._refill_task is not None and not self._refill_task.done()):
+            return
+        self._prewarm_pending = True
+        self._refill_task = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self) -> None:
+        started = time.monotonic()
+        if await self._refill_spare():
+            self._stats["prewarm_seconds"] = time.monotonic() - started
+
+    def _record_first_use(self, waited: float) -> None:
+        """Startup latency hidden by prewarm(): its duration minus what the first page waited."""
+        if not self._prewarm_pending:
+            return
+        self._prewarm_pending = False
+        prewarm_seconds = self._stats.get("prewarm_seconds")
+        if prewarm_seconds is None:
+            # The prewarm failed: the context was created in the foreground
+            return
+        hidden = max(0.0, prewarm_seconds - waited)
+        self._stats["first_page_wait_seconds"] = waited
+        self._stats["hidden_startup_seconds"] = hidden
+        logger.info(f"Browser prewarmed in {prewarm_seconds:.2f}s, first page waited {waited:.2f}s ({hidden:.2f}s of startup hidden)")
+
+    async def get_context(self, thread_id=None) -> ThreadContext:
+        """Context of *thread_id*, created (or taken from the spare) on first use."""
+        key = _thread_key(thread_id)
+        self._bind_loop()
+        async with self._contexts_lock:
+            entry = self._contexts.get(key)
+            if entry is None:
+                while len(self._contexts) >= self.max_contexts:
+                    old_key, old = self._contexts.popitem(last=False)
+                    self._stats["evicted_contexts"] += 1
+                    logger.debug(f"Closing browser context of thread {old_key} ({len(old.pages)} pages)")
+                    await _close_quietly(old.context)
+                started = time.monotonic()
+                if self._spare_context is None and self._refill_task is not None and not self._refill_task.done():
+                    # Launch or spare context in progress: ready sooner than a new context
+                    await asyncio.wait({self._refill_task})
+                context = self._take_spare() or await self._new_context()
+                self._record_first_use(time.monotonic() - started)
+                entry = self._contexts[key] = ThreadContext(context)
+                self._schedule_refill()
+            self._contexts.move_to_end(key)
+        self._update_activity()
+        return entry
+
+    # ── Pages ───────────────────────────────────────────────────────────
+
+    async def create_page(self, page_title: str, thread_id=None):
+        entry = await self.get_context(thread_id)
+        previous = entry.pop(page_title)
+        if previous is not None:
+            await _close_quietly(previous)
+        while len(entry.pages) >= self.max_pages:
+            old_title, old_page = entry.pop_least_recent()
+            self._stats["evicted_pages"] += 1
+            logger.debug(f"Closing least recently used page '{old_title}' of thread {_thread_key(thread_id)}")
+            await _close_quietly(old_page)
+
+        page = await entry.context.new_page()
+        entry.pages[page_title] = page
+        page.on("close", lambda closed: entry.forget(page_title, closed))
+        self._stats["pages"] += 1
         self._update_activity()
         return page
 
-    def get_page(self, page_title: str):
+    def get_page(self, page_title: str, thread_id=None):
         self._update_activity()
-        return self._pages.get(page_title)
+        key = _thread_key(thread_id)
+        entry = self._contexts.get(key)
+        page = entry.pages.get(page_title) if entry is not None else None
+        if page is not None:
+            entry.pages.move_to_end(page_title)
+            self._contexts.move_to_end(key)
+        return page
+
+    def get_page_loader(self, page_title: str, thread_id=None) -> PageLoader | None:
+        """Load profile and traffic counters of a page (see page_loader.py)."""
+        page = self.get_page(page_title, thread_id)
+        if page is None:
+            return None
+        entry = self._contexts[_thread_key(thread_id)]
+        loader = entry.loaders.get(page_title)
+        if loader is None:
+            loader = entry.loaders[page_title] = PageLoader(page)
+        return loader
+
+    def get_page_snapshots(self, page_title: str, thread_id=None) -> DomSnapshots | None:
+        """DOM snapshots of a page (see dom_snapshot.py)."""
+        page = self.get_page(page_title, thread_id)
+        if page is None:
+            return None
+        entry = self._contexts[_thread_key(thread_id)]
+        snapshots = entry.snapshots.get(page_title)
+        if snapshots is None:
+            snapshots = entry.snapshots[page_title] = DomSnapshots(page)
+        return snapshots
 
-    def list_pages(self):
-        return list(self._pages.keys())
+    def list_pages(self, thread_id=None):
+        entry = self._contexts.get(_thread_key(thread_id))
+        return list(entry.pages.keys()) if entry is not None else []
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "open_contexts": len(self._contexts),
+            "open_pages": sum(len(entry.pages) for entry in self._contexts.values()),
+            "spare_ready": self._spare_context is not None,
+        }
 
     def _update_activity(self):
         """Update the last activity timestamp"""
@@ -54,9 +328,14 @@ class BrowserManager:
 
     async def _idle_monitor(self):
         """Monitor browser activity and close if idle for too long"""
+        loop = asyncio.get_running_loop()
         while True:
             await asyncio.sleep(10)  # Check every 10 seconds
 
+            if self._loop is not loop:
+                # The manager moved to another loop, which has its own monitor
+                break
+
             if self._browser is not None and self._last_activity is not None:
                 idle_time = (datetime.now() - self._last_activity).total_seconds()
 
@@ -67,29 +346,31 @@ class BrowserManager:
     async def _close_browser(self):
         """Close browser and clean up resources"""
         if self._browser is not None:
-            # Close all pages first
-            for page in self._pages.values():
-                try:
-                    await page.close()
-                except:
-                    pass
+            if self._refill_task is not None:
+                self._refill_task.cancel()
+                self._refill_task = None
+
+            # Closing a context closes its pages
+            contexts = [entry.context for entry in self._contexts.values()]
+            if self._spare_context is not None:
+                contexts.append(self._spare_context)
+            for context in contexts:
+                await _close_quietly(context)
 
-            self._pages.clear()
+            self._contexts.clear()
+            self._spare_context = None
 
             # Close browser
-            try:
-                await self._browser.close()
-            except:
-                pass
+            await _close_quietly(self._browser)
 
             # Stop playwright
             if self._playwright is not None:
                 try:
                     await self._playwright.stop()
-                except:
+                except Exception:
                     pass
 
             self._browser = None
             self._playwright = None
             self._last_activity = None
-            self._cleanup_task = None
\ No newline at end of file
+            self._cleanup_task = None
@@ -3,7 +3,8 @@ from typing import Annotated
 from langchain.tools import tool, InjectedState, InjectedToolCallId
 from langchain.messages import ToolMessage
 from langgraph.types import Command
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
 
 
 @tool(parse_docstring=True)
@@ -11,6 +12,7 @@ async def capture_screenshot(
     page_title: str,
     state: Annotated[dict, InjectedState],
     tool_call_id: Annotated[str, InjectedToolCallId],
+    config: RunnableConfig,
     full_page: bool = False
 ) -> Command:
     """
@@ -22,6 +24,7 @@ async def capture_screenshot(
     - Visual content that cannot be extracted as text
 
     For reading text content (articles, documentation, search results), use extract_page_text instead.
+    Pages opened with navigate_to(load_profile="text") have no images: navigate with "text+images" or "full" first.
 
     Args:
         page_title: The title of the browser page to capture
@@ -37,7 +40,7 @@ async def capture_screenshot(
     import base64
 
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    page = manager.get_page(page_title, thread_id_of(config))
 
     if page is None:
         return f"Page with title '{page_title}' does not exist."
@@ -1,10 +1,11 @@
 from typing import Annotated
 from langchain.tools import tool, InjectedState
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
 
 
 @tool(parse_docstring=True)
-async def click_element(page_title: str, selector: str, element_text: str = "", wait_for_navigation: bool = True) -> str:
+async def click_element(page_title: str, selector: str, config: RunnableConfig, element_text: str = "", wait_for_navigation: bool = True) -> str:
     """
     Clicks on an element in the specified browser page.
     Use this tool to interact with clickable elements like links, buttons, or any interactive element.
@@ -17,7 +18,7 @@ async def click_element(page_title: str, selector: str, element_text: str = "",
         wait_for_navigation: Whether to wait for page navigation after clicking. Set to False for elements that don't trigger navigation (like modals)
     """
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    page = manager.get_page(page_title, thread_id_of(config))
 
     if page is None:
         return f"Page with title '{page_title}' does not exist."
@@ -31,7 +32,7 @@ async def click_element(page_title: str, selector: str, element_text: str = "",
             actual_selector = selector
         except:
             # If data-pw-id selector fails, try fallback with text matching
-            if element_text and selector.startswith('[data-pw-id'):
+            if element_text and (selector.startswith('oa-id=') or selector.startswith('[data-pw-id')):
                 try:
                     # Try to find element by text content as fallback
                     actual_selector = await page.evaluate("""
@@ -59,18 +60,14 @@ async def click_element(page_title: str, selector: str, element_text: str = "",
             if not element_found:
                 return f"Element with selector '{selector}' not found or not visible on page '{page_title}'. Try using refresh_page_elements and get_page_elements again."
 
-        # Get element info before clicking using safer evaluation
-        element_info = await page.evaluate("""
-            (sel) => {
-                const el = document.querySelector(sel);
-                if (!el) return null;
-                return {
-                    tag: el.tagName.toLowerCase(),
-                    text: el.innerText?.trim().substring(0, 50) || el.value || '',
-                    href: el.href || null
-                };
-            }
-        """, actual_selector)
+        # Get element info before clicking (Playwright selector: also resolves "oa-id=N")
+        element_info = await page.eval_on_selector(actual_selector, """
+            (el) => ({
+                tag: el.tagName.toLowerCase(),
+                text: el.innerText?.trim().substring(0, 50) || el.value || '',
+                href: el.href || null
+            })
+        """)
 
         if not element_info:
             return f"Element with selector '{selector}' exists but could not be accessed."
@@ -1,9 +1,10 @@
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
 from langchain.tools import tool
 import re
 
 @tool(parse_docstring=True)
-async def create_new_page(page_title: str) -> str:
+async def create_new_page(page_title: str, config: RunnableConfig) -> str:
     """Creates a new page in the browser for web navigation.
 
     Args:
@@ -14,7 +15,7 @@ async def create_new_page(page_title: str) -> str:
 
     try:
         manager = await BrowserManager.get_instance()
-        await manager.create_page(page_title)
+        await manager.create_page(page_title, thread_id_of(config))
         return f"Page with title '{page_title}' created successfully."
     except Exception as e:
         return f"Page with title '{page_title}' could not be created due error:\n{str(e)}"
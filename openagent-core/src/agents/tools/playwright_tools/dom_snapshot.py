@@ -0,0 +1,368 @@
+"""
+Single-pass DOM snapshots shared by the page tools.
+
+extract_page_text, get_page_elements, click_element_by_index and fill_input
+used to walk the DOM on their own, tag elements with data-pw-id attributes
+and re-filter the whole page to find one element. They now share one
+in-page engine (``window.__oa``, installed on first use in each document):
+
+- A MutationObserver counts DOM changes. ``<document id>:<count>`` is the
+  DOM version: it changes on navigation and on any mutation.
+- A snapshot walks the page once with a TreeWalker (script, style, noscript
+  and template subtrees are skipped, nothing is removed) and returns the
+  visible interactive elements.
+- The text of extract_page_text is a TreeWalker pass joining an array of
+  parts. It stops at a character budget and can be limited to the viewport
+  or to the main content. It shares the element ids: visible interactive
+  elements are marked "[BUTTON #12]". A full-page text that ends within the
+  budget has visited every element, so it also returns the snapshot and a
+  following get_page_elements needs no walk; only a truncated (or partial
+  mode) text leaves the snapshot to its own pass.
+- Every listed element gets a stable id kept in a WeakMap (no attributes
+  are written). Ids survive later mutations, so "[12]" keeps pointing at the
+  same element, and the ``oa-id=12`` selector engine resolves it for clicks.
+
+``DomSnapshots`` keeps the last snapshots and texts of a page on the Python
+side: a call on an unchanged DOM (and, in viewport mode, an unchanged scroll
+position) costs one round trip returning ``unchanged`` instead of a new walk.
+"""
+import re
+
+from agents.utils.logging import logger
+
+# Elements listed by the shared snapshot and marked with their id in the
+# page text (the default get_page_elements query is answered from it)
+SNAPSHOT_TYPES = "a,button,input,textarea,select,[role=button],[role=link]"
+# Bare tags of SNAPSHOT_TYPES: get_page_elements queries made of these are
+# answered by filtering the shared snapshot
+SNAPSHOT_TAGS = frozenset({"a", "button", "input", "textarea", "select"})
+
+# Selector engine resolving "oa-id=<id>" through the ids of the snapshot engine
+# (registered on the Playwright instance before the browser is launched)
+OA_ID_SELECTOR_ENGINE = """
+{
+    query(root, selector) {
+        const el = window.__oa && window.__oa.element(Number(selector));
+        return el && (root === el || root.contains(el)) ? el : null;
+    },
+    queryAll(root, selector) {
+        const el = this.query(root, selector);
+        return el ? [el] : [];
+    }
+}
+"""
+
+# Installs window.__oa in the document if needed (prefix of every engine script)
+_ENGINE = """
+const oa = window.__oa || (window.__oa = (() => {
+    const ids = new WeakMap();
+    const byId = new Map();
+    let nextId = 0;
+    const state = {
+        doc: Math.random().toString(36).slice(2, 10),
+        mutations: 0,
+    };
+    new MutationObserver(() => { state.mutations++; }).observe(document, {
+        subtree: true, childList: true, characterData: true,
+        attributes: true, attributeFilter: ['class', 'style', 'hidden', 'disabled', 'href', 'aria-hidden', 'type'],
+    });
+
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    // Left out of the "main" text when the page has no main landmark
+    const CHROME = new Set(['NAV', 'HEADER', 'FOOTER', 'ASIDE']);
+    const HEADINGS = new Set(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']);
+
+    function marker(el) {
+        const tag = el.tagName.toLowerCase();
+        const role = el.getAttribute('role');
+        if (tag === 'button' || role === 'button') return 'BUTTON';
+        if (tag === 'input') return `INPUT:${el.getAttribute('type') || 'text'}`;
+        if (tag === 'textarea') return 'TEXTAREA';
+        if (tag === 'a') return 'LINK';
+        if (tag === 'article') return 'ARTICLE';
+        if (tag === 'nav') return 'NAV';
+        if (tag === 'header') return 'HEADER';
+        if (tag === 'footer') return 'FOOTER';
+        if (tag === 'form') return 'FORM';
+        if (HEADINGS.has(tag)) return tag.toUpperCase();
+        if (tag === 'select') return 'SELECT';
+        if (role === 'listbox') return 'LISTBOX';
+        if (role === 'menu') return 'MENU';
+        return '';
+    }
+
+    function isVisible(el) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width <= 0 || rect.height <= 0) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    }
+
+    function idOf(el) {
+        let id = ids.get(el);
+        if (id === undefined) {
+            id = nextId++;
+            ids.set(el, id);
+            byId.set(id, new WeakRef(el));
+        }
+        return id;
+    }
+
+    function describe(el, id) {
+        return {
+            id: id,
+            tag: el.tagName.toLowerCase(),
+            text: (el.innerText || '').trim().substring(0, 100) || el.value || '',
+            href: el.href || null,
+            type: el.type || null,
+            ariaLabel: el.getAttribute('aria-label'),
+            title: el.getAttribute('title'),
+        };
+    }
+
+    function prune() {
+        for (const [id, ref] of byId) {
+            const el = ref.deref();
+            if (!el || !el.isConnected) byId.delete(id);
+        }
+    }
+
+    // reject(el): extra subtrees to leave out
+    function walker(root, reject) {
+        return document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+            acceptNode: (node) => node.nodeType === Node.ELEMENT_NODE && (SKIP.has(node.tagName) || (reject && reject(node)))
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+        });
+    }
+
+    // Main content: the main landmark, else the longest article, else the
+    // body without its navigation, header, footer and sidebars
+    function mainRoot() {
+        const main = document.querySelector('main, [role=main]');
+        if (main) return [main, null];
+        let best = null;
+        for (const article of document.querySelectorAll('article')) {
+            if (!best || article.textContent.length > best.textContent.length) best = article;
+        }
+        if (best) return [best, null];
+        return [document.body || document.documentElement, (el) => CHROME.has(el.tagName) || el.getAttribute('role') === 'navigation'];
+    }
+
+    function outsideViewport(el) {
+        const rect = el.getBoundingClientRect();
+        // Boxless elements (display: contents, empty inlines) may have visible children
+        if (rect.width === 0 && rect.height === 0) return false;
+        return rect.bottom < 0 || rect.top > window.innerHeight || rect.right < 0 || rect.left > window.innerWidth;
+    }
+
+    return {
+        version: () => `${state.doc}:${state.mutations}`,
+
+        // What a text of `mode` depends on: the DOM, plus the scroll position in viewport mode
+        textKey(mode) {
+            const version = this.version();
+            return mode === 'viewport'
+                ? `${version}@${Math.round(window.scrollX)},${Math.round(window.scrollY)},${window.innerWidth}x${window.innerHeight}`
+                : version;
+        },
+
+        element(id) {
+            const el = byId.get(id)?.deref();
+            return el && el.isConnected ? el : null;
+        },
+
+        info(id) {
+            const el = this.element(id);
+            return el ? describe(el, id) : null;
+        },
+
+        // One pass over the page: the visible elements matching `types`, in document order
+        snapshot(types) {
+            const root = document.body || document.documentElement;
+            const elements = [];
+            if (byId.size > 4096) prune();
+            const tw = walker(root);
+            for (let node = tw.currentNode; node; node = tw.nextNode()) {
+                if (node.nodeType === Node.ELEMENT_NODE && node.matches(types) && isVisible(node)) {
+                    elements.push(describe(node, idOf(node)));
+                }
+            }
+            return { version: this.version(), url: location.href, elements: elements };
+        },
+
+        // Marked-up text of the page, in document order. Stops once `budget`
+        // characters are collected; `types` are marked with their ids. A
+        // full-page text that was not truncated also carries the snapshot of `types`
+        text(mode, budget, types) {
+            const key = this.textKey(mode);
+            let root = document.body || document.documentElement;
+            let reject = null;
+            if (mode === 'main') [root, reject] = mainRoot();
+            if (mode === 'viewport') reject = outsideViewport;
+
+            if (byId.size > 4096) prune();
+            const parts = [];
+            const listed = [];
+            let size = 0;
+            let truncated = false;
+            let lastParent = null;
+            let parentShown = true;
+            const tw = walker(root, reject);
+            for (let node = tw.currentNode; node; node = tw.nextNode()) {
+                let part = '';
+                if (node.nodeType === Node.TEXT_NODE) {
+                    if (mode === 'viewport' && node.parentNode !== lastParent) {
+                        lastParent = node.parentNode;
+                        parentShown = !(lastParent instanceof Element) || !outsideViewport(lastParent);
+                    }
+                    if (parentShown) part = node.nodeValue.replace(/\\s+/g, ' ').trim();
+                } else {
+                    const kind = marker(node);
+                    // Same test as snapshot(); in full mode for every element, since
+                    // some listed ones have no marker ([role=link], ...)
+                    const shown = (kind || mode === 'full') && node.matches(types) && isVisible(node);
+                    if (kind) part = shown ? `[${kind} #${idOf(node)}]` : `[${kind}]`;
+                    if (shown && mode === 'full') listed.push(node);
+                }
+                if (!part) continue;
+                if (size + part.length > budget) {
+                    parts.push(part.slice(0, Math.max(0, budget - size)));
+                    truncated = true;
+                    break;
+                }
+                parts.push(part);
+                size += part.length + 1;
+            }
+            // Described once the walk is known to be complete (innerText is not free)
+            const snapshot = mode === 'full' && !truncated
+                ? { version: key, url: location.href, elements: listed.map((el) => describe(el, idOf(el))) }
+                : null;
+            return { key: key, url: location.href, text: parts.join(' ').trim(), truncated: truncated, snapshot: snapshot };
+        },
+    };
+})());
+"""
+
+_SNAPSHOT_JS = f"""
+(args) => {{
+    {_ENGINE}
+    if (args.known !== null && args.known === oa.version()) return {{ unchanged: true }};
+    return oa.snapshot(args.types);
+}}
+"""
+
+_TEXT_JS = f"""
+(args) => {{
+    {_ENGINE}
+    if (args.known !== null && args.known === oa.textKey(args.mode)) return {{ unchanged: true }};
+    return oa.text(args.mode, args.budget, args.types);
+}}
+"""
+
+_VERSION_JS = f"""
+(mode) => {{
+    {_ENGINE}
+    return oa.textKey(mode);
+}}
+"""
+
+_INFO_JS = f"""
+(id) => {{
+    {_ENGINE}
+    return oa.info(id);
+}}
+"""
+
+TEXT_MODES = ("full", "viewport", "main")
+# Default character budget of the page text (stays below the per-message
+# truncation of message_truncation.MAX_SINGLE_MESSAGE_CHARS)
+DEFAULT_TEXT_BUDGET = 25_000
+MAX_TEXT_BUDGET = 30_000
+
+_BARE_TAG = re.compile(r"^[a-z][a-z0-9]*$")
+
+
+def element_selector(element_id: int) -> str:
+    """Playwright selector of a snapshot element."""
+    return f"oa-id={int(element_id)}"
+
+
+def _shared_tags(element_types: str) -> frozenset | None:
+    """The tags of *element_types* if the shared snapshot can answer it, else None."""
+    tags = frozenset(part.strip().lower() for part in element_types.split(",") if part.strip())
+    if tags and all(_BARE_TAG.match(tag) for tag in tags) and tags <= SNAPSHOT_TAGS:
+        return tags
+    return None
+
+
+class DomSnapshots:
+    """Last snapshots of one page, keyed by element types and checked against the DOM version."""
+
+    def __init__(self, page):
+        self.page = page
+        self._snapshots: dict[str, dict] = {}
+        # (mode, budget) -> last page text
+        self._texts: dict[tuple[str, int], dict] = {}
+        self.stats = {"walks": 0, "reused": 0}
+
+    async def version(self, mode: str = "full") -> str:
+        """Current DOM version of the page, plus the scroll position for mode="viewport"."""
+        return await self.page.evaluate(_VERSION_JS, mode)
+
+    async def _snapshot(self, types: str) -> dict:
+        cached = self._snapshots.get(types)
+        result = await self.page.evaluate(
+            _SNAPSHOT_JS,
+            {"types": types, "known": cached["version"] if cached else None},
+        )
+        if result.get("unchanged"):
+            self.stats["reused"] += 1
+            return cached
+        self.stats["walks"] += 1
+        self._store_snapshot(types, result)
+        return result
+
+    def _store_snapshot(self, types: str, snapshot: dict) -> None:
+        logger.debug(f"DOM snapshot of {snapshot['url']} ({len(snapshot['elements'])} elements, version {snapshot['version']})")
+        self._snapshots = {k: v for k, v in self._snapshots.items() if v["version"] == snapshot["version"]}
+        self._snapshots[types] = snapshot
+
+    async def page_snapshot(self) -> dict:
+        """Shared snapshot: the interactive elements of SNAPSHOT_TYPES."""
+        return await self._snapshot(SNAPSHOT_TYPES)
+
+    async def page_text(self, mode: str = "full", budget: int = DEFAULT_TEXT_BUDGET) -> dict:
+        """Marked-up text of the page: {"text", "truncated", "url", "key"}."""
+        cached = self._texts.get((mode, budget))
+        result = await self.page.evaluate(
+            _TEXT_JS,
+            {"mode": mode, "budget": budget, "types": SNAPSHOT_TYPES, "known": cached["key"] if cached else None},
+        )
+        if result.get("unchanged"):
+            self.stats["reused"] += 1
+            return cached
+        self.stats["walks"] += 1
+        if result.get("snapshot"):
+            # The walk covered the whole page: get_page_elements reuses it
+            self._store_snapshot(SNAPSHOT_TYPES, result.pop("snapshot"))
+        if len(self._texts) >= 8:
+            self._texts.clear()
+        self._texts[(mode, budget)] = result
+        return result
+
+    async def elements(self, element_types: str) -> list[dict]:
+        """Visible elements matching the CSS selector list *element_types*, with their stable ids."""
+        tags = _shared_tags(element_types)
+        if tags is not None:
+            snapshot = await self.page_snapshot()
+            return [el for el in snapshot["elements"] if el["tag"] in tags]
+        snapshot = await self._snapshot(element_types)
+        return snapshot["elements"]
+
+    async def element_info(self, element_id: int) -> dict | None:
+        """tag/text/href... of element *element_id*, or None if it is gone from the page."""
+        return await self.page.evaluate(_INFO_JS, int(element_id))
+
+    def invalidate(self) -> None:
+        self._snapshots.clear()
+        self._texts.clear()
@@ -1,9 +1,16 @@
 from langchain.tools import tool
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
+from .dom_snapshot import DEFAULT_TEXT_BUDGET, MAX_TEXT_BUDGET, TEXT_MODES
 
 
 @tool(parse_docstring=True)
-async def extract_page_text(page_title: str) -> str:
+async def extract_page_text(
+    page_title: str,
+    config: RunnableConfig,
+    mode: str = "full",
+    max_chars: int = DEFAULT_TEXT_BUDGET,
+) -> str:
     """
     Extracts structured text content from the specified browser page with element type annotations.
 
@@ -11,10 +18,14 @@ async def extract_page_text(page_title: str) -> str:
     Use this FIRST before attempting to interact with page elements.
 
     The extracted text includes markers like [BUTTON], [INPUT:type], [LINK], [FORM], etc.
-    to help you identify interactive elements and understand the page layout.
+    to help you identify interactive elements and understand the page layout. Visible
+    interactive elements carry their index, e.g. [BUTTON #12], usable with
+    click_element_by_index and fill_input.
 
     Args:
         page_title: The title of the browser page to extract text from
+        mode: "full" (whole page, default), "main" (main content only, without navigation, header, footer and sidebars) or "viewport" (only what is visible at the current scroll position).
+        max_chars: Maximum characters of text to return (default 25000, at most 30000). Extraction stops there.
 
     Returns:
         The structured text content with element type markers
@@ -22,89 +33,28 @@ async def extract_page_text(page_title: str) -> str:
     Example:
         >>> # After navigating to a page, extract text to understand structure
         >>> text = await extract_page_text(page_title="my_page")
-        >>> # Output will show: "[BUTTON] Submit [INPUT:text] Search [LINK] Home ..."
+        >>> # Output will show: "[BUTTON #0] Submit [INPUT:text #1] Search [LINK #2] Home ..."
         >>> # Then use get_page_elements to get selectors for interaction
     """
+    if mode not in TEXT_MODES:
+        return f"mode '{mode}' is invalid. Use one of: {', '.join(TEXT_MODES)}."
+    max_chars = min(max(int(max_chars), 1000), MAX_TEXT_BUDGET)
+
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    snapshots = manager.get_page_snapshots(page_title, thread_id_of(config))
 
-    if page is None:
+    if snapshots is None:
         return f"Page with title '{page_title}' does not exist."
 
     try:
-        # Extract structured text content with element type markers
-        text_content = await page.evaluate("""
-            () => {
-                // Function to get element type and role
-                function getElementInfo(el) {
-                    const tag = el.tagName.toLowerCase();
-                    const role = el.getAttribute('role');
-                    const type = el.getAttribute('type');
-
-                    // Determine element category
-                    if (tag === 'button' || role === 'button') {
-                        return '[BUTTON]';
-                    } else if (tag === 'input') {
-                        return `[INPUT:${type || 'text'}]`;
-                    } else if (tag === 'textarea') {
-                        return '[TEXTAREA]';
-                    } else if (tag === 'a') {
-                        return '[LINK]';
-                    } else if (tag === 'article') {
-                        return '[ARTICLE]';
-                    } else if (tag === 'nav') {
-                        return '[NAV]';
-                    } else if (tag === 'header') {
-                        return '[HEADER]';
-                    } else if (tag === 'footer') {
-                        return '[FOOTER]';
-                    } else if (tag === 'form') {
-                        return '[FORM]';
-                    } else if (['h1', 'h2', 'h3', 'h4', 'h5', 'h6'].includes(tag)) {
-                        return `[${tag.toUpperCase()}]`;
-                    } else if (tag === 'select') {
-                        return '[SELECT]';
-                    } else if (role === 'listbox') {
-                        return '[LISTBOX]';
-                    } else if (role === 'menu') {
-                        return '[MENU]';
-                    }
-                    return '';
-                }
-
-                // Remove script and style elements
-                const scripts = document.querySelectorAll('script, style');
-                scripts.forEach(el => el.remove());
-
-                // Process the body content recursively
-                function processNode(node) {
-                    if (node.nodeType === Node.TEXT_NODE) {
-                        return node.textContent.trim();
-                    }
-
-                    if (node.nodeType === Node.ELEMENT_NODE) {
-                        const tag = getElementInfo(node);
-                        let result = '';
-
-                        // Add opening tag if it's a special element
-                        if (tag) {
-                            result += tag + ' ';
-                        }
-
-                        // Process children
-                        for (const child of node.childNodes) {
-                            result += processNode(child);
-                        }
-
-                        return result + ' ';
-                    }
-
-                    return '';
-                }
-
-                return processNode(document.body).replace(/\s+/g, ' ').trim();
-            }
-        """)
+        # TreeWalker pass that skips scripts and styles without removing them
+        # from the page, and stops at the budget
+        result = await snapshots.page_text(mode, max_chars)
+        text_content = result["text"]
+
+        if result["truncated"]:
+            hint = ' Use mode="main" to skip the page chrome.' if mode == "full" else ""
+            text_content += f"\n\n[Text truncated at {max_chars} characters.{hint}]"
 
         return f"Structured text content from page '{page_title}':\n\n{text_content}"
     except Exception as e:
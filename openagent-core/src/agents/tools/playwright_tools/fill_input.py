@@ -1,10 +1,12 @@
 from typing import Annotated
 from langchain.tools import tool
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
+from .dom_snapshot import element_selector
 
 
 @tool(parse_docstring=True)
-async def fill_input(page_title: str, element_index: int, value: str, element_types: str = "input,textarea") -> str:
+async def fill_input(page_title: str, element_index: int, value: str, config: RunnableConfig) -> str:
     """
     Fills an input field or textarea with the specified value.
 
@@ -15,7 +17,6 @@ async def fill_input(page_title: str, element_index: int, value: str, element_ty
         page_title: The title of the browser page containing the input field
         element_index: The index number [N] from get_page_elements (e.g., 0, 1, 2)
         value: The text value to fill into the input field
-        element_types: Types of input elements to target (default: "input,textarea")
 
     Returns:
         Success message with filled value confirmation
@@ -29,66 +30,28 @@ async def fill_input(page_title: str, element_index: int, value: str, element_ty
         >>> await fill_input(page_title="my_page", element_index=1, value="user@example.com")
     """
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    snapshots = manager.get_page_snapshots(page_title, thread_id_of(config))
 
-    if page is None:
+    if snapshots is None:
         return f"Page with title '{page_title}' does not exist."
+    page = snapshots.page
 
     try:
-        # Get all visible input elements and fill the one at the specified index
-        result = await page.evaluate("""
-            (params) => {
-                const { index, types } = params;
-                const elementTypes = types.split(',').map(s => s.trim());
-                const selector = elementTypes.join(',');
-                const allElements = document.querySelectorAll(selector);
+        # Ids are stable: one lookup instead of re-querying and re-filtering the page
+        element_info = await snapshots.element_info(element_index)
 
-                // Filter visible elements (same logic as get_page_elements)
-                const visibleElements = Array.from(allElements).filter(el => {
-                    const rect = el.getBoundingClientRect();
-                    const isVisible = rect.width > 0 && rect.height > 0 &&
-                                     window.getComputedStyle(el).visibility !== 'hidden' &&
-                                     window.getComputedStyle(el).display !== 'none';
-                    return isVisible;
-                });
+        if element_info is None:
+            return f"No element with index {element_index} on page '{page_title}'. Call get_page_elements to get the current elements."
 
-                if (index >= visibleElements.length) {
-                    return { error: `Index ${index} out of range. Only ${visibleElements.length} visible input elements found.` };
-                }
-
-                const element = visibleElements[index];
-
-                // Get element info
-                const info = {
-                    tag: element.tagName.toLowerCase(),
-                    type: element.type || 'text',
-                    placeholder: element.placeholder || '',
-                    name: element.name || '',
-                    id: element.id || ''
-                };
-
-                // Add a temporary unique ID for filling
-                const tempId = 'pw-fill-' + Date.now();
-                element.setAttribute('data-pw-fill', tempId);
-
-                return { success: true, tempId: tempId, info: info };
-            }
-        """, {"index": element_index, "types": element_types})
-
-        if 'error' in result:
-            return result['error']
-
-        # Fill using the temporary selector
-        temp_selector = f"[data-pw-fill='{result['tempId']}']"
-        element_info = result['info']
+        selector = element_selector(element_index)
 
         try:
             # Clear existing value first
-            await page.fill(temp_selector, '', timeout=5000)
+            await page.fill(selector, '', timeout=5000)
             # Fill with new value
-            await page.fill(temp_selector, value, timeout=5000)
+            await page.fill(selector, value, timeout=5000)
 
-            return f"Filled {element_info['tag']} (type={element_info['type']}, index {element_index}) with value: \"{value[:50]}{'...' if len(value) > 50 else ''}\""
+            return f"Filled {element_info['tag']} (type={element_info['type'] or 'text'}, index {element_index}) with value: \"{value[:50]}{'...' if len(value) > 50 else ''}\""
 
         except Exception as e:
             return f"Error filling input at index {element_index}: {str(e)}"
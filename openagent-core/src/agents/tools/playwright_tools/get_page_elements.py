@@ -1,85 +1,32 @@
 from typing import Annotated
 from langchain.tools import tool, InjectedState
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
+from .dom_snapshot import element_selector
 
 
 @tool(parse_docstring=True)
-async def get_page_elements(page_title: str, element_types: str = "a,button,input") -> str:
+async def get_page_elements(page_title: str, config: RunnableConfig, element_types: str = "a,button,input") -> str:
     """
     Extracts interactive elements from the page with their selector paths.
 
     This tool retrieves all interactive elements (links, buttons, inputs, etc.) from the page
     and returns them with unique selectors that can be used with the click_element tool.
+    The number [N] of an element is its index for click_element_by_index and fill_input;
+    it keeps pointing at the same element while the page changes.
 
     Args:
         page_title: The title of the browser page to extract elements from
         element_types: Comma-separated list of element types to extract (default: "a,button,input")  """
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    snapshots = manager.get_page_snapshots(page_title, thread_id_of(config))
 
-    if page is None:
+    if snapshots is None:
         return f"Page with title '{page_title}' does not exist."
 
     try:
-        # JavaScript to extract interactive elements with their metadata
-        # Add unique data attributes to elements for reliable selection
-        elements_data = await page.evaluate(f"""
-            () => {{
-                const elementTypes = '{element_types}'.split(',').map(s => s.trim());
-                const selector = elementTypes.join(',');
-                const elements = document.querySelectorAll(selector);
-
-                return Array.from(elements).map((el, globalIndex) => {{
-                    const rect = el.getBoundingClientRect();
-                    const isVisible = rect.width > 0 && rect.height > 0 &&
-                                     window.getComputedStyle(el).visibility !== 'hidden' &&
-                                     window.getComputedStyle(el).display !== 'none';
-
-                    // Add a unique data attribute to the element for reliable selection
-                    const uniqueId = `pw-element-${{globalIndex}}-${{Date.now()}}`;
-                    el.setAttribute('data-pw-id', uniqueId);
-
-                    // Build selector - prefer data attribute for reliability
-                    let uniqueSelector = `[data-pw-id="${{uniqueId}}"]`;
-
-                    // Fallback selectors for reference
-                    let fallbackSelector = '';
-                    if (el.id) {{
-                        fallbackSelector = `#${{el.id}}`;
-                    }} else {{
-                        const tagName = el.tagName.toLowerCase();
-                        // Use XPath-style position for more reliable selection
-                        const parent = el.parentElement;
-                        if (parent) {{
-                            const allSiblings = Array.from(parent.children);
-                            const position = allSiblings.indexOf(el) + 1;
-
-                            if (parent.id) {{
-                                fallbackSelector = `#${{parent.id}} > :nth-child(${{position}})`;
-                            }} else {{
-                                // Get a more specific path
-                                fallbackSelector = `${{tagName}}:nth-child(${{position}})`;
-                            }}
-                        }} else {{
-                            fallbackSelector = tagName;
-                        }}
-                    }}
-
-                    return {{
-                        index: globalIndex,
-                        tag: el.tagName.toLowerCase(),
-                        text: el.innerText?.trim().substring(0, 100) || el.value || '',
-                        href: el.href || null,
-                        type: el.type || null,
-                        ariaLabel: el.getAttribute('aria-label'),
-                        title: el.getAttribute('title'),
-                        selector: uniqueSelector,
-                        fallbackSelector: fallbackSelector,
-                        isVisible: isVisible
-                    }};
-                }}).filter(el => el.isVisible);  // Only return visible elements
-            }}
-        """)
+        # Visible elements with stable ids, from the cached snapshot while the DOM is unchanged
+        elements_data = await snapshots.elements(element_types)
 
         if not elements_data:
             return f"No interactive elements found on page '{page_title}'."
@@ -92,7 +39,7 @@ async def get_page_elements(page_title: str, element_types: str = "a,button,inpu
             element_type = el['tag'].upper()
             text = el['text'] or el['ariaLabel'] or el['title'] or '(no text)'
 
-            description = f"[{el['index']}] {element_type}: \"{text}\""
+            description = f"[{el['id']}] {element_type}: \"{text}\""
 
             # Add additional attributes
             if el['href']:
@@ -100,7 +47,7 @@ async def get_page_elements(page_title: str, element_types: str = "a,button,inpu
             if el['type']:
                 description += f" (type={el['type']})"
 
-            description += f"\n    Selector: {el['selector']}"
+            description += f"\n    Selector: {element_selector(el['id'])}"
             description += f"\n    Text: {text}"  # Include text for fallback matching
 
             output_lines.append(description)
@@ -1,27 +1,41 @@
 from langchain.tools import tool
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
+from .page_loader import DEFAULT_LOAD_PROFILE, DEFAULT_WAIT_UNTIL, LOAD_PROFILES, WAIT_UNTIL_OPTIONS
 
 
 @tool(parse_docstring=True)
-async def navigate_to(url: str, page_title: str) -> str:
+async def navigate_to(
+    url: str,
+    page_title: str,
+    config: RunnableConfig,
+    load_profile: str = DEFAULT_LOAD_PROFILE,
+    wait_until: str = DEFAULT_WAIT_UNTIL,
+) -> str:
     """Navigates to a url in the specified page.
 
     Args:
         url: The url to navigate to.
         page_title: The browser page where you want to use for navigating.
+        load_profile: Resources the page loads: "text" (no images, media, fonts or trackers; fastest, enough for reading and clicking), "text+images" (use before capture_screenshot) or "full". Applies to the page until the next navigate_to.
+        wait_until: When the navigation is done: "commit", "domcontentloaded" (default), "load" or "networkidle" (for pages that render their content with JavaScript).
     """
 
     if not url.startswith("https://"):
         return f"URL '{url}' is invalid. URLs must always start with 'https://'."
+    if load_profile not in LOAD_PROFILES:
+        return f"load_profile '{load_profile}' is invalid. Use one of: {', '.join(LOAD_PROFILES)}."
+    if wait_until not in WAIT_UNTIL_OPTIONS:
+        return f"wait_until '{wait_until}' is invalid. Use one of: {', '.join(WAIT_UNTIL_OPTIONS)}."
 
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    loader = manager.get_page_loader(page_title, thread_id_of(config))
 
-    if page is None:
+    if loader is None:
         return f"Page with title '{page_title}' does not exist."
 
     try:
-        await page.goto(url, timeout=60000)
-        return f"Navigated successfully to url {url}"
+        stats = await loader.goto(url, load_profile, wait_until, timeout=60000)
+        return f"Navigated successfully to url {url}\n{stats.render(load_profile, wait_until)}"
     except Exception as e:
         return f"Navigation to url {url} returned error:\n{str(e)}"
@@ -0,0 +1,161 @@
+"""
+Lightweight page loads for navigate_to.
+
+A load profile decides which requests of a page are aborted before they
+leave the browser:
+
+- ``text``: no images, media, fonts or trackers (what extract_page_text and
+  the element tools need)
+- ``text+images``: like ``text`` but with images, for capture_screenshot
+- ``full``: everything, like a normal browser
+
+The profile stays active on the page (clicks included) until the next
+navigate_to. ``full`` removes the route altogether, since Playwright disables
+the HTTP cache of routed pages.
+
+Bytes transferred are read from the Chrome DevTools Protocol
+(Network.loadingFinished), so they are the encoded bytes on the wire,
+headers included. Without a CDP session (other browsers) the Content-Length
+of the responses is used instead.
+"""
+import os
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from agents.utils.logging import logger
+
+# Playwright resource types aborted by each profile
+LOAD_PROFILES = {
+    "text": frozenset({"image", "media", "font", "texttrack", "manifest"}),
+    "text+images": frozenset({"media", "font", "texttrack", "manifest"}),
+    "full": frozenset(),
+}
+DEFAULT_LOAD_PROFILE = os.getenv("OPENAGENT_BROWSER_LOAD_PROFILE", "text")
+if DEFAULT_LOAD_PROFILE not in LOAD_PROFILES:
+    DEFAULT_LOAD_PROFILE = "text"
+
+WAIT_UNTIL_OPTIONS = ("commit", "domcontentloaded", "load", "networkidle")
+DEFAULT_WAIT_UNTIL = "domcontentloaded"
+
+# Analytics and ad hosts (and their subdomains), aborted by every profile but "full"
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "googleadservices.com", "facebook.net", "connect.facebook.com", "hotjar.com", "segment.io",
+    "segment.com", "mixpanel.com", "amplitude.com", "scorecardresearch.com", "quantserve.com",
+    "taboola.com", "outbrain.com", "criteo.com", "adnxs.com", "newrelic.com", "nr-data.net",
+)
+
+
+def is_tracker(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in TRACKER_DOMAINS)
+
+
+def should_block(profile: str, resource_type: str, url: str) -> bool:
+    blocked = LOAD_PROFILES[profile]
+    if not blocked:
+        return False
+    return resource_type in blocked or is_tracker(url)
+
+
+@dataclass
+class NavigationStats:
+    """Outcome of one navigate_to."""
+    status: int | None
+    seconds: float
+    bytes: int
+    requests: int
+    blocked: int
+
+    def render(self, profile: str, wait_until: str) -> str:
+        status = f"HTTP {self.status}, " if self.status is not None else ""
+        return (
+            f"{status}loaded in {self.seconds:.2f}s (until '{wait_until}'), "
+            f"{_format_bytes(self.bytes)} transferred in {self.requests} requests, "
+            f"{self.blocked} blocked by the '{profile}' profile"
+        )
+
+
+def _format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class PageLoader:
+    """Interception profile and traffic counters of one page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.profile = "full"
+        self._routed = False
+        # None: not set up yet, False: CDP unavailable (Content-Length fallback)
+        self._cdp = None
+        self.bytes = 0
+        self.requests = 0
+        self.blocked = 0
+
+    async def set_profile(self, profile: str) -> None:
+        self.profile = profile
+        if LOAD_PROFILES[profile] and not self._routed:
+            await self.page.route("**/*", self._route)
+            self._routed = True
+        elif not LOAD_PROFILES[profile] and self._routed:
+            await self.page.unroute("**/*", self._route)
+            self._routed = False
+
+    async def _route(self, route) -> None:
+        request = route.request
+        if should_block(self.profile, request.resource_type, request.url):
+            self.blocked += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    # ── Traffic ─────────────────────────────────────────────────────────
+
+    async def _watch_traffic(self) -> None:
+        if self._cdp is not None:
+            return
+        try:
+            cdp = await self.page.context.new_cdp_session(self.page)
+            cdp.on("Network.loadingFinished", self._on_loading_finished)
+            await cdp.send("Network.enable")
+            self._cdp = cdp
+        except Exception as e:
+            logger.debug(f"No CDP session for page traffic, using Content-Length: {e!s}")
+            self._cdp = False
+            self.page.on("response", self._on_response)
+
+    def _on_loading_finished(self, event: dict) -> None:
+        self.requests += 1
+        self.bytes += int(event.get("encodedDataLength") or 0)
+
+    def _on_response(self, response) -> None:
+        self.requests += 1
+        try:
+            self.bytes += int(response.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    # ── Navigation ──────────────────────────────────────────────────────
+
+    async def goto(self, url: str, profile: str, wait_until: str, timeout: float = 60000) -> NavigationStats:
+        """Navigate with *profile* and return the load time and traffic of the navigation."""
+        await self.set_profile(profile)
+        await self._watch_traffic()
+        self.bytes = self.requests = self.blocked = 0
+        started = time.monotonic()
+        response = await self.page.goto(url, wait_until=wait_until, timeout=timeout)
+        stats = NavigationStats(
+            status=response.status if response is not None else None,
+            seconds=time.monotonic() - started,
+            bytes=self.bytes,
+            requests=self.requests,
+            blocked=self.blocked,
+        )
+        logger.debug(f"Navigation to {url}: {stats.render(profile, wait_until)}")
+        return stats
@@ -1,12 +1,13 @@
 from typing import Annotated
 from langchain.tools import tool
-from .browser_manager import BrowserManager
+from langchain_core.runnables import RunnableConfig
+from .browser_manager import BrowserManager, thread_id_of
 
 
 @tool(parse_docstring=True)
-async def refresh_page_elements(page_title: str) -> str:
+async def refresh_page_elements(page_title: str, config: RunnableConfig) -> str:
     """
-    Refreshes the element tracking on a page by clearing old data attributes.
+    Refreshes the element tracking on a page by discarding its cached element snapshot.
 
     Use this tool when:
     - The page has dynamically loaded new content
@@ -26,21 +27,11 @@ async def refresh_page_elements(page_title: str) -> str:
         >>> elements = await get_page_elements(page_title="my_page")
     """
     manager = await BrowserManager.get_instance()
-    page = manager.get_page(page_title)
+    snapshots = manager.get_page_snapshots(page_title, thread_id_of(config))
 
-    if page is None:
+    if snapshots is None:
         return f"Page with title '{page_title}' does not exist."
 
-    try:
-        # Remove all old data-pw-id attributes
-        await page.evaluate("""
-            () => {
-                const elements = document.querySelectorAll('[data-pw-id]');
-                elements.forEach(el => el.removeAttribute('data-pw-id'));
-            }
-        """)
-
-        return f"Page elements refreshed successfully on '{page_title}'. You can now call get_page_elements to get updated selectors."
-
-    except Exception as e:
-        return f"Error refreshing page elements: {str(e)}"
+    # Snapshots are already re-taken when the DOM changes; this forces the next one
+    snapshots.invalidate()
+    return f"Page elements refreshed successfully on '{page_title}'. You can now call get_page_elements to get updated selectors."
@@ -1,11 +1,13 @@
+import asyncio
 import os
 from langchain.tools import tool, InjectedToolCallId
-import aiofiles
 from langchain.messages import ToolMessage
 from langgraph.types import Command
 
 from typing import Annotated
 
+from .line_reader import file_sha256, format_numbered_lines, read_lines, short_sha256
+
 # Workspace root - consistent with coder.py and shell_tool
 WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
 
@@ -24,43 +26,34 @@ async def read_file(file_path: str, start: int, end: int, tool_call_id: Annotate
         file_path = os.path.join(WORKSPACE_ROOT, file_path)
 
     try:
-        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-            content = await f.read()
-            lines = content.splitlines(keepends=True)
+        # Streams the file: only the requested range is read and decoded
+        selected_lines, total_lines = await asyncio.to_thread(read_lines, file_path, start, end)
+        # Cached per file version; edit_file takes it as expected_sha256.
+        # None for files too large to index (hashing would read them whole)
+        sha256 = await asyncio.to_thread(file_sha256, file_path)
 
         # Convert to 0-indexed and handle bounds
         start_idx = max(0, start - 1)
-        end_idx = min(len(lines), end)
+        end_idx = start_idx + len(selected_lines)
 
         # Validate range
-        if start_idx >= len(lines):
-            return f"Error: Start line {start} is beyond the file length ({len(lines)} lines)"
-
-        if start_idx > end_idx:
+        if start > end:
             return f"Error: Start line ({start}) cannot be greater than end line ({end})"
 
-        # Get the slice of lines
-        selected_lines = lines[start_idx:end_idx]
-
-        # Calculate the width needed for line numbers
-        max_line_num = start_idx + len(selected_lines)
-        line_num_width = len(str(max_line_num))
+        if not selected_lines:
+            length = f"{total_lines} lines" if total_lines is not None else "fewer lines"
+            return f"Error: Start line {start} is beyond the file length ({length})"
 
         # Format with line numbers (VSCode style)
-        formatted_lines = []
-        for i, line in enumerate(selected_lines, start=start_idx + 1):
-            # Remove trailing newline for formatting, add it back after
-            line_content = line.rstrip('\n')
-            formatted_line = f"{i:>{line_num_width}}→{line_content}"
-            formatted_lines.append(formatted_line)
-
-        content = '\n'.join(formatted_lines)
+        content = format_numbered_lines(selected_lines, start_idx + 1)
 
         # Build header with line statistics
         lines_read = len(selected_lines)
-        total_lines = len(lines)
         range_info = f" (lines {start_idx + 1}-{end_idx})"
-        stats_info = f"{lines_read} lines out of {total_lines} total lines"
+        # Large streamed files are only scanned up to the requested range
+        total_info = f"{total_lines} total lines" if total_lines is not None else "a total not counted yet"
+        sha_info = f"sha256 {short_sha256(sha256)}" if sha256 is not None else "not hashed, too large"
+        stats_info = f"{lines_read} lines out of {total_info} ({sha_info})"
 
         return Command(
             update={
@@ -0,0 +1,115 @@
+import asyncio
+import os
+from langchain.tools import tool, InjectedToolCallId
+from langchain.messages import ToolMessage
+from langgraph.types import Command
+
+from typing import Annotated, TypedDict
+from typing_extensions import NotRequired
+
+from .line_reader import file_sha256, format_numbered_lines, read_lines, short_sha256
+
+# Workspace root - consistent with coder.py and shell_tool
+WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
+
+# Files read at the same time
+MAX_CONCURRENT_READS = 8
+# Max files per call
+MAX_FILES_PER_CALL = 20
+# Range used when a spec has no start/end
+DEFAULT_END_LINE = 2000
+
+
+class FileRange(TypedDict):
+    """Lines to read from a file."""
+    file_path: str
+    start: NotRequired[int]
+    end: NotRequired[int]
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sorted ranges with overlapping or adjacent ones merged (1-indexed, inclusive)."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _read_file_ranges(file_path: str, ranges: list[tuple[int, int]]) -> str:
+    """One section of the batch result: header + numbered lines of every range."""
+    parts = []
+    total_lines = 0
+    shown = []
+    for start, end in ranges:
+        lines, total_lines = read_lines(file_path, start, end)
+        if not lines:
+            continue
+        shown.append(f"{start}-{start + len(lines) - 1}")
+        parts.append(format_numbered_lines(lines, start))
+
+    sha256 = file_sha256(file_path)
+    # Large streamed files: total unknown until a read reaches EOF, no hash
+    total = total_lines if total_lines is not None else "?"
+    sha_info = f"sha256 {short_sha256(sha256)}" if sha256 is not None else "not hashed"
+    if not parts:
+        return f"=== {file_path} ({total} total lines, {sha_info}) ===\nNo lines in the requested range."
+    return (
+        f"=== {file_path} (lines {', '.join(shown)} of {total}, {sha_info}) ===\n"
+        + "\n...\n".join(parts)
+    )
+
+
+@tool(parse_docstring=True)
+async def read_files(files: list[FileRange], tool_call_id: Annotated[str, InjectedToolCallId]) -> str:
+    """
+    Reads several files (or several line ranges) in one call.
+
+    Use it instead of consecutive read_file calls. Ranges of the same file are merged.
+
+    Args:
+        files: Files to read, each with file_path and optional start/end lines (1-indexed, inclusive, default 1-2000)
+    """
+    if not files:
+        return "Error: no files given."
+    if len(files) > MAX_FILES_PER_CALL:
+        return f"Error: at most {MAX_FILES_PER_CALL} files per call ({len(files)} given)."
+
+    # Group ranges by file, keeping the order in which files were requested
+    requested: dict[str, list[tuple[int, int]]] = {}
+    # Files with an inverted range: reported in their section, not read
+    invalid: dict[str, str] = {}
+    for spec in files:
+        file_path = spec["file_path"]
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(WORKSPACE_ROOT, file_path)
+        start = max(1, spec.get("start") or 1)
+        end = spec.get("end") or DEFAULT_END_LINE
+        if start > end:
+            invalid.setdefault(file_path, f"Error: Start line ({start}) cannot be greater than end line ({end})")
+        requested.setdefault(file_path, []).append((start, end))
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+    async def read_one(file_path: str, ranges: list[tuple[int, int]]) -> tuple[str, bool]:
+        if file_path in invalid:
+            return f"=== {file_path} ===\n{invalid[file_path]}", False
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_read_file_ranges, file_path, merge_ranges(ranges)), True
+            except FileNotFoundError:
+                return f"=== {file_path} ===\nFile does not exist. Please check the file_path argument.", False
+            except Exception as e:
+                return f"=== {file_path} ===\nError reading file: {str(e)}", False
+
+    results = await asyncio.gather(*(read_one(path, ranges) for path, ranges in requested.items()))
+
+    read_paths = [path for path, (_, ok) in zip(requested, results) if ok]
+    return Command(
+        update={
+            "messages": [ToolMessage(content="\n\n".join(section for section, _ in results), tool_call_id=tool_call_id)],
+            "files": read_paths
+        }
+    )
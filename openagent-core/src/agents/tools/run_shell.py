@@ -1,69 +1,84 @@
-import asyncio
-import subprocess
 from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
 from agents.utils.logging import logger
+import asyncio
 import os
 
+from .job_registry import JobError, jobs
+from .shell_runner import DEFAULT_TIMEOUT, MAX_TIMEOUT, run_shell_command
+from .shell_session import DEFAULT_SESSION, PTY_AVAILABLE, ShellSessionError, shell_sessions
+
 # Workspace root - consistent with coder.py
 WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
 
 
-def _run_command_sync(command: str, cwd: str, timeout: float = 60.0) -> str:
-    """Runs a shell command synchronously. Called from a thread to avoid event loop issues."""
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-            timeout=timeout,
-            errors='replace'
-        )
-
-        output = f"Exit code: {result.returncode}\n\n"
-
-        if result.stdout:
-            output += f"STDOUT:\n{result.stdout}\n\n"
-
-        if result.stderr:
-            output += f"STDERR:\n{result.stderr}"
-
-        return output.strip()
-
-    except subprocess.TimeoutExpired:
-        return f"Error: Command timed out after {timeout} seconds"
-
-
 @tool(parse_docstring=True)
-async def shell_tool(command: str, cwd: str = None) -> str:
+async def shell_tool(
+    command: str,
+    config: RunnableConfig,
+    cwd: str = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    session: str = DEFAULT_SESSION,
+    background: bool = False,
+) -> str:
     """
-    Executes a shell command and returns the output.
+    Executes a shell command in a persistent shell session and returns the output.
+
+    The session keeps its working directory, environment variables and activated
+    virtualenvs between calls, so `cd`, `export` and `source` only need to run once.
 
     Args:
         command: The shell command to execute
-        cwd: Optional working directory for the command. Defaults to the workspace root directory.
+        cwd: Optional directory to `cd` into before the command (the session stays there). Sessions start in the workspace root directory.
+        timeout: Seconds before the command is interrupted. Defaults to 60.
+        session: Name of the shell session. Use different names to run independent shells (e.g. a server and its tests) in parallel.
+        background: Start the command as a background job and return its id immediately. Follow it with poll_job, wait_job and kill_job. No timeout is applied.
     """
-    # Default to workspace root directory
-    if cwd is None:
-        cwd = WORKSPACE_ROOT
+    # Validate that cwd exists (sessions start in the workspace root)
+    if not os.path.isdir(cwd or WORKSPACE_ROOT):
+        return f"Error: Working directory '{cwd or WORKSPACE_ROOT}' does not exist."
+
+    timeout = min(max(float(timeout), 1.0), MAX_TIMEOUT)
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+
+    if background:
+        # Separate process: starts in the session's directory, without its exported variables
+        shell = shell_sessions.peek(thread_id, session) if PTY_AVAILABLE else None
+        job_cwd = cwd or (shell.cwd if shell is not None else WORKSPACE_ROOT)
+        try:
+            job = await asyncio.to_thread(jobs.start, command, job_cwd, thread_id)
+        except JobError as e:
+            return f"Error: {str(e)}"
+        except Exception as e:
+            logger.error(f"Error starting background command '{command}': {str(e)}", exc_info=True)
+            return f"Error starting background command ({type(e).__name__}): {str(e)}"
+        return (
+            f"Started background job {job.id} in {job_cwd}: {command}\n"
+            f"Use poll_job, wait_job or kill_job with job_id='{job.id}'."
+        )
 
-    # Validate that cwd exists
-    if not os.path.isdir(cwd):
-        return f"Error: Working directory '{cwd}' does not exist."
+    # No PTYs on Windows: every command runs in a fresh process
+    if not PTY_AVAILABLE:
+        cwd = cwd or WORKSPACE_ROOT
+        try:
+            logger.debug(f"Running shell command in {cwd}: {command}")
+            result = await run_shell_command(command, cwd, timeout)
+            logger.debug(f"Command completed in {result.elapsed:.1f}s")
+            return result.render(timeout)
+        except Exception as e:
+            logger.error(f"Error executing command '{command}': {str(e)}", exc_info=True)
+            return f"Error executing command ({type(e).__name__}): {str(e)}"
 
     try:
-        logger.debug(f"Running shell command in {cwd}: {command}")
-
-        # Use asyncio.to_thread to run subprocess synchronously in a separate thread.
-        # This avoids the NotImplementedError that asyncio.create_subprocess_shell
-        # raises on Windows when using SelectorEventLoop (common in LangGraph).
-        result = await asyncio.to_thread(_run_command_sync, command, cwd)
-
-        logger.debug(f"Command completed")
-        return result
-
+        shell = shell_sessions.get(thread_id, session, cwd or WORKSPACE_ROOT)
+        async with shell.lock:
+            logger.debug(f"Running shell command in session {shell.key}: {command}")
+            result = await shell.run(command, timeout, cwd)
+        logger.debug(f"Command completed in {result.elapsed:.1f}s")
+        return result.render(timeout) + f"\n\n[session '{session}', cwd: {shell.cwd}]"
+
+    except ShellSessionError as e:
+        return f"Error: {str(e)}\nA new '{session}' session (cwd and environment reset) will be started on the next call."
     except Exception as e:
         logger.error(f"Error executing command '{command}': {str(e)}", exc_info=True)
         return f"Error executing command ({type(e).__name__}): {str(e)}"
-
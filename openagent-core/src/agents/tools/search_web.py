@@ -4,8 +4,10 @@ Web Search Tool using Tavily
 from langchain.tools import tool
 import os
 
+from .tavily_client import get_tavily_client
+
 @tool
-def search_web(query: str, max_results: int = 5) -> str:
+async def search_web(query: str, max_results: int = 5) -> str:
     """Searches the web using Tavily and returns results.
 
     This tool performs a direct web search optimized for AI agents.
@@ -19,8 +21,6 @@ def search_web(query: str, max_results: int = 5) -> str:
         Formatted search results with titles, URLs, and snippets
     """
     try:
-        from tavily import TavilyClient
-
         max_results = min(max_results, 10)  # Cap at 10 results
 
         # Get Tavily API key from environment
@@ -28,11 +28,11 @@ def search_web(query: str, max_results: int = 5) -> str:
         if not api_key:
             return "Error: TAVILY_API_KEY environment variable not set. Get your API key at https://tavily.com"
 
-        # Initialize Tavily client
-        tavily = TavilyClient(api_key=api_key)
+        # Shared SDK client per key, identical concurrent searches sent once
+        tavily = get_tavily_client(api_key)
 
         # Search using Tavily
-        response = tavily.search(query=query, max_results=max_results)
+        response = await tavily.asearch(query=query, max_results=max_results)
 
         if not response or 'results' not in response or not response['results']:
             return f"No results found for query: {query}"
@@ -0,0 +1,62 @@
+import asyncio
+from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
+
+from .job_registry import JobError, jobs
+from .shell_runner import DEFAULT_TIMEOUT, MAX_TIMEOUT
+
+
+def _thread_id(config: RunnableConfig | None) -> str | None:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+@tool(parse_docstring=True)
+async def poll_job(job_id: str, config: RunnableConfig, full_output: bool = False) -> str:
+    """
+    Returns the status of a background job and the output it printed since the previous poll.
+
+    Args:
+        job_id: Id returned by shell_tool(background=True)
+        full_output: Return the start and end of the whole output instead of only the new output
+    """
+    try:
+        job = jobs.get(job_id, _thread_id(config))
+    except JobError as e:
+        return f"Error: {str(e)}"
+    return job.render(job.read_all_output() if full_output else job.read_new_output())
+
+
+@tool(parse_docstring=True)
+async def wait_job(job_id: str, config: RunnableConfig, timeout: float = DEFAULT_TIMEOUT) -> str:
+    """
+    Waits until a background job finishes (or the timeout expires) and returns its status and new output.
+
+    The job keeps running if the timeout expires.
+
+    Args:
+        job_id: Id returned by shell_tool(background=True)
+        timeout: Max seconds to wait. Defaults to 60.
+    """
+    try:
+        job = jobs.get(job_id, _thread_id(config))
+    except JobError as e:
+        return f"Error: {str(e)}"
+    timeout = min(max(float(timeout), 0.0), MAX_TIMEOUT)
+    await asyncio.to_thread(job.finished.wait, timeout)
+    return job.render(job.read_new_output())
+
+
+@tool(parse_docstring=True)
+async def kill_job(job_id: str, config: RunnableConfig) -> str:
+    """
+    Kills a background job and every process it started.
+
+    Args:
+        job_id: Id returned by shell_tool(background=True)
+    """
+    try:
+        job = jobs.get(job_id, _thread_id(config))
+    except JobError as e:
+        return f"Error: {str(e)}"
+    await asyncio.to_thread(job.kill)
+    return job.render(job.read_new_output())
@@ -0,0 +1,237 @@
+"""
+Streaming shell command execution for shell_tool.
+
+Commands run as asyncio subprocesses in their own process group:
+
+- stdout/stderr are read incrementally. Each stream keeps only its first and
+  last bytes (CappedOutput), so a noisy build cannot fill memory or the
+  ToolMessage.
+- On timeout (or cancellation) the whole process group is killed, not just
+  the shell, and the partial output is still returned.
+- New output is reported as ``shell_output`` custom events (throttled), which
+  the CLI renders live.
+
+Event loops without subprocess support (SelectorEventLoop on Windows) fall
+back to ``subprocess.run`` in a thread, with the same output caps.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from agents.utils.logging import logger
+
+DEFAULT_TIMEOUT = 60.0
+MAX_TIMEOUT = 1800.0
+# Bytes kept per stream (half from the start, half from the end)
+MAX_OUTPUT_BYTES = int(os.getenv("OPENAGENT_SHELL_MAX_OUTPUT_BYTES", 32 * 1024))
+# Min seconds between two progress events of one command
+PROGRESS_INTERVAL = 0.5
+# Max chars of new output carried by one progress event
+PROGRESS_MAX_CHARS = 2000
+# Seconds given to the process group to exit after SIGTERM
+KILL_GRACE_PERIOD = 2.0
+
+READ_SIZE = 64 * 1024
+
+
+class CappedOutput:
+    """Head and tail of a byte stream, with the size of what was dropped in between."""
+
+    def __init__(self, max_bytes: int = MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: deque[bytes] = deque()
+        self.tail_size = 0
+        self.total = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data:
+            return
+
+        self.tail.append(data)
+        self.tail_size += len(data)
+        # Ring buffer: drop whole chunks while the rest still fills the tail
+        while self.tail_size - len(self.tail[0]) >= self.tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - min(self.tail_size, self.tail_limit)
+
+    def render(self) -> str:
+        tail = b"".join(self.tail)[-self.tail_limit:] if self.tail_limit else b""
+        head = self.head.decode("utf-8", errors="replace")
+        if not self.dropped:
+            return head + tail.decode("utf-8", errors="replace")
+        return (
+            head
+            + f"\n\n... [{self.dropped} bytes omitted] ...\n\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+@dataclass
+class CommandResult:
+    returncode: int | None
+    stdout: CappedOutput
+    stderr: CappedOutput
+    timed_out: bool = False
+    elapsed: float = 0.0
+    # What happened to the command on timeout
+    timeout_action: str = "process group killed"
+
+    def render(self, timeout: float) -> str:
+        if self.timed_out:
+            output = f"Error: Command timed out after {timeout:g} seconds ({self.timeout_action})\n\n"
+        else:
+            output = f"Exit code: {self.returncode}\n\n"
+        stdout, stderr = self.stdout.render(), self.stderr.render()
+        if stdout:
+            output += f"STDOUT:\n{stdout}\n\n"
+        if stderr:
+            output += f"STDERR:\n{stderr}"
+        return output.strip()
+
+
+async def _report_progress(command: str, stream: str, text: str, elapsed: float) -> None:
+    try:
+        from langchain_core.callbacks import adispatch_custom_event
+        await adispatch_custom_event(
+            "shell_output",
+            {"command": command, "stream": stream, "text": text[-PROGRESS_MAX_CHARS:], "elapsed": elapsed},
+        )
+    except Exception:
+        # Outside a runnable (no parent run) or no callbacks: nothing to report to
+        pass
+
+
+def kill_process_group(proc) -> None:
+    """Send SIGKILL to the process group of *proc* (or kill the process on Windows)."""
+    try:
+        if os.name == "nt":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(proc) -> None:
+    """SIGTERM the process group, then SIGKILL it if it is still alive after the grace period."""
+    if proc.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            proc.terminate()
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=KILL_GRACE_PERIOD)
+    except asyncio.TimeoutError:
+        kill_process_group(proc)
+
+
+async def run_command(
+    command: str,
+    cwd: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_output_bytes: int = MAX_OUTPUT_BYTES,
+    report_progress: bool = True,
+) -> CommandResult:
+    """Run *command* with a shell, streaming its output. Raises NotImplementedError without subprocess support."""
+    started = time.monotonic()
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        # Own process group, so that children are killed with the shell
+        start_new_session=os.name != "nt",
+    )
+    result = CommandResult(None, CappedOutput(max_output_bytes), CappedOutput(max_output_bytes))
+
+    async def pump(stream, buffer: CappedOutput, name: str) -> None:
+        pending = bytearray()
+        last_report = time.monotonic()
+        while True:
+            data = await stream.read(READ_SIZE)
+            if data:
+                buffer.feed(data)
+                if report_progress:
+                    pending += data[-PROGRESS_MAX_CHARS:]
+                    del pending[:-PROGRESS_MAX_CHARS]
+            now = time.monotonic()
+            if pending and (not data or now - last_report >= PROGRESS_INTERVAL):
+                await _report_progress(command, name, pending.decode("utf-8", errors="replace"), now - started)
+                pending.clear()
+                last_report = now
+            if not data:
+                return
+
+    async def communicate() -> int:
+        await asyncio.gather(
+            pump(proc.stdout, result.stdout, "stdout"),
+            pump(proc.stderr, result.stderr, "stderr"),
+        )
+        return await proc.wait()
+
+    task = asyncio.ensure_future(communicate())
+    try:
+        result.returncode = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except asyncio.TimeoutError:
+        result.timed_out = True
+        await _terminate(proc)
+        # Pipes close once the group is gone; don't wait on stray holders
+        try:
+            await asyncio.wait_for(task, timeout=KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            pass
+        result.returncode = proc.returncode
+    except asyncio.CancelledError:
+        kill_process_group(proc)
+        task.cancel()
+        raise
+
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def run_command_sync(command: str, cwd: str, timeout: float = DEFAULT_TIMEOUT, max_output_bytes: int = MAX_OUTPUT_BYTES) -> CommandResult:
+    """Fallback without asyncio subprocess support. Output is buffered, then capped."""
+    started = time.monotonic()
+    result = CommandResult(None, CappedOutput(max_output_bytes), CappedOutput(max_output_bytes))
+    try:
+        completed = subprocess.run(command, shell=True, capture_output=True, cwd=cwd, timeout=timeout)
+        result.returncode = completed.returncode
+        result.stdout.feed(completed.stdout or b"")
+        result.stderr.feed(completed.stderr or b"")
+    except subprocess.TimeoutExpired as e:
+        result.timed_out = True
+        result.stdout.feed(e.stdout or b"")
+        result.stderr.feed(e.stderr or b"")
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+async def run_shell_command(command: str, cwd: str, timeout: float = DEFAULT_TIMEOUT) -> CommandResult:
+    """run_command, or run_command_sync in a thread when the event loop cannot spawn subprocesses."""
+    try:
+        return await run_command(command, cwd, timeout)
+    except NotImplementedError:
+        # SelectorEventLoop on Windows (common in LangGraph) has no subprocess support
+        logger.debug("Event loop without subprocess support, running the command in a thread")
+        return await asyncio.to_thread(run_command_sync, command, cwd, timeout)
@@ -0,0 +1,419 @@
+"""
+Persistent shell sessions for shell_tool.
+
+Each (thread_id, name) pair owns a long-lived interactive shell attached to a
+pseudo-terminal, so ``cd``, ``export`` and ``source venv/bin/activate`` carry
+over to the next call instead of being repeated (and re-paid) every time.
+
+Commands are written to the shell followed by a sentinel line that prints a
+per-command marker, the exit code and the shell's cwd. Output is read from the
+PTY until the marker shows up, using the same head/tail caps and progress
+events as the one-shot runner. stdout and stderr share the terminal, so they
+come back merged.
+
+On timeout the foreground command is interrupted (SIGINT to the session's
+process group, which the interactive shell itself survives). If the shell
+still does not answer, the session is killed and recreated on the next call.
+
+PTYs are POSIX only: on Windows ``PTY_AVAILABLE`` is False and shell_tool runs
+every command in a fresh process.
+"""
+
+import asyncio
+import atexit
+import os
+import re
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+from agents.utils.logging import logger
+
+from .shell_runner import (
+    DEFAULT_TIMEOUT,
+    KILL_GRACE_PERIOD,
+    MAX_OUTPUT_BYTES,
+    PROGRESS_INTERVAL,
+    PROGRESS_MAX_CHARS,
+    CappedOutput,
+    CommandResult,
+    _report_progress,
+    kill_process_group,
+)
+
+try:
+    import pty
+    import termios
+    PTY_AVAILABLE = True
+except ImportError:  # Windows
+    PTY_AVAILABLE = False
+
+# Shell started for each session
+SESSION_SHELL = os.getenv("OPENAGENT_SHELL") or shutil.which("bash") or "/bin/sh"
+# Max live sessions across all threads (least recently used idle ones are closed)
+MAX_SESSIONS = 16
+# Sessions unused for this long are closed
+SESSION_IDLE_TIMEOUT = 30 * 60
+
+# Seconds to wait for the shell after interrupting a command before asking it again
+INTERRUPT_WAIT = 0.5
+
+DEFAULT_SESSION = "default"
+READ_SIZE = 64 * 1024
+
+# Environment shared by every session: no pagers, colors or prompts in the output
+SESSION_ENV = {
+    "TERM": "dumb",
+    "PAGER": "cat",
+    "GIT_PAGER": "cat",
+    "PS1": "",
+    "PS2": "",
+    "HISTFILE": "/dev/null",
+}
+
+
+class ShellSessionError(Exception):
+    """The session shell died or could not be started."""
+
+
+class ShellSession:
+    """One interactive shell on a PTY, running one command at a time."""
+
+    def __init__(self, key: tuple[str, str], cwd: str, shell: str = SESSION_SHELL):
+        self.key = key
+        self.cwd = cwd
+        self.shell = shell
+        self.proc: subprocess.Popen | None = None
+        self.master_fd: int | None = None
+        # Loop watching master_fd while a command runs
+        self._reader_loop: asyncio.AbstractEventLoop | None = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.commands_run = 0
+        self._marker_prefix = f"__OA_{os.urandom(6).hex()}_"
+        # "\n<prefix><command number> <exit code> <cwd>\n"
+        self._marker_line = b"\n" + self._marker_prefix.encode()
+        self._sentinel_pattern = re.compile(re.escape(self._marker_line) + rb"(\d+) (-?\d+) ([^\n]*)\n")
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        master_fd, slave_fd = pty.openpty()
+        # No "\n" -> "\r\n" translation, no echo of what we write, no line
+        # discipline limit on long commands
+        attrs = termios.tcgetattr(slave_fd)
+        attrs[1] &= ~termios.OPOST
+        attrs[3] &= ~(termios.ECHO | termios.ICANON)
+        attrs[6][termios.VMIN] = 1
+        attrs[6][termios.VTIME] = 0
+        termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+
+        args = [self.shell]
+        if os.path.basename(self.shell) == "bash":
+            args += ["--norc", "--noprofile", "--noediting"]
+        args.append("-i")
+        try:
+            self.proc = subprocess.Popen(
+                args,
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=self.cwd,
+                env={**os.environ, **SESSION_ENV},
+                # Own process group: interrupts and kills reach every child
+                start_new_session=True,
+            )
+        finally:
+            os.close(slave_fd)
+        os.set_blocking(master_fd, False)
+        self.master_fd = master_fd
+        # Prompts off, no job control (commands stay in the shell's group).
+        # The PTY is new and its input buffer empty: this short write cannot block
+        os.write(master_fd, b"PS1=''; PS2=''; PROMPT_COMMAND=''; set +m 2>/dev/null\n")
+        logger.debug(f"Started shell session {self.key} (pid {self.proc.pid}) in {self.cwd}")
+
+    def close(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            kill_process_group(self.proc)
+            try:
+                self.proc.wait(timeout=KILL_GRACE_PERIOD)
+            except subprocess.TimeoutExpired:
+                pass
+        if self.master_fd is not None:
+            # Unregister before closing: the fd number is reused by the next PTY
+            self._unwatch()
+            try:
+                os.close(self.master_fd)
+            except OSError:
+                pass
+            self.master_fd = None
+
+    def _unwatch(self) -> None:
+        if self._reader_loop is not None:
+            self._reader_loop.remove_reader(self.master_fd)
+            self._reader_loop = None
+
+    async def _write(self, text: str) -> None:
+        """Write *text* to the shell; while the PTY buffer is full, wait for it on the loop."""
+        data = text.encode("utf-8")
+        loop = asyncio.get_running_loop()
+        while data:
+            try:
+                written = os.write(self.master_fd, data)
+            except BlockingIOError:
+                writable = loop.create_future()
+                loop.add_writer(self.master_fd, lambda: writable.done() or writable.set_result(None))
+                try:
+                    await writable
+                finally:
+                    loop.remove_writer(self.master_fd)
+                continue
+            data = data[written:]
+
+    def _drain(self) -> bytes:
+        """Read whatever is already buffered (startup banners, output of background jobs)."""
+        chunks = []
+        while True:
+            try:
+                data = os.read(self.master_fd, READ_SIZE)
+            except (BlockingIOError, OSError):
+                break
+            if not data:
+                break
+            chunks.append(data)
+        return b"".join(chunks)
+
+    def _sentinel(self, marker: str) -> str:
+        # The marker is split in two quoted halves so that it never appears in
+        # what we write, only in what the shell prints.
+        half = len(marker) // 2
+        return f"printf '\\n%s%s %s %s\\n' '{marker[:half]}' '{marker[half:]}' \"$?\" \"$PWD\"\n"
+
+    def _partial_sentinel_start(self, data: bytearray) -> int:
+        """Offset of a sentinel line that may still be incomplete at the end of *data* (len(data) if none)."""
+        start = data.find(self._marker_line)
+        if start >= 0:
+            return start
+        start = data.rfind(b"\n", max(0, len(data) - len(self._marker_line)))
+        if start >= 0 and self._marker_line.startswith(data[start:]):
+            return start
+        return len(data)
+
+    def _keep_current(self, match: re.Match) -> bytes:
+        return match.group(0) if int(match.group(1)) == self.commands_run else b""
+
+    async def run(
+        self,
+        command: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        cwd: str | None = None,
+        max_output_bytes: int = MAX_OUTPUT_BYTES,
+        report_progress: bool = True,
+    ) -> CommandResult:
+        """
+        Run *command* in the session. Raises ShellSessionError when the shell exits.
+
+        A command that times out and cannot be interrupted takes the session down
+        with it: the result is still returned and ``alive`` is False afterwards.
+        """
+        if not self.alive:
+            raise ShellSessionError("shell session is not running")
+
+        started = time.monotonic()
+        self.last_used = started
+        self.commands_run += 1
+        marker = f"{self._marker_prefix}{self.commands_run}"
+        result = CommandResult(None, CappedOutput(max_output_bytes), CappedOutput(0))
+
+        stale = self._drain()
+        if stale:
+            logger.debug(f"Discarded {len(stale)} bytes of background output in session {self.key}")
+
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        pending = bytearray()
+        progress = bytearray()
+
+        def on_readable() -> None:
+            nonlocal pending
+            try:
+                data = os.read(self.master_fd, READ_SIZE)
+            except BlockingIOError:
+                return
+            except OSError:
+                data = b""
+            if not data:
+                # EIO/EOF: the shell exited (e.g. the command ran `exit`)
+                self._unwatch()
+                if not done.done():
+                    done.set_result(None)
+                return
+
+            # Sentinels of interrupted commands may arrive late: they are not output
+            pending = bytearray(self._sentinel_pattern.sub(self._keep_current, pending + data))
+            match = self._sentinel_pattern.search(pending)
+            if match:
+                output = pending[:match.start()]
+                result.returncode = int(match.group(2))
+                self.cwd = match.group(3).decode("utf-8", errors="replace") or self.cwd
+                pending = bytearray()
+                self._unwatch()
+                if not done.done():
+                    done.set_result(None)
+            else:
+                cut = self._partial_sentinel_start(pending)
+                output, pending = pending[:cut], pending[cut:]
+
+            if output:
+                result.stdout.feed(bytes(output))
+                if report_progress:
+                    progress.extend(output[-PROGRESS_MAX_CHARS:])
+                    del progress[:-PROGRESS_MAX_CHARS]
+
+        async def report() -> None:
+            while not done.done():
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                if progress:
+                    text = progress.decode("utf-8", errors="replace")
+                    progress.clear()
+                    await _report_progress(command, "stdout", text, time.monotonic() - started)
+
+        # stdin comes from /dev/null so the command cannot swallow the sentinel
+        script = f"{{\n{command}\n}} </dev/null\n"
+        if cwd:
+            script = f"cd -- {shlex.quote(cwd)} && {script}"
+        self._reader_loop = loop
+        loop.add_reader(self.master_fd, on_readable)
+        reporter = asyncio.ensure_future(report()) if report_progress else None
+        try:
+            await self._write(script + self._sentinel(marker))
+            try:
+                await asyncio.wait_for(asyncio.shield(done), timeout=timeout)
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                result.timeout_action = "interrupted"
+                if not await self._interrupt(done, marker):
+                    result.timeout_action = "killed, session reset: cwd and environment lost"
+        except asyncio.CancelledError:
+            self.close()
+            raise
+        finally:
+            self._unwatch()
+            if reporter is not None:
+                reporter.cancel()
+
+        if pending:
+            # No sentinel (interrupted or killed): what was held back is output too
+            result.stdout.feed(bytes(self._sentinel_pattern.sub(b"", pending)))
+        if progress:
+            await _report_progress(command, "stdout", progress.decode("utf-8", errors="replace"), time.monotonic() - started)
+        result.elapsed = time.monotonic() - started
+        self.last_used = time.monotonic()
+        if result.returncode is None and not result.timed_out:
+            # EOF before the sentinel: the shell exited
+            self.close()
+            raise ShellSessionError(
+                "shell session exited" + (f"; output before exit:\n{result.stdout.render()}" if result.stdout.total else "")
+            )
+        return result
+
+    async def _interrupt(self, done: asyncio.Future, marker: str) -> bool:
+        """SIGINT the foreground command; kill the session if the shell does not come back (returns False)."""
+        try:
+            os.killpg(self.proc.pid, signal.SIGINT)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            await asyncio.wait_for(asyncio.shield(done), timeout=INTERRUPT_WAIT)
+            return True
+        except asyncio.TimeoutError:
+            pass
+        # The interrupt may have discarded input the shell had not read yet: ask again
+        await self._write(self._sentinel(marker))
+        try:
+            await asyncio.wait_for(asyncio.shield(done), timeout=KILL_GRACE_PERIOD)
+            return True
+        except asyncio.TimeoutError:
+            logger.debug(f"Shell session {self.key} did not recover from the interrupt, killing it")
+            self.close()
+            return False
+
+
+class ShellSessionPool:
+    """Live sessions by (thread_id, name), bounded and least recently used first out."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = SESSION_IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[tuple[str, str], ShellSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str | None, name: str, cwd: str) -> ShellSession:
+        """Return the live session for (thread_id, name), starting it in *cwd* if needed."""
+        key = (thread_id or "__default__", name or DEFAULT_SESSION)
+        to_close = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and not session.alive:
+                to_close.append(self._sessions.pop(key))
+                session = None
+            if session is None:
+                session = ShellSession(key, cwd)
+                session.start()
+                self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            to_close += self._evict()
+        for stale in to_close:
+            stale.close()
+        return session
+
+    def peek(self, thread_id: str | None, name: str) -> ShellSession | None:
+        """The live session for (thread_id, name), without starting one."""
+        with self._lock:
+            session = self._sessions.get((thread_id or "__default__", name or DEFAULT_SESSION))
+        return session if session is not None and session.alive else None
+
+    def _evict(self) -> list[ShellSession]:
+        """Pop idle-expired sessions, then the least recently used ones above the limit."""
+        now = time.monotonic()
+        evicted = []
+        for key, session in list(self._sessions.items()):
+            busy = session.lock.locked()
+            expired = now - session.last_used > self.idle_timeout
+            over_limit = len(self._sessions) > self.max_sessions
+            if not busy and (expired or over_limit) and key != next(reversed(self._sessions)):
+                evicted.append(self._sessions.pop(key))
+        return evicted
+
+    def close(self, thread_id: str | None, name: str | None = None) -> None:
+        """Close one session, or every session of the thread when *name* is None."""
+        thread_key = thread_id or "__default__"
+        with self._lock:
+            keys = [k for k in self._sessions if k[0] == thread_key and (name is None or k[1] == name)]
+            sessions = [self._sessions.pop(k) for k in keys]
+        for session in sessions:
+            session.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "keys": list(self._sessions),
+            }
+
+
+shell_sessions = ShellSessionPool()
+atexit.register(shell_sessions.close_all)
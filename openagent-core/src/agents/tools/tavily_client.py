@@ -0,0 +1,79 @@
+"""
+Shared Tavily search client.
+
+search_web used to build a new ``tavily.TavilyClient`` per call. One SDK
+``AsyncTavilyClient`` is now kept per API key and event loop and reused by
+every search, so the SDK's HTTP client and its keep-alive connections are not
+rebuilt on each call, and searches no longer block the event loop. The httpx
+client of the SDK belongs to the loop that first used it (its pooled
+connections cannot be awaited from another one), hence one per loop.
+
+On top of it, identical concurrent searches are coalesced: the second caller
+awaits the first one's request instead of sending its own. The request runs
+as a task of its own, so it completes for the other callers even if the
+caller that started it is cancelled.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import weakref
+
+from agents.utils.logging import logger
+
+
+class CoalescingTavilyClient:
+    """Wraps an ``AsyncTavilyClient``: identical in-flight searches share one request."""
+
+    def __init__(self, client):
+        self.client = client
+        # search arguments -> in-flight request (the client is used by one event loop)
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.stats = {"requests": 0, "coalesced": 0}
+
+    async def asearch(self, query: str, max_results: int = 5, **params) -> dict:
+        """AsyncTavilyClient.search. Concurrent calls with the same arguments share one request."""
+        key = json.dumps({"query": query, "max_results": max_results, **params}, sort_keys=True)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            logger.debug(f"Tavily search coalesced with an in-flight request: {query}")
+        else:
+            self.stats["requests"] += 1
+            task = asyncio.ensure_future(self.client.search(query=query, max_results=max_results, **params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled meanwhile
+            task.exception()
+
+
+# Event loop -> (API key, base URL) -> client; dropped with their loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str | None], CoalescingTavilyClient]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_tavily_client(api_key: str, base_url: str | None = None) -> CoalescingTavilyClient:
+    """Shared client for *api_key* on the running event loop.
+
+    *base_url* (default: ``TAVILY_BASE_URL``, else the SDK's) points the
+    client at another Tavily API endpoint. Raises ImportError if tavily-python
+    is not installed.
+    """
+    base_url = base_url or os.getenv("TAVILY_BASE_URL") or None
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get((api_key, base_url))
+        if client is None:
+            from tavily import AsyncTavilyClient
+
+            client = clients[(api_key, base_url)] = CoalescingTavilyClient(
+                AsyncTavilyClient(api_key=api_key, api_base_url=base_url)
+            )
+        return client
@@ -1,14 +1,40 @@
+import asyncio
 import os
 from langchain.tools import tool, InjectedToolCallId
 from agents.utils.logging import logger
-import aiofiles
 from langgraph.types import Command
 from langchain.messages import ToolMessage
 from typing import Annotated
 
+from .line_reader import invalidate_line_index
+
 # Workspace root - consistent with coder.py and shell_tool
 WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
 
+
+def write_text(file_path: str, content: str, append: bool = False) -> None:
+    """Write (or append) *content* to an absolute *file_path*. Blocking, run it in a thread."""
+    # Ensure parent directories exist
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    # Drop the cached line offsets of the previous version
+    invalidate_line_index(file_path)
+
+    if append:
+        # Start on a new line only if the file does not already end with one
+        needs_newline = False
+        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+            with open(file_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        with open(file_path, "a", encoding="utf-8") as f:
+            f.write(("\n" if needs_newline else "") + content)
+        return
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
 @tool()
 async def write_file(file_path: str, content: str, tool_call_id: Annotated[str, InjectedToolCallId], append: bool = False) -> str:
     """
@@ -23,14 +49,10 @@ async def write_file(file_path: str, content: str, tool_call_id: Annotated[str,
     if not os.path.isabs(file_path):
         file_path = os.path.join(WORKSPACE_ROOT, file_path)
 
-    # Ensure parent directories exist
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
     if append:
         try:
             logger.debug(f"Attempting to append content to file: {file_path}")
-            async with aiofiles.open(file_path, "a", encoding="utf-8") as f:
-                await f.write("\n" + content)
+            await asyncio.to_thread(write_text, file_path, content, True)
             logger.debug(f"Successfully appended content to file: {file_path}")
             return Command(
                     update={
@@ -47,8 +69,7 @@ async def write_file(file_path: str, content: str, tool_call_id: Annotated[str,
 
     try:
         logger.debug(f"Attempting to create/overwrite file: {file_path}")
-        async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
-            await f.write("\n" + content)
+        await asyncio.to_thread(write_text, file_path, content)
         logger.debug(f"Successfully created/overwritten file: {file_path}")
         return Command(
             update={
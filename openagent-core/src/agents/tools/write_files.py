@@ -0,0 +1,78 @@
+import asyncio
+import os
+from langchain.tools import tool, InjectedToolCallId
+from langchain.messages import ToolMessage
+from langgraph.types import Command
+from agents.utils.logging import logger
+
+from typing import Annotated, TypedDict
+from typing_extensions import NotRequired
+
+from .write_file import write_text
+
+# Workspace root - consistent with coder.py and shell_tool
+WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
+
+# Files written at the same time
+MAX_CONCURRENT_WRITES = 8
+# Max files per call
+MAX_FILES_PER_CALL = 20
+
+
+class FileWrite(TypedDict):
+    """Content to write to a file."""
+    file_path: str
+    content: str
+    append: NotRequired[bool]
+
+
+@tool(parse_docstring=True)
+async def write_files(files: list[FileWrite], tool_call_id: Annotated[str, InjectedToolCallId]) -> str:
+    """
+    Writes several files in one call.
+
+    Use it instead of consecutive write_file calls. Writes to the same file are applied in the given order.
+
+    Args:
+        files: Files to write, each with file_path, content and optional append (default false, overwrites the file)
+    """
+    if not files:
+        return "Error: no files given."
+    if len(files) > MAX_FILES_PER_CALL:
+        return f"Error: at most {MAX_FILES_PER_CALL} files per call ({len(files)} given)."
+
+    # Writes grouped by file: files are written concurrently, each file's writes in order
+    requested: dict[str, list[FileWrite]] = {}
+    for spec in files:
+        file_path = spec["file_path"]
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(WORKSPACE_ROOT, file_path)
+        requested.setdefault(file_path, []).append(spec)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_WRITES)
+
+    async def write_one(file_path: str, writes: list[FileWrite]) -> tuple[str, bool]:
+        async with semaphore:
+            try:
+                for spec in writes:
+                    await asyncio.to_thread(write_text, file_path, spec["content"], bool(spec.get("append")))
+                appended = all(spec.get("append") for spec in writes)
+                size = sum(len(spec["content"]) for spec in writes)
+                return f"- {file_path}: {'appended' if appended else 'written'} ({size} chars)", True
+            except PermissionError:
+                return f"- {file_path}: permission denied", False
+            except Exception as e:
+                logger.error(f"Error writing file {file_path}: {str(e)}", exc_info=True)
+                return f"- {file_path}: error ({str(e)})", False
+
+    logger.debug(f"Writing {len(requested)} files")
+    results = await asyncio.gather(*(write_one(path, writes) for path, writes in requested.items()))
+
+    written = [path for path, (_, ok) in zip(requested, results) if ok]
+    summary = f"{len(written)} of {len(requested)} files written:\n" + "\n".join(line for line, _ in results)
+    return Command(
+        update={
+            "messages": [ToolMessage(content=summary, tool_call_id=tool_call_id)],
+            "files": written
+        }
+    )
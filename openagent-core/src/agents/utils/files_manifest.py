@@ -0,0 +1,53 @@
+"""
+Manifest of the files used in a conversation.
+
+The ``files`` state channel is updated by read_file / write_file on every
+call. ``merge_files`` is its reducer: it keeps each path once (most recently
+used last) and bounds the list, so the channel does not grow with every read.
+
+The manifest is rendered as a separate block placed AFTER the cached prompt
+prefix, so the system prompt stays byte-identical from step to step.
+"""
+
+from functools import lru_cache
+
+from langchain_core.messages import HumanMessage
+
+# Max number of paths kept in the ``files`` channel (least recently used are dropped)
+MAX_TRACKED_FILES = 50
+
+
+def merge_files(left: list[str] | None, right: list[str] | str | None) -> list[str]:
+    """Reducer for the ``files`` channel: ordered, deduplicated and bounded."""
+    if not right:
+        return list(left or [])
+    if isinstance(right, str):
+        right = [right]
+
+    merged = dict.fromkeys(left or [])
+    for path in right:
+        # Re-inserting moves the path to the end (most recent)
+        merged.pop(path, None)
+        merged[path] = None
+
+    files = list(merged)
+    if len(files) > MAX_TRACKED_FILES:
+        files = files[-MAX_TRACKED_FILES:]
+    return files
+
+
+@lru_cache(maxsize=32)
+def _render_manifest(files: tuple[str, ...]) -> str:
+    return (
+        "<files_used>\n\n"
+        "In the current conversation, the following files were already read or written:\n\n"
+        + "\n".join(files)
+        + "\n\n</files_used>"
+    )
+
+
+def files_manifest_message(files: list[str] | None) -> list[HumanMessage]:
+    """The manifest as a message list to append after the history (empty if no files)."""
+    if not files:
+        return []
+    return [HumanMessage(content=_render_manifest(tuple(files)))]
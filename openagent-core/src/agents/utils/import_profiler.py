@@ -0,0 +1,79 @@
+"""
+Import-time profiler for the CLI ``--profile-startup`` flag.
+
+Wraps ``builtins.__import__`` and accumulates the self time (excluding nested
+imports) of every import, grouped by top-level package, plus named phases
+(wall-clock marks since the profiler was created). Works across threads, so
+imports done by background loaders are attributed too.
+"""
+
+import builtins
+import sys
+import threading
+import time
+from collections import defaultdict
+
+
+class ImportProfiler:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.self_times: dict[str, float] = defaultdict(float)
+        self.phases: list[tuple[str, float]] = []
+        self._original_import = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, phase: str) -> float:
+        """Record *phase* as reached now. Returns seconds since the profiler was created."""
+        elapsed = time.perf_counter() - self.started_at
+        with self._lock:
+            self.phases.append((phase, elapsed))
+        return elapsed
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        # Already imported: nothing to measure
+        if level == 0 and name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        if level and globals:
+            package = (globals.get("__package__") or "").partition(".")[0]
+        else:
+            package = name.partition(".")[0]
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # [package, time spent in nested imports]
+        frame = [package, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            with self._lock:
+                self.self_times[package] += elapsed - frame[1]
+
+    def top_packages(self, limit: int = 15) -> list[tuple[str, float]]:
+        """(package, self seconds), slowest first."""
+        with self._lock:
+            items = sorted(self.self_times.items(), key=lambda kv: kv[1], reverse=True)
+        return items[:limit]
+
+    def total_import_time(self) -> float:
+        with self._lock:
+            return sum(self.self_times.values())
@@ -9,11 +9,15 @@ Two levels of protection:
 2. Truncate individual message CONTENT if any single message is too large
 """
 
+from bisect import bisect_left
+
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
+from agents.utils.token_counter import get_token_counter
+
 
 # Max estimated tokens to keep in the message history.
-# Conservative: 30k estimated ≈ ~90k chars ≈ 30-45k real tokens.
+# 30k estimated ≈ ~100k chars ≈ 30-45k real tokens.
 # With system prompt + tool schemas (~10k tokens), total stays well under 200k.
 MAX_CONTEXT_TOKENS = 30_000
 
@@ -26,44 +30,15 @@ def _estimate_message_tokens(msg) -> int:
     """
     Estimate tokens for an entire message, including content AND tool_calls.
 
-    Uses a conservative ratio of 3 chars per token.
+    Uses the shared TokenCounter of the default model family, so truncation
+    and summarization thresholds agree.
     """
-    total_chars = 0
-
-    # Count content
-    content = getattr(msg, 'content', None)
-    if content:
-        if isinstance(content, str):
-            total_chars += len(content)
-        elif isinstance(content, list):
-            total_chars += sum(len(str(block)) for block in content)
-        else:
-            total_chars += len(str(content))
-
-    # Count tool_calls (critical for AIMessages — args can be huge)
-    tool_calls = getattr(msg, 'tool_calls', None)
-    if tool_calls:
-        for tc in tool_calls:
-            if isinstance(tc, dict):
-                total_chars += len(str(tc.get('name', '')))
-                total_chars += len(str(tc.get('args', {})))
-            else:
-                total_chars += len(str(tc))
-
-    # Count additional_kwargs (some tool data stored here in older langchain)
-    additional = getattr(msg, 'additional_kwargs', None)
-    if additional:
-        ak_tool_calls = additional.get('tool_calls', [])
-        if ak_tool_calls:
-            total_chars += len(str(ak_tool_calls))
+    return get_token_counter().count_message(msg)
 
-    # Conservative: 3 chars per token
-    return max(total_chars // 3, 1)
 
-
-def group_messages(messages: list) -> list[list]:
+def group_bounds(messages: list) -> list[tuple[int, int]]:
     """
-    Groups messages into logical units that must stay together.
+    Returns the (start, end) index range of each message group.
 
     A group is either:
     - A standalone message (HumanMessage, AIMessage without tool_calls)
@@ -71,24 +46,78 @@ def group_messages(messages: list) -> list[list]:
 
     This ensures we never break tool_use/tool_result pairs required by the Anthropic API.
     """
-    groups = []
+    bounds = []
     i = 0
+    n = len(messages)
 
-    while i < len(messages):
+    while i < n:
+        start = i
         msg = messages[i]
+        i += 1
 
         if isinstance(msg, AIMessage) and getattr(msg, 'tool_calls', None):
-            group = [msg]
-            i += 1
-            while i < len(messages) and isinstance(messages[i], ToolMessage):
-                group.append(messages[i])
+            while i < n and isinstance(messages[i], ToolMessage):
                 i += 1
-            groups.append(group)
-        else:
-            groups.append([msg])
-            i += 1
 
-    return groups
+        bounds.append((start, i))
+
+    return bounds
+
+
+def group_messages(messages: list) -> list[list]:
+    """
+    Groups messages into logical units that must stay together.
+
+    See group_bounds for the grouping rules.
+    """
+    return [messages[start:end] for start, end in group_bounds(messages)]
+
+
+def _prefix_sums(costs: list[int]) -> list[int]:
+    """prefix[i] is the total cost of costs[:i]."""
+    prefix = [0] * (len(costs) + 1)
+    running = 0
+    for i, cost in enumerate(costs, start=1):
+        running += cost
+        prefix[i] = running
+    return prefix
+
+
+def _find_cutoff_index(prefix: list[int], bounds: list[tuple[int, int]], max_tokens: int) -> int:
+    """
+    Index of the first message to keep so that the kept suffix fits in max_tokens.
+
+    Only group starts are valid cutoffs. The suffix cost shrinks as the cutoff
+    moves right, so the earliest group start that fits is found by binary search.
+    The last group is always kept, even if it alone exceeds the budget.
+    """
+    if not bounds:
+        return 0
+
+    total = prefix[-1]
+    # Suffix from start s fits  <=>  prefix[s] >= total - max_tokens
+    needed = total - max_tokens
+    starts = [start for start, _ in bounds]
+    idx = bisect_left(starts, needed, key=prefix.__getitem__)
+
+    if idx >= len(starts):
+        return starts[-1]
+    return starts[idx]
+
+
+def find_cutoff_index(messages: list, max_tokens: int, costs: list[int] | None = None) -> int:
+    """
+    Index of the first message to keep so that messages[index:] fits in
+    max_tokens without breaking tool_use/tool_result groups.
+
+    Args:
+        messages: List of LangChain messages
+        max_tokens: Maximum estimated tokens to keep
+        costs: Precomputed per-message token estimates (computed if omitted)
+    """
+    if costs is None:
+        costs = [_estimate_message_tokens(m) for m in messages]
+    return _find_cutoff_index(_prefix_sums(costs), group_bounds(messages), max_tokens)
 
 
 def _truncate_message_content(msg):
@@ -130,9 +159,12 @@ def truncate_messages(messages: list, max_tokens: int = MAX_CONTEXT_TOKENS) -> l
     """
     Hard-cap messages to fit within token limits.
 
-    1. Groups messages into logical units (tool pairs stay together)
-    2. Keeps groups from the end until hitting the token limit
-    3. Truncates individual message content if any single message is too large
+    1. Truncates individual message content if any single message is too large
+    2. Groups messages into logical units (tool pairs stay together)
+    3. Keeps groups from the end until hitting the token limit
+
+    Runs in O(n): each message is estimated once and the cutoff is found by
+    binary search over the group prefix sums.
 
     Args:
         messages: List of LangChain messages
@@ -147,34 +179,20 @@ def truncate_messages(messages: list, max_tokens: int = MAX_CONTEXT_TOKENS) -> l
     # STEP 1: Truncate individual large messages first
     messages = [_truncate_message_content(m) for m in messages]
 
+    # Every message is estimated exactly once; all sums below come from these costs
+    costs = [_estimate_message_tokens(m) for m in messages]
+    prefix = _prefix_sums(costs)
+
     # STEP 2: Check if we're now under the limit
-    total_tokens = sum(_estimate_message_tokens(m) for m in messages)
-    if total_tokens <= max_tokens:
+    if prefix[-1] <= max_tokens:
         return messages
 
-    # STEP 3: Group messages and keep from the end
-    groups = group_messages(messages)
-
-    kept_groups = []
-    accumulated_tokens = 0
-
-    for group in reversed(groups):
-        group_tokens = sum(_estimate_message_tokens(m) for m in group)
-
-        # Stop if adding this group would exceed the limit (and we already have some)
-        if accumulated_tokens + group_tokens > max_tokens and kept_groups:
-            break
-
-        kept_groups.insert(0, group)
-        accumulated_tokens += group_tokens
-
-    # Flatten groups back to message list
-    result = []
-    for group in kept_groups:
-        result.extend(group)
+    # STEP 3: Keep whole groups from the end
+    cutoff = _find_cutoff_index(prefix, group_bounds(messages), max_tokens)
+    result = messages[cutoff:]
 
     # STEP 4: If we still exceed (single massive group), force-truncate all messages
-    final_tokens = sum(_estimate_message_tokens(m) for m in result)
+    final_tokens = prefix[-1] - prefix[cutoff]
     if final_tokens > max_tokens:
         # Nuclear option: aggressively truncate all content
         aggressive_limit = max_tokens * 3 // len(result) if result else MAX_SINGLE_MESSAGE_CHARS
@@ -197,10 +215,10 @@ def truncate_messages(messages: list, max_tokens: int = MAX_CONTEXT_TOKENS) -> l
         result = truncated_result
 
     # Prepend truncation notice if we removed anything
-    if len(result) < len(messages):
+    if cutoff > 0:
         notice = HumanMessage(
             content="[NOTICE: Earlier conversation history was truncated to fit context limits. Continue working based on the messages below.]"
         )
-        result.insert(0, notice)
+        result = [notice] + result
 
     return result
@@ -1,3 +1,5 @@
-from .summarization_node import should_summarize, summarize_messages_node, SUMMARIZATION_TOKEN_TRIGGER, DEFAULT_SUMMARY_PROMPT
+from .tool_scheduler import scheduled_tool_node, get_tool_latency_stats
+from .tool_cache import CachePolicy, mark_idempotent, get_tool_cache_stats
+from .summarization_node import should_summarize, ashould_summarize, summarize_edge, summarize_messages_node, asummarize_messages_node, summarize_node, get_speculation_stats, SUMMARIZATION_TOKEN_TRIGGER, DEFAULT_SUMMARY_PROMPT
 
-__all__ = ["should_summarize", "summarize_messages_node", "SUMMARIZATION_TOKEN_TRIGGER", "DEFAULT_SUMMARY_PROMPT"]
\ No newline at end of file
+__all__ = ["scheduled_tool_node", "get_tool_latency_stats", "CachePolicy", "mark_idempotent", "get_tool_cache_stats", "should_summarize", "ashould_summarize", "summarize_edge", "summarize_messages_node", "asummarize_messages_node", "summarize_node", "get_speculation_stats", "SUMMARIZATION_TOKEN_TRIGGER", "DEFAULT_SUMMARY_PROMPT"]
\ No newline at end of file
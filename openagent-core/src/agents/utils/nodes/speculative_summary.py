@@ -0,0 +1,165 @@
+"""
+Speculative (background) summarization.
+
+When a thread crosses the soft threshold, the summary of its oldest messages
+is generated in a background task while the agent keeps working. When the hard
+threshold is reached, the summarization node swaps the precomputed summary in
+instead of waiting for a new LLM call.
+
+A precomputed summary is only reused if the messages it covers are still the
+oldest messages of the thread (same ids, same order). Otherwise it is thrown
+away and a fresh summary is generated.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from agents.utils.logging import logger
+
+# Max number of threads with a pending speculative summary
+MAX_PENDING_THREADS = 128
+
+
+@dataclass
+class PendingSummary:
+    """Background summary of the first len(message_ids) messages of a thread."""
+    message_ids: tuple[str, ...]
+    tokens: int
+    task: asyncio.Task
+    started_at: float = field(default_factory=time.monotonic)
+
+    def covers_prefix_of(self, messages: list) -> bool:
+        n = len(self.message_ids)
+        if len(messages) <= n:
+            return False
+        return tuple(getattr(m, "id", None) for m in messages[:n]) == self.message_ids
+
+
+class SpeculativeSummarizer:
+    """Per-thread registry of background summaries and their reuse metrics."""
+
+    def __init__(self, summarize: Callable[[list], Awaitable[str | None]]):
+        self._summarize = summarize
+        self._pending: "OrderedDict[str, PendingSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "reused": 0, "discarded": 0, "failed": 0, "saved_seconds": 0.0}
+
+    def is_pending(self, thread_key: str, messages: list) -> bool:
+        """True if a summary still applicable to *messages* is pending for the thread."""
+        with self._lock:
+            pending = self._pending.get(thread_key)
+            return pending is not None and pending.covers_prefix_of(messages)
+
+    def start(self, thread_key: str, messages: list, messages_to_summarize: list, tokens: int) -> bool:
+        """
+        Start summarizing *messages_to_summarize* in the background, unless a
+        still-valid summary is already pending for the thread.
+
+        Must be called from a running event loop. Returns True if a task was started.
+        """
+        if not messages_to_summarize:
+            return False
+
+        with self._lock:
+            pending = self._pending.get(thread_key)
+            if pending is not None:
+                if pending.covers_prefix_of(messages):
+                    return False
+                self._discard(thread_key, pending)
+
+            # Fresh context: the background call must not report its tokens
+            # through the callbacks (astream_events) of the current step.
+            task = asyncio.get_running_loop().create_task(
+                self._summarize(messages_to_summarize),
+                context=contextvars.Context(),
+            )
+            self._pending[thread_key] = PendingSummary(
+                message_ids=tuple(m.id for m in messages_to_summarize),
+                tokens=tokens,
+                task=task,
+            )
+            self._stats["started"] += 1
+
+            while len(self._pending) > MAX_PENDING_THREADS:
+                old_key, old = next(iter(self._pending.items()))
+                self._discard(old_key, old)
+
+        logger.debug(f"Speculative summary started for thread {thread_key} ({len(messages_to_summarize)} messages)")
+        return True
+
+    async def take(
+        self,
+        thread_key: str,
+        messages: list,
+        timeout: float,
+        total_tokens: int = 0,
+        max_tokens_after: int | None = None,
+    ) -> tuple[list, str] | None:
+        """
+        Pop the pending summary of the thread if it still applies to *messages*.
+
+        If *max_tokens_after* is given, the summary is also discarded when
+        removing the messages it covers would leave more than that many tokens
+        (the history grew too much since the summary was started).
+
+        Returns (summarized_messages, summary_text), or None if there is no
+        usable precomputed summary.
+        """
+        with self._lock:
+            pending = self._pending.pop(thread_key, None)
+            if pending is None:
+                return None
+            outgrown = max_tokens_after is not None and total_tokens - pending.tokens > max_tokens_after
+            if outgrown or not pending.covers_prefix_of(messages):
+                self._discard(thread_key, pending, popped=True)
+                return None
+
+        waited_from = time.monotonic()
+        try:
+            summary_text = await asyncio.wait_for(asyncio.shield(pending.task), timeout=timeout)
+        except asyncio.CancelledError:
+            pending.task.cancel()
+            raise
+        except Exception as e:
+            pending.task.cancel()
+            logger.warning(f"Speculative summary for thread {thread_key} failed: {e!s}")
+            summary_text = None
+
+        if not summary_text:
+            with self._lock:
+                self._stats["failed"] += 1
+            return None
+
+        covered = messages[:len(pending.message_ids)]
+        with self._lock:
+            self._stats["reused"] += 1
+            # How long the summary had been running before it was needed
+            self._stats["saved_seconds"] += max(waited_from - pending.started_at, 0.0)
+        return covered, summary_text
+
+    def discard(self, thread_key: str) -> None:
+        with self._lock:
+            pending = self._pending.get(thread_key)
+            if pending is not None:
+                self._discard(thread_key, pending)
+
+    def _discard(self, thread_key: str, pending: PendingSummary, popped: bool = False) -> None:
+        if not popped:
+            self._pending.pop(thread_key, None)
+        if not pending.task.done():
+            pending.task.get_loop().call_soon_threadsafe(pending.task.cancel)
+        self._stats["discarded"] += 1
+        logger.debug(f"Speculative summary for thread {thread_key} discarded ({len(pending.message_ids)} messages)")
+
+    def stats(self) -> dict:
+        """Counters: started, reused, discarded, failed, saved_seconds and reuse_rate."""
+        with self._lock:
+            stats = dict(self._stats)
+        finished = stats["reused"] + stats["discarded"] + stats["failed"]
+        stats["reuse_rate"] = stats["reused"] / finished if finished else 0.0
+        return stats
@@ -2,95 +2,352 @@
 Summarization node for LangGraph.
 
 Provides a conditional edge (should_summarize) and a summarization node
-(summarize_messages_node) that reduces message history when it grows too large.
+(summarize_messages_node / asummarize_messages_node, combined in summarize_node)
+that reduces message history when it grows too large.
 Uses message grouping to ensure tool_use/tool_result pairs are never broken.
+
+Summaries are hierarchical (see summary_store): each compaction only sends the
+newly dropped chunk to the model, and the rendered summary is kept as the
+first message of the history.
 """
 
+import asyncio
+
 from langchain.agents.middleware.summarization import DEFAULT_SUMMARY_PROMPT
-from langchain.messages import HumanMessage, SystemMessage, AIMessage, RemoveMessage, ToolMessage, trim_messages
+from langchain.messages import HumanMessage, SystemMessage, AIMessage, RemoveMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import MessagesState
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 
-from agents.utils.message_truncation import group_messages, _estimate_message_tokens
+from agents.utils.logging import logger
+from agents.utils.message_truncation import find_cutoff_index
+from agents.utils.nodes.speculative_summary import SpeculativeSummarizer
+from agents.utils.nodes.summary_store import (
+    SUMMARY_HEADER,
+    SUMMARY_MESSAGE_ID,
+    SummaryStore,
+    get_summary_store,
+)
+from agents.utils.token_counter import get_token_counter
+from agents.utils.token_ledger import DEFAULT_THREAD_KEY, get_ledger
 
 # Trigger: summarize when estimated tokens exceed this
 SUMMARIZATION_TOKEN_TRIGGER = 100000
 # After summarization, keep approximately this many estimated tokens
 TOKENS_TO_KEEP_AFTER_SUMMARY = 20000
+# Max seconds to wait for the summary (async node) before falling back to truncation
+SUMMARIZATION_TIMEOUT = 60.0
+# Soft trigger (fraction of the hard trigger): start summarizing in the
+# background so the summary is ready when the hard trigger is crossed
+SPECULATIVE_SUMMARY_RATIO = 0.7
+SPECULATIVE_SUMMARY_TRIGGER = int(SUMMARIZATION_TOKEN_TRIGGER * SPECULATIVE_SUMMARY_RATIO)
+# Max chars of conversation sent to the model for one chunk summary
+SUMMARY_INPUT_CHARS = 12000
+# Per-message excerpt bounds (SUMMARY_INPUT_CHARS is spread over the chunk)
+MIN_EXCERPT_CHARS = 200
+MAX_EXCERPT_CHARS = 1500
+
+MERGE_SUMMARY_PROMPT = """<role>
+Context Consolidation Assistant
+</role>
+
+<primary_objective>
+Merge the consecutive conversation summaries below (oldest first) into ONE summary.
+</primary_objective>
+
+<instructions>
+Keep goals, decisions, results, file paths, URLs and open tasks. Drop details that later summaries make obsolete.
+Do not repeat information. Respond ONLY with the merged summary.
+</instructions>
+
+<summaries>
+{summaries}
+</summaries>"""
 
-# Import centralized model configuration
-from agents.models import model
+# Import centralized model configuration (the model is built on first summary)
+from agents.models import DEFAULT_MODEL_NAME, get_default_model
 
-token_counter = model.get_num_tokens_from_messages
+# Local (offline) counter shared with truncate_messages and SummarizationMiddleware
+token_counter = get_token_counter(DEFAULT_MODEL_NAME)
+_count_message_tokens = token_counter.count_message
 
 
-def should_summarize(state: MessagesState) -> str:
+def _thread_id(config: RunnableConfig | None) -> str | None:
+    if not config:
+        return None
+    return config.get("configurable", {}).get("thread_id")
+
+
+def _thread_key(config: RunnableConfig | None) -> str:
+    return _thread_id(config) or DEFAULT_THREAD_KEY
+
+
+def should_summarize(state: MessagesState, config: RunnableConfig = None) -> str:
     """
     Conditional edge: returns 'summarize' if estimated tokens exceed trigger,
     'agent' otherwise.
+
+    Token usage is tracked by a per-thread ledger, so only messages added
+    since the previous check are tokenized.
     """
     messages = state.get("messages", [])
 
     if not messages:
         return "agent"
 
-    total_tokens = token_counter(messages)
+    total_tokens = get_ledger(_thread_id(config), _count_message_tokens).sync(messages)
     if total_tokens >= SUMMARIZATION_TOKEN_TRIGGER:
         return "summarize"
 
     return "agent"
 
 
-def summarize_messages_node(state: MessagesState) -> dict:
+async def ashould_summarize(state: MessagesState, config: RunnableConfig = None) -> str:
     """
-    Summarization node that reduces message history.
+    Async variant of should_summarize.
 
-    Uses group-based approach to find a safe cutoff point, then removes
-    old messages via RemoveMessage. Generates a brief summary if possible,
-    otherwise just drops old messages with a truncation notice.
+    Additionally, once SPECULATIVE_SUMMARY_TRIGGER is crossed, starts summarizing
+    the oldest messages in the background (see speculative_summary).
     """
     messages = state.get("messages", [])
 
     if not messages:
-        return {"messages": []}
-        
-    trimmed_messages = trim_messages(
-            messages=messages,
-            max_tokens=TOKENS_TO_KEEP_AFTER_SUMMARY,
-            strategy='last',
-            start_on=['human', 'ai', 'tool'],
-            token_counter='approximate',
-            include_system=True,
-            allow_partial=False
+        return "agent"
+
+    total_tokens = get_ledger(_thread_id(config), _count_message_tokens).sync(messages)
+    if total_tokens >= SUMMARIZATION_TOKEN_TRIGGER:
+        return "summarize"
+
+    thread_key = _thread_key(config)
+    _, history = _split_summary(messages)
+    if total_tokens >= SPECULATIVE_SUMMARY_TRIGGER and not speculator.is_pending(thread_key, history):
+        removed_messages = _messages_to_summarize(history)
+        speculator.start(
+            thread_key,
+            history,
+            removed_messages,
+            tokens=sum(_count_message_tokens(m) for m in removed_messages),
         )
 
-    # Identify removed messages (in original but not in trimmed)
-    trimmed_ids = {m.id for m in trimmed_messages}
-    removed_messages = [m for m in messages if m.id not in trimmed_ids]
+    return "agent"
+
+
+def _split_summary(messages: list) -> tuple:
+    """(summary message or None, the rest of the history)."""
+    if messages and getattr(messages[0], "id", None) == SUMMARY_MESSAGE_ID:
+        return messages[0], messages[1:]
+    return None, messages
 
-    # Format removed messages for the summary prompt
-    formatted = "\n".join([
-        f"{msg.__class__.__name__}: {str(msg.content)[:200]}"
-        for msg in removed_messages
-        if hasattr(msg, 'content') and msg.content
-        and not isinstance(msg, ToolMessage)
-    ])
+
+def _is_summary(msg) -> bool:
+    content = getattr(msg, "content", None)
+    return isinstance(content, str) and content.startswith(SUMMARY_HEADER)
+
+
+def _messages_to_summarize(history: list) -> list:
+    """Oldest messages to drop so that ~TOKENS_TO_KEEP_AFTER_SUMMARY remain.
+
+    The cutoff always falls on a group boundary, so tool results are never
+    kept without their tool_use.
+    """
+    costs = [_count_message_tokens(m) for m in history]
+    cutoff = find_cutoff_index(history, TOKENS_TO_KEEP_AFTER_SUMMARY, costs=costs)
+    return history[:cutoff]
+
+
+def _summary_prompt(removed_messages: list) -> str:
+    """Level-0 prompt for one chunk. The input budget is spread over the
+    chunk and old summaries are skipped, so the prompt size is bounded."""
+    chunk = [
+        msg for msg in removed_messages
+        if (getattr(msg, 'content', None) or getattr(msg, 'tool_calls', None)) and not _is_summary(msg)
+    ]
+    excerpt = SUMMARY_INPUT_CHARS // max(len(chunk), 1)
+    excerpt = max(MIN_EXCERPT_CHARS, min(excerpt, MAX_EXCERPT_CHARS))
+
+    lines = []
+    for msg in chunk:
+        text = msg.text
+        if isinstance(msg, ToolMessage):
+            # Tool results are bulky and mostly re-derivable, keep them short
+            text = text[:excerpt // 3]
+        else:
+            text = text[:excerpt]
+        tool_calls = getattr(msg, 'tool_calls', None)
+        if tool_calls:
+            text += f" [called tools: {', '.join(tc.get('name', '') for tc in tool_calls)}]"
+        lines.append(f"{msg.__class__.__name__}: {text}")
+
+    formatted = "\n".join(lines)
 
     # Hard limit on summary input
-    if len(formatted) > 5000:
-        formatted = formatted[:5000] + "\n... [truncated]"
+    if len(formatted) > SUMMARY_INPUT_CHARS:
+        formatted = formatted[:SUMMARY_INPUT_CHARS] + "\n... [truncated]"
+
+    return DEFAULT_SUMMARY_PROMPT.format(messages=formatted)
 
+
+def _merge_prompt(summaries: list[str]) -> str:
+    return MERGE_SUMMARY_PROMPT.format(summaries="\n\n---\n\n".join(summaries))
+
+
+def _generate_summary(removed_messages: list) -> str | None:
     try:
-        response = model.invoke(DEFAULT_SUMMARY_PROMPT.format(messages=formatted))
-        summary_text = response.content.strip()
-        summary = HumanMessage(
-            content=f"[CONVERSATION SUMMARY]\n\n{summary_text}\n\n[END OF SUMMARY]"
-        )
-        
-        return {"messages": trimmed_messages + [summary]}
+        return get_default_model().invoke(_summary_prompt(removed_messages)).text.strip()
+    except Exception as e:
+        logger.error(f"Error generating summary: {e!s}")
+        return None
 
+
+def _merge_summaries(summaries: list[str]) -> str | None:
+    try:
+        return get_default_model().invoke(_merge_prompt(summaries)).text.strip()
     except Exception as e:
-        print(f"Error generating summary: {e!s}")
-        fallback = HumanMessage(
-            content="[Previous conversation was truncated. Continue from the recent messages.]"
+        logger.error(f"Error merging summaries: {e!s}")
+        return None
+
+
+async def _amerge_summaries(summaries: list[str]) -> str | None:
+    try:
+        response = await asyncio.wait_for(get_default_model().ainvoke(_merge_prompt(summaries)), timeout=SUMMARIZATION_TIMEOUT)
+        return response.text.strip()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error merging summaries: {e!s}")
+        return None
+
+
+async def _agenerate_summary(removed_messages: list) -> str | None:
+    """Summary text for *removed_messages*, or None on timeout/error."""
+    try:
+        response = await asyncio.wait_for(
+            get_default_model().ainvoke(_summary_prompt(removed_messages)),
+            timeout=SUMMARIZATION_TIMEOUT,
         )
-        return {"messages": trimmed_messages + [fallback]}
\ No newline at end of file
+        return response.text.strip()
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        logger.warning(f"Summary generation timed out after {SUMMARIZATION_TIMEOUT}s, truncating instead")
+    except Exception as e:
+        logger.error(f"Error generating summary: {e!s}")
+    return None
+
+
+speculator = SpeculativeSummarizer(_agenerate_summary)
+
+
+def get_speculation_stats() -> dict:
+    """How often precomputed summaries were reused vs thrown away."""
+    return speculator.stats()
+
+
+def _thread_summary_store(config: RunnableConfig | None, summary_message) -> SummaryStore:
+    store = get_summary_store(_thread_key(config))
+    if store.is_empty() and summary_message is not None and _is_summary(summary_message):
+        # Summary from a previous process (e.g. restored from a checkpoint)
+        store.seed(summary_message.content)
+    return store
+
+
+def _summary_update(
+    removed_messages: list,
+    kept_messages: list,
+    summary_text: str | None,
+    store: SummaryStore,
+    config: RunnableConfig | None,
+) -> dict:
+    """State update: [summary message, *kept_messages].
+
+    The summary message has a fixed id and always sits first, so it is
+    replaced (not accumulated) on every compaction.
+    """
+    ledger = get_ledger(_thread_id(config), _count_message_tokens)
+    ledger.remove([SUMMARY_MESSAGE_ID, *(m.id for m in removed_messages)])
+
+    if store.is_empty():
+        content = "[Previous conversation was truncated. Continue from the recent messages.]"
+    else:
+        content = store.render()
+        if not summary_text:
+            content += "\n\n[Some later messages were truncated without summary. Continue from the recent messages.]"
+
+    return {
+        "messages": [
+            RemoveMessage(id=REMOVE_ALL_MESSAGES),
+            HumanMessage(content=content, id=SUMMARY_MESSAGE_ID),
+            *kept_messages,
+        ]
+    }
+
+
+def summarize_messages_node(state: MessagesState, config: RunnableConfig = None) -> dict:
+    """
+    Summarization node that reduces message history.
+
+    Uses group-based approach to find a safe cutoff point and replaces the
+    dropped chunk by a level-0 summary in the thread's SummaryStore. The
+    rendered summary hierarchy is kept as the first message of the history.
+    Drops old messages with a truncation notice if no summary can be generated.
+    """
+    summary_message, history = _split_summary(state.get("messages", []))
+
+    removed_messages = _messages_to_summarize(history)
+    if not removed_messages:
+        return {"messages": []}
+
+    summary_text = _generate_summary(removed_messages)
+    store = _thread_summary_store(config, summary_message)
+    if summary_text:
+        store.add(summary_text, _merge_summaries)
+
+    return _summary_update(removed_messages, history[len(removed_messages):], summary_text, store, config)
+
+
+async def asummarize_messages_node(state: MessagesState, config: RunnableConfig = None) -> dict:
+    """
+    Async variant of summarize_messages_node.
+
+    Uses ``ainvoke`` so the event loop (streaming, browser idle monitor,
+    other threads) keeps running during the summary round-trip. Falls back to
+    the truncation notice if the model errors or exceeds SUMMARIZATION_TIMEOUT.
+    Cancellation of the run is propagated, not turned into a fallback.
+
+    If ashould_summarize already summarized the oldest messages in the
+    background and they are unchanged, that summary is used directly.
+    """
+    messages = state.get("messages", [])
+    summary_message, history = _split_summary(messages)
+
+    # Swap in the summary precomputed in the background, if still valid and
+    # if dropping the messages it covers brings us back under the soft trigger
+    precomputed = await speculator.take(
+        _thread_key(config),
+        history,
+        timeout=SUMMARIZATION_TIMEOUT,
+        total_tokens=get_ledger(_thread_id(config), _count_message_tokens).sync(messages),
+        max_tokens_after=SPECULATIVE_SUMMARY_TRIGGER,
+    )
+    if precomputed is not None:
+        removed_messages, summary_text = precomputed
+        logger.debug(f"Reusing speculative summary ({len(removed_messages)} messages)")
+    else:
+        removed_messages = _messages_to_summarize(history)
+        if not removed_messages:
+            return {"messages": []}
+        summary_text = await _agenerate_summary(removed_messages)
+
+    store = _thread_summary_store(config, summary_message)
+    if summary_text:
+        await store.aadd(summary_text, _amerge_summaries)
+
+    return _summary_update(removed_messages, history[len(removed_messages):], summary_text, store, config)
+
+
+# Graph node: runs asummarize_messages_node under ainvoke/astream(_events),
+# summarize_messages_node under invoke/stream.
+summarize_node = RunnableLambda(summarize_messages_node, afunc=asummarize_messages_node, name="summarize")
+
+# Conditional edge: ashould_summarize (with speculative summaries) under async runs
+summarize_edge = RunnableLambda(should_summarize, afunc=ashould_summarize, name="should_summarize")
@@ -0,0 +1,129 @@
+"""
+Hierarchical rolling summaries.
+
+Each compaction produces a level-0 summary of the chunk of messages it drops.
+When SUMMARY_FAN_IN summaries accumulate on a level, they are merged into a
+single summary one level up. The input of every summarization call is thus
+bounded (one chunk, or SUMMARY_FAN_IN summaries) no matter how long the
+session runs, and earlier summaries are never re-sent with new messages.
+
+The rendered hierarchy lives in one message with a fixed id
+(SUMMARY_MESSAGE_ID) at the start of the thread history.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from agents.utils.logging import logger
+
+# Fixed id of the summary message in the thread history
+SUMMARY_MESSAGE_ID = "conversation-summary"
+
+SUMMARY_HEADER = "[CONVERSATION SUMMARY]"
+SUMMARY_FOOTER = "[END OF SUMMARY]"
+
+# Summaries merged into one summary of the next level
+SUMMARY_FAN_IN = 4
+# Highest level. Merges at this level stay on it (rolling)
+MAX_SUMMARY_LEVEL = 3
+# Hard cap on a single summary, so merge inputs stay bounded
+MAX_SUMMARY_CHARS = 4000
+
+# Max number of thread stores kept in memory (least recently used are dropped)
+MAX_TRACKED_THREADS = 128
+
+
+def _cap(text: str) -> str:
+    if len(text) > MAX_SUMMARY_CHARS:
+        return text[:MAX_SUMMARY_CHARS] + "\n... [truncated]"
+    return text
+
+
+def _merge_fallback(summaries: list[str]) -> str:
+    """Used when the merge call fails: keep the most recent parts of each summary."""
+    share = MAX_SUMMARY_CHARS // max(len(summaries), 1)
+    return "\n\n".join(s[-share:] for s in summaries)
+
+
+class SummaryStore:
+    """Summary hierarchy of one thread. levels[0] holds the most recent chunks."""
+
+    def __init__(self):
+        self.levels: list[list[str]] = [[]]
+        self._lock = threading.Lock()
+
+    def is_empty(self) -> bool:
+        return not any(self.levels)
+
+    def seed(self, rendered: str) -> None:
+        """Restore an existing summary message (e.g. after a restart) as one top-level entry."""
+        text = rendered.replace(SUMMARY_HEADER, "").replace(SUMMARY_FOOTER, "").strip()
+        if text:
+            with self._lock:
+                self._level(MAX_SUMMARY_LEVEL).append(_cap(text))
+
+    def add(self, summary: str, merge: Callable[[list[str]], str | None]) -> None:
+        with self._lock:
+            self.levels[0].append(_cap(summary))
+            full = self._full_levels()
+            while full:
+                for level, summaries in full:
+                    self._promote(level, merge(summaries) or _merge_fallback(summaries))
+                full = self._full_levels()
+
+    async def aadd(self, summary: str, amerge: Callable[[list[str]], Awaitable[str | None]]) -> None:
+        # Merges are awaited outside the lock; one compaction per thread runs at a time
+        with self._lock:
+            self.levels[0].append(_cap(summary))
+            full = self._full_levels()
+
+        while full:
+            for level, summaries in full:
+                merged = await amerge(summaries) or _merge_fallback(summaries)
+                with self._lock:
+                    self._promote(level, merged)
+            with self._lock:
+                full = self._full_levels()
+
+    def render(self) -> str:
+        """Summary message content: oldest (highest level) first."""
+        with self._lock:
+            parts = [s for level in reversed(self.levels) for s in level]
+        return f"{SUMMARY_HEADER}\n\n" + "\n\n---\n\n".join(parts) + f"\n\n{SUMMARY_FOOTER}"
+
+    def _level(self, level: int) -> list[str]:
+        while len(self.levels) <= level:
+            self.levels.append([])
+        return self.levels[level]
+
+    def _full_levels(self) -> list[tuple[int, list[str]]]:
+        """Levels holding SUMMARY_FAN_IN summaries, lowest first (for the current pass)."""
+        return [(i, level[:SUMMARY_FAN_IN]) for i, level in enumerate(self.levels) if len(level) >= SUMMARY_FAN_IN]
+
+    def _promote(self, level: int, merged: str) -> None:
+        # Drop the merged summaries and insert the result one level up
+        self.levels[level] = self.levels[level][SUMMARY_FAN_IN:]
+        target = min(level + 1, MAX_SUMMARY_LEVEL)
+        if target == level:
+            self.levels[level].insert(0, _cap(merged))
+        else:
+            self._level(target).append(_cap(merged))
+        logger.debug(f"Merged {SUMMARY_FAN_IN} level-{level} summaries into level {target}")
+
+
+_stores: "OrderedDict[str, SummaryStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_summary_store(thread_key: str) -> SummaryStore:
+    with _stores_lock:
+        store = _stores.get(thread_key)
+        if store is None:
+            store = SummaryStore()
+            _stores[thread_key] = store
+            while len(_stores) > MAX_TRACKED_THREADS:
+                _stores.popitem(last=False)
+        else:
+            _stores.move_to_end(thread_key)
+    return store
@@ -0,0 +1,274 @@
+"""
+Result cache for idempotent tools.
+
+Agents often repeat a call whose answer cannot have changed: the same web
+search, the same range of an unchanged file, the text of a page that was not
+touched since. Tools marked idempotent (``mark_idempotent``) get their results
+memoized per thread by the tool scheduler.
+
+The cache key is the tool name, its arguments and a *validator* computed right
+before the lookup (file mtimes, page URL + DOM hash...). When the resource
+changes, the validator changes and the entry is simply never hit again. Entries
+also expire after the policy TTL, and the least recently used ones are dropped
+beyond MAX_CACHE_ENTRIES / MAX_CACHE_BYTES.
+
+Policies marked ``persistent`` (plain ToolMessage results only) are also written to
+a SQLite file when OPENAGENT_TOOL_CACHE_PATH is set, so they survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, replace
+
+from agents.utils.logging import logger
+
+# Max results kept in memory (all threads)
+MAX_CACHE_ENTRIES = 512
+# Max total size of the cached results, in characters
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+# SQLite file for persistent policies (disabled when unset)
+TOOL_CACHE_PATH = os.getenv("OPENAGENT_TOOL_CACHE_PATH")
+
+# Thread key of policies shared by every thread
+SHARED_THREAD_KEY = "__shared__"
+
+# Called with the call arguments and the thread key, returns the state of the
+# resources the call reads, or None when the call cannot be cached right now
+# (e.g. the page does not exist)
+Validator = Callable[[dict, str], Awaitable[Hashable | None]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long and under which conditions the results of a tool are reused."""
+    ttl: float
+    validator: Validator | None = None
+    # Reused across threads (results that do not depend on the conversation)
+    shared: bool = False
+    # Also stored on disk (requires OPENAGENT_TOOL_CACHE_PATH)
+    persistent: bool = False
+
+
+@dataclass
+class CacheEntry:
+    result: object
+    size: int
+    expires_at: float
+
+
+def _result_size(result) -> int:
+    return len(str(getattr(result, "content", result)))
+
+
+def _is_cacheable(result) -> bool:
+    """Only successful results are reused."""
+    if getattr(result, "status", None) == "error":
+        return False
+    messages = getattr(result, "update", None) or {}
+    if isinstance(messages, dict):
+        for message in messages.get("messages", []):
+            if getattr(message, "status", None) == "error":
+                return False
+    text = result if isinstance(result, str) else getattr(result, "content", None)
+    return not (isinstance(text, str) and text.startswith("Error"))
+
+
+def _retarget_message(message, tool_call_id: str):
+    if getattr(message, "tool_call_id", None) is None:
+        return message
+    # New id: reusing the cached message id would replace the original message in the history
+    return message.model_copy(update={"tool_call_id": tool_call_id, "id": None})
+
+
+def retarget(result, tool_call_id: str, tool_name: str):
+    """Copy of a cached result answering the tool call *tool_call_id*."""
+    if isinstance(result, str):
+        # Content of a ToolMessage loaded from the persistent store
+        from langchain_core.messages import ToolMessage
+
+        return ToolMessage(content=result, tool_call_id=tool_call_id, name=tool_name)
+    if hasattr(result, "tool_call_id"):
+        return _retarget_message(result, tool_call_id)
+    update = getattr(result, "update", None)
+    if isinstance(update, dict) and "messages" in update:
+        messages = [_retarget_message(m, tool_call_id) for m in update["messages"]]
+        return replace(result, update={**update, "messages": messages})
+    return result
+
+
+class ToolResultCache:
+    """Per-thread memoization of idempotent tool results."""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_CACHE_ENTRIES,
+        max_bytes: int = MAX_CACHE_BYTES,
+        persist_path: str | None = TOOL_CACHE_PATH,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policies: dict[str, CachePolicy] = {}
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._persist_path = persist_path
+        self._db: sqlite3.Connection | None = None
+
+    def mark_idempotent(self, tool_name: str, policy: CachePolicy) -> None:
+        self.policies[tool_name] = policy
+
+    def policy(self, tool_name: str) -> CachePolicy | None:
+        return self.policies.get(tool_name)
+
+    async def key(self, thread_key: str, tool_name: str, args: dict) -> str | None:
+        """Cache key of a call, or None if the call cannot be cached now."""
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return None
+        validator = None
+        if policy.validator is not None:
+            try:
+                validator = await policy.validator(args, thread_key)
+            except Exception as e:
+                logger.debug(f"Cache validator of {tool_name} failed: {e!s}")
+                return None
+            if validator is None:
+                return None
+        raw = json.dumps(
+            [SHARED_THREAD_KEY if policy.shared else thread_key, tool_name, args, validator],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, tool_name: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.result
+
+        policy = self.policies.get(tool_name)
+        if policy is not None and policy.persistent:
+            stored = self._load(key, now)
+            if stored is not None:
+                result, expires_at = stored
+                self._put(key, result, expires_at)
+                with self._lock:
+                    self._stats["hits"] += 1
+                return result
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, tool_name: str, result) -> None:
+        policy = self.policies.get(tool_name)
+        if policy is None or not _is_cacheable(result):
+            return
+        expires_at = time.time() + policy.ttl
+        self._put(key, result, expires_at)
+        with self._lock:
+            self._stats["stored"] += 1
+        content = getattr(result, "content", None)
+        if policy.persistent and isinstance(content, str) and hasattr(result, "tool_call_id"):
+            # Plain ToolMessages only: rebuilt from their content by retarget()
+            self._save(key, content, expires_at)
+
+    def _put(self, key: str, result, expires_at: float) -> None:
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = CacheEntry(result, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats["evicted"] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    # ── Persistent store ────────────────────────────────────────────────
+
+    def _connection(self) -> sqlite3.Connection | None:
+        if not self._persist_path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self._persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache (key TEXT PRIMARY KEY, result TEXT, expires_at REAL)"
+            )
+            self._db.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+        return self._db
+
+    def _load(self, key: str, now: float) -> tuple[str, float] | None:
+        try:
+            with self._lock:
+                db = self._connection()
+                if db is None:
+                    return None
+                row = db.execute(
+                    "SELECT result, expires_at FROM tool_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            return tuple(row) if row else None
+        except sqlite3.Error as e:
+            logger.debug(f"Tool cache read failed: {e!s}")
+            return None
+
+    def _save(self, key: str, result: str, expires_at: float) -> None:
+        try:
+            with self._lock:
+                db = self._connection()
+                if db is None:
+                    return
+                db.execute("INSERT OR REPLACE INTO tool_cache VALUES (?, ?, ?)", (key, result, expires_at))
+                db.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Tool cache write failed: {e!s}")
+
+    # ── Stats ───────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+tool_result_cache = ToolResultCache()
+
+
+def mark_idempotent(tool_name: str, policy: CachePolicy) -> None:
+    """Let the scheduler reuse the results of *tool_name* according to *policy*."""
+    tool_result_cache.mark_idempotent(tool_name, policy)
+
+
+def get_tool_cache_stats() -> dict:
+    """Hits, misses, hit rate and size of the tool result cache."""
+    return tool_result_cache.stats()
@@ -0,0 +1,276 @@
+"""
+Scheduling policy for the tool node.
+
+When the model emits several tool calls in one message, ToolNode runs them
+concurrently. The scheduler wraps every call (ToolNode ``awrap_tool_call`` /
+``wrap_tool_call``) to add a resource-aware policy on top:
+
+- Calls on the same resource run one after the other: same ``page_title``
+  in the same thread (one Playwright page) or same file path (``file_path``
+  or the ``files`` of the batch tools).
+- Each tool class has its own concurrency cap (the browser tools share a
+  single Chromium instance, file reads are cheap). poll_job / kill_job are
+  not capped, so they never queue behind a long wait_job.
+- Queue wait and run time of every call are recorded per tool.
+- Results of idempotent tools are reused from the tool result cache
+  (tool_cache.py) while their validators still match.
+
+Independent calls still run in parallel.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack, ExitStack, nullcontext
+from dataclasses import dataclass
+
+from agents.utils.logging import logger
+
+from .tool_cache import ToolResultCache, retarget, tool_result_cache
+
+# Tool name -> class sharing a concurrency cap (unlisted tools are "default")
+TOOL_CLASSES = {
+    **dict.fromkeys(
+        ["create_new_page", "navigate_to", "extract_page_text", "capture_screenshot", "click_element",
+         "click_element_by_index", "get_page_elements", "refresh_page_elements", "fill_input"],
+        "browser",
+    ),
+    **dict.fromkeys(["read_file", "read_files", "glob_search", "grep_search"], "file_read"),
+    **dict.fromkeys(["write_file", "write_files", "edit_file"], "file_write"),
+    "shell_tool": "shell",
+    # wait_job can block up to its 30 min timeout: waits must not take the
+    # shell slots, and nothing may queue behind them
+    "wait_job": "job_wait",
+    **dict.fromkeys(["poll_job", "kill_job"], "job_control"),
+    "search_web": "network",
+    "message": "agent",
+}
+
+# Max calls of one class running at the same time (None: no cap)
+CLASS_LIMITS = {
+    "browser": 2,
+    "file_read": 16,
+    "file_write": 8,
+    "shell": 4,
+    "job_wait": 4,
+    "job_control": None,
+    "network": 4,
+    "agent": 2,
+    "default": 8,
+}
+
+
+# Workspace root - consistent with the file tools, which resolve relative paths against it
+WORKSPACE_ROOT = r"C:\Users\caiosmedeiros\Documents"
+
+
+def _normalize_path(path: str) -> str:
+    path = str(path)
+    if not os.path.isabs(path):
+        path = os.path.join(WORKSPACE_ROOT, path)
+    return os.path.normcase(os.path.normpath(path))
+
+
+def resource_keys(args, thread_key: str | None = None) -> list[tuple[str, str]]:
+    """Resources a call works on, sorted (locks are always taken in this order)."""
+    if not isinstance(args, dict):
+        return []
+    keys = set()
+    if args.get("page_title"):
+        # Every thread has its own pages (one browser context per thread)
+        title = str(args["page_title"])
+        keys.add(("page", f"{thread_key}/{title}" if thread_key else title))
+    if args.get("file_path"):
+        keys.add(("file", _normalize_path(args["file_path"])))
+    for spec in args.get("files") or []:
+        if isinstance(spec, dict) and spec.get("file_path"):
+            keys.add(("file", _normalize_path(spec["file_path"])))
+    return sorted(keys)
+
+
+@dataclass
+class ToolLatency:
+    """Latency of the calls of one tool."""
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    def record(self, seconds: float, waited: float, ok: bool) -> None:
+        self.calls += 1
+        self.errors += not ok
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.wait_seconds += waited
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "max_seconds": self.max_seconds,
+            "avg_wait_seconds": self.wait_seconds / self.calls if self.calls else 0.0,
+        }
+
+
+def _is_error(result) -> bool:
+    return getattr(result, "status", None) == "error"
+
+
+def _thread_key(request) -> str:
+    config = getattr(getattr(request, "runtime", None), "config", None) or {}
+    return str(config.get("configurable", {}).get("thread_id") or "__default__")
+
+
+class ToolScheduler:
+    """Per-class semaphores, per-resource locks and latency stats for tool calls."""
+
+    def __init__(
+        self,
+        tool_classes: dict[str, str] | None = None,
+        class_limits: dict[str, int] | None = None,
+        cache: ToolResultCache | None = None,
+    ):
+        self.cache = cache
+        self.tool_classes = TOOL_CLASSES if tool_classes is None else tool_classes
+        self.class_limits = CLASS_LIMITS if class_limits is None else class_limits
+        # Async primitives for awrap_tool_call (per event loop, they cannot be
+        # shared between loops), thread ones for wrap_tool_call (the sync
+        # ToolNode runs calls in a thread pool)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore | nullcontext]]" = weakref.WeakKeyDictionary()
+        self._thread_semaphores: dict[str, threading.BoundedSemaphore | nullcontext] = {}
+        self._locks: "weakref.WeakValueDictionary[tuple, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._thread_locks: "weakref.WeakValueDictionary[tuple[str, str], threading.Lock]" = weakref.WeakValueDictionary()
+        self._latency: dict[str, ToolLatency] = {}
+        self._lock = threading.Lock()
+
+    def tool_class(self, name: str) -> str:
+        return self.tool_classes.get(name, "default")
+
+    def _limit(self, tool_class: str) -> int | None:
+        return self.class_limits.get(tool_class, self.class_limits.get("default", 8))
+
+    def _async_primitives(self, name: str, args, thread_key: str | None = None) -> tuple[asyncio.Semaphore | nullcontext, list[asyncio.Lock]]:
+        tool_class = self.tool_class(name)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(tool_class)
+            if semaphore is None:
+                limit = self._limit(tool_class)
+                semaphore = semaphores[tool_class] = nullcontext() if limit is None else asyncio.Semaphore(limit)
+            locks = []
+            for key in resource_keys(args, thread_key):
+                lock = self._locks.get((loop, *key))
+                if lock is None:
+                    lock = self._locks[(loop, *key)] = asyncio.Lock()
+                locks.append(lock)
+        return semaphore, locks
+
+    def _thread_primitives(self, name: str, args, thread_key: str | None = None) -> tuple[threading.BoundedSemaphore | nullcontext, list[threading.Lock]]:
+        tool_class = self.tool_class(name)
+        with self._lock:
+            semaphore = self._thread_semaphores.get(tool_class)
+            if semaphore is None:
+                limit = self._limit(tool_class)
+                semaphore = self._thread_semaphores[tool_class] = nullcontext() if limit is None else threading.BoundedSemaphore(limit)
+            locks = []
+            for key in resource_keys(args, thread_key):
+                lock = self._thread_locks.get(key)
+                if lock is None:
+                    lock = self._thread_locks[key] = threading.Lock()
+                locks.append(lock)
+        return semaphore, locks
+
+    def _record(self, name: str, seconds: float, waited: float, ok: bool) -> None:
+        with self._lock:
+            self._latency.setdefault(name, ToolLatency()).record(seconds, waited, ok)
+        logger.debug(f"Tool {name}: {seconds:.2f}s (waited {waited:.2f}s){'' if ok else ', failed'}")
+
+    async def awrap_tool_call(self, request, execute: Callable[[object], Awaitable[object]]):
+        """ToolNode ``awrap_tool_call``: run *request* once its resources and class slot are free."""
+        call = request.tool_call
+        semaphore, locks = self._async_primitives(call["name"], call.get("args"), _thread_key(request))
+        queued = time.monotonic()
+        async with AsyncExitStack() as stack:
+            # Resources first, then the class slot: a call waiting on a busy
+            # page does not hold a slot other pages could use
+            for lock in locks:
+                await stack.enter_async_context(lock)
+
+            # Looked up under the resource locks, so the resource cannot
+            # change between the validator and the cached result
+            cache_key = None
+            if self.cache is not None and self.cache.policy(call["name"]) is not None:
+                cache_key = await self.cache.key(_thread_key(request), call["name"], call.get("args") or {})
+                cached = self.cache.get(cache_key, call["name"]) if cache_key is not None else None
+                if cached is not None:
+                    logger.debug(f"Tool {call['name']}: cache hit")
+                    return retarget(cached, call["id"], call["name"])
+
+            await stack.enter_async_context(semaphore)
+            started = time.monotonic()
+            ok = False
+            try:
+                result = await execute(request)
+                ok = not _is_error(result)
+                if ok and cache_key is not None:
+                    self.cache.put(cache_key, call["name"], result)
+                return result
+            finally:
+                self._record(call["name"], time.monotonic() - started, started - queued, ok)
+
+    def wrap_tool_call(self, request, execute: Callable[[object], object]):
+        """ToolNode ``wrap_tool_call``: sync counterpart of awrap_tool_call (without the result cache)."""
+        call = request.tool_call
+        semaphore, locks = self._thread_primitives(call["name"], call.get("args"), _thread_key(request))
+        queued = time.monotonic()
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            stack.enter_context(semaphore)
+            started = time.monotonic()
+            ok = False
+            try:
+                result = execute(request)
+                ok = not _is_error(result)
+                return result
+            finally:
+                self._record(call["name"], time.monotonic() - started, started - queued, ok)
+
+    def stats(self) -> dict[str, dict]:
+        """Latency of every tool called so far, slowest (by total time) first."""
+        with self._lock:
+            ordered = sorted(self._latency.items(), key=lambda item: item[1].total_seconds, reverse=True)
+            return {name: latency.as_dict() for name, latency in ordered}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._latency.clear()
+
+
+tool_scheduler = ToolScheduler(cache=tool_result_cache)
+
+
+def get_tool_latency_stats() -> dict[str, dict]:
+    """Per-tool call count, errors, average/max run time and average queue wait."""
+    return tool_scheduler.stats()
+
+
+def scheduled_tool_node(tools: list, scheduler: ToolScheduler | None = None, **kwargs):
+    """ToolNode running its calls through *scheduler* (the shared one by default)."""
+    # Imported here so the policy above can be used (and tested) without langgraph
+    from langgraph.prebuilt import ToolNode
+
+    scheduler = scheduler or tool_scheduler
+    kwargs.setdefault("handle_tool_errors", True)
+    return ToolNode(
+        tools=tools,
+        wrap_tool_call=scheduler.wrap_tool_call,
+        awrap_tool_call=scheduler.awrap_tool_call,
+        **kwargs,
+    )
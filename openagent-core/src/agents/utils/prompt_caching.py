@@ -0,0 +1,152 @@
+"""
+Prompt caching for Anthropic models.
+
+Adds cache_control breakpoints so the stable prefix of every request is
+served from Anthropic's prompt cache instead of being billed and processed
+in full on every agent step:
+
+1. The system prompt
+2. The tool definitions (breakpoint on the last tool)
+3. The summary message, which stays first in the history between compactions
+4. A sliding breakpoint on the latest message, so the next step reads the
+   whole history written by this one from the cache
+
+Models that do not support prompt caching get the messages and tools unchanged.
+
+Bound models (model + tool schemas) are cached per model config and tool set
+by ``get_bound_model``, so the schemas are serialized once per process instead
+of on every agent step.
+"""
+
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage, SystemMessage
+
+from agents.utils.logging import logger
+from agents.utils.nodes.summary_store import SUMMARY_MESSAGE_ID
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Max number of (model, tool set) pairs kept bound
+MAX_BOUND_MODELS = 32
+
+
+def supports_prompt_caching(model) -> bool:
+    return "anthropic" in (getattr(model, "_llm_type", "") or "")
+
+
+def cached_tool_schemas(tools: list) -> list[dict]:
+    """Anthropic tool schemas with a cache breakpoint after the last tool."""
+    from langchain_anthropic.chat_models import convert_to_anthropic_tool
+
+    schemas = [dict(convert_to_anthropic_tool(t)) for t in tools]
+    if schemas:
+        schemas[-1]["cache_control"] = CACHE_CONTROL
+    return schemas
+
+
+def bind_tools_with_cache(model, tools: list):
+    """``model.bind_tools`` with the tool definitions cached when supported."""
+    if supports_prompt_caching(model):
+        return model.bind_tools(tools=cached_tool_schemas(tools))
+    return model.bind_tools(tools=tools)
+
+
+_bound_models: "OrderedDict[tuple, tuple]" = OrderedDict()
+_bound_models_lock = threading.Lock()
+
+
+def _model_config_key(model) -> tuple:
+    params = getattr(model, "_identifying_params", None) or {}
+    return (type(model).__qualname__, repr(sorted(params.items(), key=lambda kv: kv[0])))
+
+
+def get_bound_model(model, tools: list):
+    """
+    Cached ``bind_tools_with_cache(model, tools)``.
+
+    Keyed by the model config and the identity of the tools. The entry keeps
+    references to the model and tools, so their ids cannot be reused while cached.
+    """
+    key = (_model_config_key(model), tuple(id(t) for t in tools))
+    with _bound_models_lock:
+        entry = _bound_models.get(key)
+        if entry is not None:
+            _bound_models.move_to_end(key)
+            return entry[0]
+
+    bound = bind_tools_with_cache(model, tools)
+
+    with _bound_models_lock:
+        entry = _bound_models.setdefault(key, (bound, model, tuple(tools)))
+        _bound_models.move_to_end(key)
+        while len(_bound_models) > MAX_BOUND_MODELS:
+            _bound_models.popitem(last=False)
+    return entry[0]
+
+
+def clear_bound_models() -> None:
+    with _bound_models_lock:
+        _bound_models.clear()
+
+
+def _with_cache_control(msg):
+    """Copy of *msg* whose last content block carries a cache breakpoint."""
+    content = msg.content
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    else:
+        blocks = list(content)
+        last = blocks[-1]
+        if isinstance(last, str):
+            last = {"type": "text", "text": last}
+        blocks[-1] = {**last, "cache_control": CACHE_CONTROL}
+    return msg.model_copy(update={"content": blocks})
+
+
+def add_cache_breakpoints(system_prompt: str, messages: list, model) -> list:
+    """
+    Build ``[SystemMessage(system_prompt), *messages]`` with cache breakpoints.
+
+    State messages are never mutated; marked messages are copies.
+    """
+    if not supports_prompt_caching(model):
+        return [SystemMessage(content=system_prompt)] + list(messages)
+
+    system = SystemMessage(content=[{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}])
+    history = list(messages)
+
+    if history and getattr(history[0], "id", None) == SUMMARY_MESSAGE_ID:
+        history[0] = _with_cache_control(history[0])
+
+    # Sliding breakpoint: latest message that has content to attach it to
+    # (an AIMessage made only of tool calls has none)
+    for i in range(len(history) - 1, -1, -1):
+        msg = history[i]
+        if msg.content and not isinstance(msg, AIMessage):
+            history[i] = _with_cache_control(msg)
+            break
+
+    return [system] + history
+
+
+def cache_usage(response) -> dict:
+    """Cache hit/miss token counts of a model response."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    details = usage.get("input_token_details", {}) or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "cache_read": details.get("cache_read", 0) or 0,
+        "cache_creation": details.get("cache_creation", 0) or 0,
+    }
+
+
+def report_cache_usage(response, agent_name: str = "agent") -> dict:
+    """Log the cache hit/miss token counts of one agent step and return them."""
+    usage = cache_usage(response)
+    logger.debug(
+        f"[{agent_name}] prompt cache: {usage['cache_read']} read, "
+        f"{usage['cache_creation']} written, {usage['input_tokens']} input tokens"
+    )
+    return usage
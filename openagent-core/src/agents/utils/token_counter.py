@@ -0,0 +1,220 @@
+"""
+Local token counting.
+
+Provides a TokenCounter registry keyed by model family so that every part of
+the agents (truncate_messages, should_summarize, SummarizationMiddleware)
+estimates tokens the same way, offline and cheaply.
+
+- BPE encodings (tiktoken) are loaded lazily on first use, only for families
+  that have a public tokenizer.
+- When no encoding is available (tiktoken not installed, BPE file not cached
+  and no network), a fast chars-per-token heuristic is used instead.
+- BPE counts of messages are kept in an LRU cache keyed by the message text.
+  The heuristic is cheaper than a cache lookup, so it is never cached.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from agents.utils.logging import logger
+
+# Family used when no model is given (the default model is Claude)
+DEFAULT_FAMILY = os.getenv("OPENAGENT_TOKENIZER_FAMILY", "anthropic")
+
+# Per-message count cache size (per counter)
+DEFAULT_CACHE_SIZE = 4096
+
+# Role/framing tokens added for each message, like count_tokens_approximately
+TOKENS_PER_MESSAGE = 3
+
+
+def message_text(msg) -> str:
+    """
+    Text that is billed for a message: content AND tool_calls.
+
+    Tool call args are critical for AIMessages since they can be huge
+    (e.g. write_file content).
+    """
+    content = getattr(msg, 'content', None)
+    if not content:
+        text = ""
+    elif isinstance(content, str):
+        text = content
+    elif isinstance(content, list):
+        text = "".join(str(block) for block in content)
+    else:
+        text = str(content)
+
+    parts = []
+    tool_calls = getattr(msg, 'tool_calls', None)
+    if tool_calls:
+        for tc in tool_calls:
+            if isinstance(tc, dict):
+                parts.append(str(tc.get('name', '')))
+                parts.append(str(tc.get('args', {})))
+            else:
+                parts.append(str(tc))
+
+    # Some tool data is stored here in older langchain versions
+    additional = getattr(msg, 'additional_kwargs', None)
+    if additional:
+        ak_tool_calls = additional.get('tool_calls', [])
+        if ak_tool_calls:
+            parts.append(str(ak_tool_calls))
+
+    if parts:
+        return text + "".join(parts)
+    return text
+
+
+class TokenCounter:
+    """
+    Counts tokens of messages for one model family.
+
+    Instances are callable with an iterable of messages, so they can be passed
+    anywhere langchain expects a ``token_counter`` (trim_messages, middlewares).
+    """
+
+    def __init__(
+        self,
+        family: str,
+        *,
+        encoding_name: str | None = None,
+        chars_per_token: float = 3.0,
+        tokens_per_message: int = TOKENS_PER_MESSAGE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.family = family
+        self.encoding_name = encoding_name
+        self.chars_per_token = chars_per_token
+        self.tokens_per_message = tokens_per_message
+        self.cache_size = cache_size
+
+        self._encoding = None
+        self._encoding_loaded = False
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """The BPE encoding, loaded on first access. None if unavailable."""
+        if not self._encoding_loaded:
+            with self._lock:
+                if not self._encoding_loaded:
+                    self._encoding = self._load_encoding()
+                    self._encoding_loaded = True
+        return self._encoding
+
+    def _load_encoding(self):
+        if not self.encoding_name:
+            return None
+        try:
+            import tiktoken
+            return tiktoken.get_encoding(self.encoding_name)
+        except ImportError:
+            logger.debug(f"tiktoken not installed, using char heuristic for '{self.family}'")
+        except Exception as e:
+            # BPE file not cached and no network, corrupted cache, ...
+            logger.debug(f"Could not load encoding '{self.encoding_name}': {e!s}")
+        return None
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return int(len(text) / self.chars_per_token)
+
+    def count_message(self, msg) -> int:
+        text = message_text(msg)
+        if self.encoding is None:
+            return max(self.count_text(text) + self.tokens_per_message, 1)
+
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+
+        count = max(self.count_text(text) + self.tokens_per_message, 1)
+
+        with self._lock:
+            self._cache[text] = count
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return count
+
+    def count_messages(self, messages: Iterable) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+    def __call__(self, messages: Iterable) -> int:
+        return self.count_messages(messages)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_FACTORIES: dict[str, Callable[[], TokenCounter]] = {}
+_COUNTERS: dict[str, TokenCounter] = {}
+_registry_lock = threading.Lock()
+
+
+def register_token_counter(family: str, factory: Callable[[], TokenCounter]) -> None:
+    """Register (or replace) the counter factory for a model family."""
+    with _registry_lock:
+        _FACTORIES[family] = factory
+        _COUNTERS.pop(family, None)
+
+
+def model_family(model=None) -> str:
+    """Resolve the tokenizer family of a chat model instance or model name."""
+    if model is None:
+        return DEFAULT_FAMILY
+
+    if isinstance(model, str):
+        name = model.lower()
+        if name in _FACTORIES:
+            return name
+    else:
+        llm_type = getattr(model, "_llm_type", "") or ""
+        if "anthropic" in llm_type:
+            return "anthropic"
+        if "openai" in llm_type:
+            return "openai"
+        name = str(getattr(model, "model", "") or getattr(model, "model_name", "")).lower()
+
+    if "claude" in name:
+        return "anthropic"
+    if name.startswith(("gpt", "o1", "o3", "o4")):
+        return "openai"
+    return "default"
+
+
+def get_token_counter(model=None) -> TokenCounter:
+    """Shared TokenCounter for *model* (instance, model name or family name)."""
+    family = model_family(model)
+
+    counter = _COUNTERS.get(family)
+    if counter is not None:
+        return counter
+
+    with _registry_lock:
+        counter = _COUNTERS.get(family)
+        if counter is None:
+            factory = _FACTORIES.get(family) or _FACTORIES["default"]
+            counter = factory()
+            _COUNTERS[family] = counter
+    return counter
+
+
+# Claude has no public tokenizer. 3.3 chars/token was estimated in an offline
+# experiment against Claude's token-counting API.
+register_token_counter("anthropic", lambda: TokenCounter("anthropic", chars_per_token=3.3))
+register_token_counter("openai", lambda: TokenCounter("openai", encoding_name="o200k_base"))
+# Conservative: 3 chars per token
+register_token_counter("default", lambda: TokenCounter("default", chars_per_token=3.0))
@@ -0,0 +1,168 @@
+"""
+Per-thread token ledger.
+
+Keeps a running token total for a thread's message history so the
+summarization trigger only tokenizes messages it has not seen before.
+
+The ledger relies on how the ``add_messages`` reducer mutates history:
+messages are appended at the end or removed by id (``RemoveMessage``).
+Between two checks we therefore only need to count the new tail, and
+removals can be subtracted using the cached per-id counts.
+
+``add_messages`` also replaces a message in place when an update carries
+an existing id. Counts are cached with the content size of the message, so
+a replaced message is recounted when its size changed: always during a
+reconcile, and for the last message on the fast path.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+# Counts the tokens of a SINGLE message
+MessageTokenCounter = Callable[[object], int]
+
+# Max number of thread ledgers kept in memory (least recently used are dropped)
+MAX_TRACKED_THREADS = 128
+
+# Key used when the graph runs without a thread_id (no checkpointer)
+DEFAULT_THREAD_KEY = "__default__"
+
+
+def _content_size(msg) -> int:
+    content = getattr(msg, "content", None)
+    if content is None:
+        return 0
+    return len(content) if isinstance(content, str) else len(str(content))
+
+
+class TokenLedger:
+    """Running token total for one thread, cached by message id."""
+
+    def __init__(self, count_message: MessageTokenCounter):
+        self._count_message = count_message
+        # message id -> (content size, token count)
+        self._counts: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        # Total of messages WITHOUT an id (cannot be cached across syncs)
+        self._anonymous_total = 0
+        # Fast-path marker: length of the history and id of its last message
+        # at the previous sync. If the same message is still at the same
+        # position, nothing before it was removed and only the tail is new.
+        self._length = 0
+        self._last_id: str | None = None
+        self.total = 0
+
+    def sync(self, messages: list) -> int:
+        """Bring the ledger in line with *messages* and return the total."""
+        with self._lock:
+            if self._can_fast_forward(messages):
+                for msg in messages[self._length:]:
+                    self._add(msg)
+            else:
+                self._reconcile(messages)
+
+            self._length = len(messages)
+            self._last_id = getattr(messages[-1], "id", None) if messages else None
+            return self.total
+
+    def remove(self, message_ids: Iterable[str]) -> None:
+        """Subtract messages that were removed via ``RemoveMessage``."""
+        with self._lock:
+            removed = 0
+            for message_id in message_ids:
+                entry = self._counts.pop(message_id, None)
+                if entry is None:
+                    continue
+                self.total -= entry[1]
+                removed += 1
+                if message_id == self._last_id:
+                    # Anchor is gone, next sync must reconcile by id
+                    self._length = 0
+                    self._last_id = None
+
+            if self._last_id is not None:
+                self._length = max(self._length - removed, 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._anonymous_total = 0
+            self._length = 0
+            self._last_id = None
+            self.total = 0
+
+    def _can_fast_forward(self, messages: list) -> bool:
+        if not self._length or self._last_id is None or len(messages) < self._length:
+            return False
+        anchor = messages[self._length - 1]
+        if getattr(anchor, "id", None) != self._last_id:
+            return False
+        # Last message replaced in place (same id, new content)
+        entry = self._counts.get(self._last_id)
+        return entry is not None and entry[0] == _content_size(anchor)
+
+    def _add(self, msg) -> None:
+        message_id = getattr(msg, "id", None)
+        if message_id is None:
+            count = self._count_message(msg)
+            self._anonymous_total += count
+            self.total += count
+            return
+
+        size = _content_size(msg)
+        entry = self._counts.get(message_id)
+        if entry is not None:
+            if entry[0] == size:
+                return
+            # Replaced in place under the same id
+            self.total -= entry[1]
+
+        count = self._count_message(msg)
+        self._counts[message_id] = (size, count)
+        self.total += count
+
+    def _reconcile(self, messages: list) -> None:
+        """Slow path: diff by id. Only tokenizes new or replaced messages."""
+        current_ids = set()
+        for msg in messages:
+            message_id = getattr(msg, "id", None)
+            if message_id is not None:
+                current_ids.add(message_id)
+
+        for message_id in [i for i in self._counts if i not in current_ids]:
+            self.total -= self._counts.pop(message_id)[1]
+
+        # Anonymous messages cannot be matched, recount them
+        self.total -= self._anonymous_total
+        self._anonymous_total = 0
+
+        for msg in messages:
+            self._add(msg)
+
+
+_ledgers: "OrderedDict[str, TokenLedger]" = OrderedDict()
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(thread_id: str | None, count_message: MessageTokenCounter) -> TokenLedger:
+    """Return the ledger for *thread_id*, creating it on first use."""
+    key = thread_id or DEFAULT_THREAD_KEY
+
+    with _ledgers_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = TokenLedger(count_message)
+            _ledgers[key] = ledger
+            while len(_ledgers) > MAX_TRACKED_THREADS:
+                _ledgers.popitem(last=False)
+        else:
+            _ledgers.move_to_end(key)
+
+    return ledger
+
+
+def drop_ledger(thread_id: str | None) -> None:
+    """Forget the ledger of *thread_id* (e.g. when a conversation is cleared)."""
+    with _ledgers_lock:
+        _ledgers.pop(thread_id or DEFAULT_THREAD_KEY, None)
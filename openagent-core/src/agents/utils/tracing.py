@@ -0,0 +1,59 @@
+"""
+MLflow tracing setup.
+
+Agent modules call ``setup_tracing(experiment)`` instead of configuring mlflow
+at import time. Importing mlflow and enabling autolog takes seconds, so an
+interactive front-end (the CLI) can call ``defer_tracing()`` before loading the
+agents and run ``enable_deferred_tracing()`` later in a background thread,
+while the user types the first prompt.
+"""
+
+import os
+import threading
+
+from agents.utils.logging import logger
+
+MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://127.0.0.1:1234")
+
+# Experiments requested while tracing is deferred (None = not deferred)
+_deferred: list[str] | None = None
+_lock = threading.Lock()
+
+
+def _enable(experiment: str) -> None:
+    try:
+        import mlflow
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        mlflow.set_experiment(experiment)
+        mlflow.langchain.autolog()
+    except ImportError:
+        logger.debug("mlflow not installed, tracing disabled")
+    except Exception as e:
+        logger.warning(f"Could not enable mlflow tracing for '{experiment}': {e!s}")
+
+
+def setup_tracing(experiment: str) -> None:
+    """Enable mlflow autologging for *experiment*, or queue it if tracing is deferred."""
+    with _lock:
+        if _deferred is not None:
+            _deferred.append(experiment)
+            return
+    _enable(experiment)
+
+
+def defer_tracing() -> None:
+    """Queue the following ``setup_tracing`` calls until ``enable_deferred_tracing``."""
+    global _deferred
+    with _lock:
+        if _deferred is None:
+            _deferred = []
+
+
+def enable_deferred_tracing() -> None:
+    """Run the queued setups (blocking). Later ``setup_tracing`` calls run immediately."""
+    global _deferred
+    with _lock:
+        experiments, _deferred = _deferred or [], None
+    # The last experiment set wins, as when every module configured mlflow at import
+    for experiment in experiments:
+        _enable(experiment)